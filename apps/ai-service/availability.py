@@ -0,0 +1,313 @@
+"""
+In-memory availability index.
+
+Every provider, room (per capacity) and pooled resource gets one bitmap per
+UTC day, one bit per 5-minute slot, stored as a Python int. Open-slot search
+is bitwise: a "run" bitmap marks the slots where a service of n slots can
+start, and because runs(a & b) == runs(a) & runs(b), any-of/all-of
+combinations across providers, rooms and resource pools reduce to a few
+ORs and ANDs over whole days at once.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+from optimizer import SKIPPED_STATUSES, utc_minutes
+from schemas import AvailabilityResponse, AvailabilityStats, AvailableSlot
+
+SLOT_MINUTES = 5
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+FULL_DAY = (1 << SLOTS_PER_DAY) - 1
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+PROVIDER, ROOM, RESOURCE = "provider", "room", "resource"
+
+
+def slots_for(minutes):
+    return -(-minutes // SLOT_MINUTES)
+
+
+def span_mask(lo, hi):
+    """Bits [lo, hi) set, clipped to a day."""
+    lo, hi = max(lo, 0), min(hi, SLOTS_PER_DAY)
+    if hi <= lo:
+        return 0
+    return ((1 << (hi - lo)) - 1) << lo
+
+
+def runs(mask, n):
+    """Bits i such that slots i .. i+n-1 are all set in mask."""
+    have = 1
+    while have < n and mask:
+        step = min(have, n - have)
+        mask &= mask >> step
+        have += step
+    return mask
+
+
+@lru_cache(maxsize=256)
+def aligned(step, offset):
+    """Every step-th bit starting at offset (mod step)."""
+    mask = 0
+    for i in range(offset % step, SLOTS_PER_DAY, step):
+        mask |= 1 << i
+    return mask
+
+
+def day_masks(start_min, end_min):
+    """Split a [start, end) minute range into (day, busy mask) pieces."""
+    pieces = []
+    day = start_min // 1440
+    while day * 1440 < end_min:
+        base = day * 1440
+        lo = max(start_min - base, 0) // SLOT_MINUTES
+        hi = slots_for(min(end_min - base, 1440))
+        mask = span_mask(lo, hi)
+        if mask:
+            pieces.append((day, mask))
+        day += 1
+    return pieces
+
+
+class AvailabilityIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._providers = {}  # id -> {day: open mask} or None when always open
+            self._rooms = {}  # id -> Room, active rooms only
+            self._pools = {}  # pool id -> [resource ids]
+            self._resource_buffer = {}  # resource id -> minutes
+            self._masks = {}  # (kind, id, day) -> {booking id: mask}
+            self._busy = {}  # (kind, id, day) -> slots at capacity
+            self._bookings = {}  # booking id -> [(kind, id, day)]
+
+    # -- loading ---------------------------------------------------------
+
+    def load(self, request):
+        with self._lock:
+            if request.replace:
+                self.clear()
+            for provider in request.providers:
+                self.add_provider(provider)
+            for room in request.rooms:
+                if room.is_active:
+                    self._rooms[room.id] = room
+                else:
+                    self._rooms.pop(room.id, None)
+            for pool in request.resource_pools:
+                self._pools[pool.id] = [r.id for r in pool.resources if r.is_active]
+                for resource in pool.resources:
+                    self._resource_buffer[resource.id] = (
+                        resource.buffer_minutes if resource.buffer_minutes is not None
+                        else pool.default_buffer_minutes
+                    )
+            for brk in request.breaks:
+                self.add_break(brk)
+            for appt in request.appointments:
+                self.add_appointment(appt)
+
+    def add_provider(self, provider):
+        with self._lock:
+            if not provider.working_hours:
+                self._providers[provider.id] = None
+                return
+            hours = {}
+            for window in provider.working_hours:
+                for day, mask in day_masks(utc_minutes(window.start_time), utc_minutes(window.end_time)):
+                    hours[day] = hours.get(day, 0) | mask
+            self._providers[provider.id] = hours
+
+    # -- incremental updates ---------------------------------------------
+
+    def add_break(self, brk):
+        """
+        Insert (or replace) a break. Returns its booking id for cancel():
+        "break:<id>", or for a break without an id one derived from its
+        practitioner and times, so the same break always gets the same id.
+        """
+        start, end = utc_minutes(brk.start_time), utc_minutes(brk.end_time)
+        booking_id = f"break:{brk.id}" if brk.id else f"break:{brk.practitioner_id}:{start}-{end}"
+        with self._lock:
+            self.cancel(booking_id)
+            self._book(booking_id, PROVIDER, brk.practitioner_id, start, end)
+        return booking_id
+
+    def add_appointment(self, appt):
+        """Insert (or replace) an appointment's holds on provider, room and resources."""
+        with self._lock:
+            self.cancel(appt.id)
+            if appt.status in SKIPPED_STATUSES:
+                return
+            start = utc_minutes(appt.start_time)
+            end = start + appt.duration if appt.duration else utc_minutes(appt.end_time)
+            self._book(appt.id, PROVIDER, appt.practitioner_id, start, end)
+
+            if appt.room_id:
+                room = self._rooms.get(appt.room_id)
+                buffer = room.buffer_minutes if room else 0
+                self._book(appt.id, ROOM, appt.room_id, start, end + appt.post_treatment_time + buffer)
+
+            for req in appt.resources:
+                resource_id = req.resource_id or self._pick_resource(req.resource_pool_id, start, end)
+                if resource_id:
+                    buffer = self._resource_buffer.get(resource_id, 0)
+                    self._book(appt.id, RESOURCE, resource_id, start, end + buffer)
+
+    def cancel(self, booking_id):
+        """Release every hold of a booking. Returns False if it was not indexed."""
+        with self._lock:
+            keys = self._bookings.pop(booking_id, None)
+            if keys is None:
+                return False
+            for key in keys:
+                masks = self._masks[key]
+                masks.pop(booking_id, None)
+                self._recompute(key)
+            return True
+
+    def _book(self, booking_id, kind, entity_id, start, end):
+        keys = self._bookings.setdefault(booking_id, [])
+        for day, mask in day_masks(start, end):
+            key = (kind, entity_id, day)
+            masks = self._masks.setdefault(key, {})
+            masks[booking_id] = masks.get(booking_id, 0) | mask
+            if key not in keys:
+                keys.append(key)
+            self._recompute(key)
+
+    def _recompute(self, key):
+        """Rebuild the at-capacity bitmap with a bit-sliced counter over holds."""
+        masks = self._masks.get(key)
+        if not masks:
+            self._masks.pop(key, None)
+            self._busy.pop(key, None)
+            return
+        capacity = 1
+        if key[0] == ROOM and key[1] in self._rooms:
+            capacity = self._rooms[key[1]].capacity
+        levels = [0] * capacity  # levels[k]: slots with more than k holds
+        for mask in masks.values():
+            for k in range(capacity - 1, 0, -1):
+                levels[k] |= levels[k - 1] & mask
+            levels[0] |= mask
+        self._busy[key] = levels[-1]
+
+    def _pick_resource(self, pool_id, start, end):
+        resource_ids = self._pools.get(pool_id, [])
+        for resource_id in resource_ids:
+            buffer = self._resource_buffer.get(resource_id, 0)
+            if all(not (self._busy.get((RESOURCE, resource_id, day), 0) & mask)
+                   for day, mask in day_masks(start, end + buffer)):
+                return resource_id
+        return resource_ids[0] if resource_ids else None
+
+    # -- queries ---------------------------------------------------------
+
+    def free(self, kind, entity_id, day):
+        """Open, not-at-capacity slots; none for a provider, room or resource that isn't indexed"""
+        if kind == PROVIDER:
+            if entity_id not in self._providers:
+                return 0
+            hours = self._providers[entity_id]
+            open_mask = FULL_DAY if hours is None else hours.get(day, 0)
+        elif kind == ROOM:
+            if entity_id not in self._rooms:
+                return 0  # unknown or inactive
+            open_mask = FULL_DAY
+        else:
+            if entity_id not in self._resource_buffer:
+                return 0
+            open_mask = FULL_DAY
+        return open_mask & ~self._busy.get((kind, entity_id, day), 0)
+
+    def query(self, q):
+        started = time.perf_counter()
+        with self._lock:
+            slots = self._search(q)
+        return AvailabilityResponse(slots=slots, query_ms=round((time.perf_counter() - started) * 1000, 4))
+
+    def _search(self, q):
+        n = slots_for(q.duration_minutes)
+        step = max(q.step_minutes // SLOT_MINUTES, 1)
+        window_start, window_end = utc_minutes(q.start_time), utc_minutes(q.end_time)
+        provider_ids = q.provider_ids or list(self._providers)
+
+        room_n = {
+            room_id: slots_for(q.duration_minutes + q.post_treatment_minutes
+                               + (self._rooms[room_id].buffer_minutes if room_id in self._rooms else 0))
+            for room_id in q.room_ids
+        }
+        pool_resources = []
+        for pool_id in q.resource_pool_ids:
+            resources = self._pools.get(pool_id, [])
+            if not resources:
+                return []
+            pool_resources.append([
+                (r, slots_for(q.duration_minutes + self._resource_buffer.get(r, 0))) for r in resources
+            ])
+
+        first_slot = slots_for(window_start)  # starts are aligned to this, across days
+        slots = []
+        for day in range(window_start // 1440, (window_end - 1) // 1440 + 1):
+            base = day * 1440
+            lo = slots_for(max(window_start - base, 0))
+            hi = (min(window_end - base, 1440)) // SLOT_MINUTES
+            candidates = span_mask(lo, hi - n + 1) & aligned(step, first_slot - day * SLOTS_PER_DAY)
+            if not candidates:
+                continue
+
+            provider_runs = []
+            any_provider = 0
+            for pid in provider_ids:
+                r = runs(self.free(PROVIDER, pid, day), n) & candidates
+                if r:
+                    provider_runs.append((pid, r))
+                    any_provider |= r
+            candidates &= any_provider
+
+            room_runs = []
+            if q.room_ids and candidates:
+                any_room = 0
+                for room_id, rn in room_n.items():
+                    r = runs(self.free(ROOM, room_id, day), rn) & candidates
+                    if r:
+                        room_runs.append((room_id, r))
+                        any_room |= r
+                candidates &= any_room
+
+            for resources in pool_resources:
+                if not candidates:
+                    break
+                any_resource = 0
+                for resource_id, rn in resources:
+                    any_resource |= runs(self.free(RESOURCE, resource_id, day), rn)
+                candidates &= any_resource
+
+            while candidates:
+                low = candidates & -candidates
+                candidates ^= low
+                start = EPOCH + timedelta(minutes=base + (low.bit_length() - 1) * SLOT_MINUTES)
+                slots.append(AvailableSlot(
+                    start_time=start,
+                    end_time=start + timedelta(minutes=q.duration_minutes),
+                    provider_ids=[pid for pid, r in provider_runs if r & low],
+                    room_ids=[room_id for room_id, r in room_runs if r & low],
+                ))
+                if len(slots) >= q.limit:
+                    return slots
+        return slots
+
+    def stats(self):
+        with self._lock:
+            return AvailabilityStats(
+                providers=len(self._providers),
+                rooms=len(self._rooms),
+                resources=len(self._resource_buffer),
+                bookings=len(self._bookings),
+                bitmaps=len(self._busy),
+            )
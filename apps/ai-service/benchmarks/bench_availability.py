@@ -0,0 +1,142 @@
+"""
+Availability index throughput benchmark.
+
+Run from apps/ai-service:
+
+    python -m benchmarks.bench_availability
+    python -m benchmarks.bench_availability --queries 50000 --target-qps 10000
+
+Loads a synthetic clinic week, then times single-core slot queries (one
+provider, a few candidate rooms, sometimes a resource pool, one-day window)
+plus a round of incremental cancel/insert updates. Exits non-zero when
+query throughput is below the target, or when the index gets one of the
+edge cases in check_edge_cases() wrong.
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from availability import AvailabilityIndex
+from benchmarks.synthetic import clinic_week
+from schemas import AvailabilityLoadRequest, AvailabilityQuery, Break
+
+DAY = datetime(2025, 3, 3, tzinfo=timezone.utc)
+
+
+def check_edge_cases():
+    """Failure messages for ids the index must treat as never free, and for breaks without an id"""
+    index = AvailabilityIndex()
+    index.load(AvailabilityLoadRequest.model_validate({
+        "providers": [
+            {"id": "p-hours", "workingHours": [{"startTime": DAY + timedelta(hours=9),
+                                                "endTime": DAY + timedelta(hours=17)}]},
+            {"id": "p-open"},
+        ],
+        "rooms": [{"id": "r-active"}, {"id": "r-inactive", "isActive": False}],
+    }))
+
+    def slots(provider_ids, room_ids=()):
+        return index.query(AvailabilityQuery(
+            start_time=DAY, end_time=DAY + timedelta(days=1), duration_minutes=30,
+            provider_ids=list(provider_ids), room_ids=list(room_ids), limit=5000)).slots
+
+    failures = []
+    if slots(["ghost"]):
+        failures.append("unknown provider has free slots")
+    if slots(["ghost"], ["ghostroom"]):
+        failures.append("unknown provider and room have free slots")
+    if slots(["p-hours"], ["ghostroom"]):
+        failures.append("unknown room has free slots")
+    if slots(["p-hours"], ["r-inactive"]):
+        failures.append("inactive room has free slots")
+    open_all_day = [slot.start_time.hour for slot in slots(["p-open"], ["r-active"])]
+    if not open_all_day or open_all_day[0] != 0 or open_all_day[-1] != 23:
+        failures.append("provider without working hours: not open all day")
+    if len(slots(["p-hours"], ["r-active"])) != 31:  # 09:00 to 16:30 every 15 minutes
+        failures.append("provider with working hours: free outside them")
+
+    brk = Break(start_time=DAY + timedelta(hours=12), end_time=DAY + timedelta(hours=13), practitioner_id="p-hours")
+    booking_id = index.add_break(brk)
+    if index.add_break(brk.model_copy()) != booking_id:
+        failures.append("a break without an id got a different booking id when re-added")
+    if len(slots(["p-hours"])) != 31 - 5:  # starts 11:45 to 12:45 overlap it
+        failures.append("break without an id not applied once")
+    if not index.cancel(booking_id) or len(slots(["p-hours"])) != 31:
+        failures.append("break without an id could not be cancelled by its returned id")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--providers", type=int, default=30)
+    parser.add_argument("--appointments", type=int, default=2000)
+    parser.add_argument("--rooms", type=int, default=36)
+    parser.add_argument("--queries", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--target-qps", type=float, default=10000.0)
+    args = parser.parse_args()
+
+    failures = check_edge_cases()
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        return 1
+    print("Edge cases: unknown and inactive ids never free, breaks without an id cancellable")
+
+    payload = clinic_week(providers=args.providers, appointments=args.appointments, rooms=args.rooms)
+    request = AvailabilityLoadRequest.model_validate(payload)
+
+    index = AvailabilityIndex()
+    started = time.perf_counter()
+    index.load(request)
+    load_ms = (time.perf_counter() - started) * 1000
+
+    rng = random.Random(args.seed)
+    day_starts = sorted({w.start_time for p in request.providers for w in p.working_hours})
+    provider_ids = [p.id for p in request.providers]
+    room_ids = [r.id for r in request.rooms]
+    queries = []
+    for _ in range(args.queries):
+        day = rng.choice(day_starts)
+        queries.append(AvailabilityQuery(
+            start_time=day,
+            end_time=day + timedelta(hours=11),
+            duration_minutes=rng.choice([15, 30, 45, 60]),
+            provider_ids=[rng.choice(provider_ids)],
+            room_ids=rng.sample(room_ids, rng.randint(1, 3)),
+            resource_pool_ids=["pool-laser"] if rng.random() < 0.3 else [],
+            limit=20,
+        ))
+
+    found = 0
+    started = time.perf_counter()
+    for q in queries:
+        found += len(index.query(q).slots)
+    elapsed = time.perf_counter() - started
+    qps = len(queries) / elapsed
+
+    appointments = [a for a in request.appointments if a.status != "cancelled"]
+    sample = rng.sample(appointments, min(500, len(appointments)))
+    started = time.perf_counter()
+    for appt in sample:
+        index.cancel(appt.id)
+        index.add_appointment(appt)
+    update_us = (time.perf_counter() - started) / max(len(sample), 1) * 1e6
+
+    stats = index.stats()
+    print(f"Indexed {stats.bookings} bookings into {stats.bitmaps} day bitmaps in {load_ms:.1f} ms")
+    print(f"Queries: {len(queries)} in {elapsed * 1000:.0f} ms -> {qps:,.0f} queries/sec "
+          f"({elapsed / len(queries) * 1e6:.1f} us each, {found / len(queries):.1f} slots avg)")
+    print(f"Cancel + re-insert: {update_us:.1f} us per appointment")
+
+    if qps < args.target_qps:
+        print(f"FAIL: below target of {args.target_qps:,.0f} queries/sec")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
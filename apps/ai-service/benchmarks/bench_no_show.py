@@ -0,0 +1,96 @@
+"""
+No-show batch scoring throughput benchmark.
+
+Run from apps/ai-service:
+
+    python -m benchmarks.bench_no_show
+    python -m benchmarks.bench_no_show --batch 5000 --history 50000
+
+Trains on a synthetic appointment-history export, then times scoring of
+upcoming-appointment batches: request validation, the vectorized scoring
+pass, and a per-row Python loop over the same weights for reference.
+"""
+
+import argparse
+import math
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+from benchmarks.synthetic import appointment_history
+from no_show import feature_matrix, train
+from schemas import NoShowScoreRequest
+
+
+def upcoming_payload(n, seed):
+    rng = random.Random(seed)
+    now = datetime(2026, 1, 5, tzinfo=timezone.utc)
+    rows = []
+    for i in range(n):
+        start = now + timedelta(hours=rng.uniform(1, 24 * 30))
+        prior = rng.randint(0, 20)
+        rows.append({
+            "id": f"up-{i:06d}",
+            "startTime": start.isoformat(),
+            "bookedAt": (start - timedelta(hours=rng.expovariate(1 / 120))).isoformat(),
+            "bookingSource": rng.choice(["app", "web", "phone", "walk_in"]),
+            "depositPaid": rng.random() < 0.4,
+            "priorAppointments": prior,
+            "priorNoShows": rng.randint(0, prior // 4),
+        })
+    return {"appointments": rows}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--history", type=int, default=50000)
+    parser.add_argument("--batch", type=int, default=5000)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    history = pd.DataFrame(appointment_history(args.history))
+    started = time.perf_counter()
+    model = train(history)
+    train_s = time.perf_counter() - started
+    meta = model.metadata
+    print(f"Trained on {meta['rows']} outcomes in {train_s:.2f} s "
+          f"(no-show rate {meta['no_show_rate']:.1%}, held-out AUC {meta['test_auc']:.3f})")
+
+    payload = upcoming_payload(args.batch, seed=3)
+    validate_ms, score_ms = [], []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        request = NoShowScoreRequest.model_validate(payload)
+        validate_ms.append((time.perf_counter() - started) * 1000)
+        started = time.perf_counter()
+        response = model.score(request)
+        score_ms.append((time.perf_counter() - started) * 1000)
+
+    # Same maths one row at a time, for comparison with the vectorized pass.
+    weights, intercept = model.weights.tolist(), model.intercept
+    started = time.perf_counter()
+    for a in request.appointments:
+        x = feature_matrix(
+            [((a.start_time - (a.booked_at or a.start_time)).total_seconds()) / 3600.0],
+            [a.deposit_paid], [a.booking_source], [a.prior_appointments], [a.prior_no_shows],
+        )[0]
+        1 / (1 + math.exp(-(sum(w * v for w, v in zip(weights, x)) + intercept)))
+    per_row_ms = (time.perf_counter() - started) * 1000
+
+    score = statistics.median(score_ms)
+    validate = statistics.median(validate_ms)
+    risk = pd.Series([s.risk for s in response.scores]).value_counts().to_dict()
+    print(f"Batch of {args.batch}: validate {validate:.1f} ms, score {score:.1f} ms "
+          f"-> {args.batch / score * 1000:,.0f} appointments/sec scored "
+          f"({args.batch / (score + validate) * 1000:,.0f}/sec including validation)")
+    print(f"Per-row reference loop: {per_row_ms:.1f} ms ({per_row_ms / score:.0f}x slower)")
+    print(f"Risk mix: {risk}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
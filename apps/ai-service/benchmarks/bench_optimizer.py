@@ -0,0 +1,105 @@
+"""
+Schedule optimizer latency benchmark.
+
+Run from apps/ai-service:
+
+    python -m benchmarks.bench_optimizer
+    python -m benchmarks.bench_optimizer --providers 30 --appointments 2000 --budget-ms 1000
+
+Exits non-zero when the median solve time exceeds the budget, so it can gate CI,
+or when naive appointment times are not read as UTC alongside aware breaks
+and working hours (checked with the host timezone set to America/New_York).
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.synthetic import clinic_week_request
+from optimizer import optimize_schedule
+from schemas import OptimizeScheduleRequest
+
+
+def check_naive_times():
+    """Failure message if a naive appointment is shifted by the host's UTC offset, else None."""
+    day = datetime(2026, 1, 6)
+    utc = day.replace(tzinfo=timezone.utc)
+    request = OptimizeScheduleRequest.model_validate({
+        "providers": [{"id": "p1", "workingHours": [{"startTime": utc + timedelta(hours=9),
+                                                     "endTime": utc + timedelta(hours=17)}]}],
+        "breaks": [{"practitionerId": "p1", "startTime": utc + timedelta(hours=12),
+                    "endTime": utc + timedelta(hours=13)}],
+        "appointments": [{"id": "a1", "practitionerId": "p1", "startTime": day + timedelta(hours=12),
+                          "endTime": day + timedelta(hours=12, minutes=30)}],
+        "maxShiftMinutes": 60,
+    })
+    previous = os.environ.get("TZ")
+    os.environ["TZ"] = "America/New_York"
+    time.tzset()
+    try:
+        appt = optimize_schedule(request).appointments[0]
+    finally:
+        if previous is None:
+            del os.environ["TZ"]
+        else:
+            os.environ["TZ"] = previous
+        time.tzset()
+    if appt.conflict or appt.start_time != day + timedelta(hours=13):
+        return f"naive 12:00 appointment during a 12:00-13:00 UTC break ended at {appt.start_time} ({appt.conflict})"
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--providers", type=int, default=30)
+    parser.add_argument("--appointments", type=int, default=2000)
+    parser.add_argument("--rooms", type=int, default=36)
+    parser.add_argument("--days", type=int, default=5)
+    parser.add_argument("--max-shift", type=int, default=30)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--budget-ms", type=float, default=1000.0)
+    args = parser.parse_args()
+
+    failure = check_naive_times()
+    if failure:
+        print(f"FAIL: {failure}")
+        return 1
+
+    request = clinic_week_request(
+        providers=args.providers,
+        appointments=args.appointments,
+        rooms=args.rooms,
+        days=args.days,
+        seed=args.seed,
+        max_shift_minutes=args.max_shift,
+    )
+
+    timings = []
+    result = None
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        result = optimize_schedule(request)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    median = statistics.median(timings)
+    m = result.metrics
+    print(f"Synthetic week: {args.providers} providers, {args.appointments} appointments, "
+          f"{args.rooms} rooms, {args.days} days")
+    print(f"Solve time: median {median:.1f} ms, min {min(timings):.1f} ms, max {max(timings):.1f} ms "
+          f"over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+    print(f"Idle minutes: {m.idle_minutes_before} -> {m.idle_minutes_after}")
+    print(f"Room conflicts: {m.room_conflicts_before} -> {m.room_conflicts_after}")
+    print(f"Moved: {m.moved}, room changes: {m.room_changes}, unresolved: {m.unresolved}, skipped: {m.skipped}")
+
+    if median > args.budget_ms:
+        print("FAIL: solve time over budget")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+"""
+Waitlist matching benchmark.
+
+Run from apps/ai-service:
+
+    python -m benchmarks.bench_waitlist
+    python -m benchmarks.bench_waitlist --entries 100000 --queries 5000
+
+Bulk-loads a synthetic waitlist, then times cancellation matches through the
+interval index against filtering and sorting the whole waitlist, and
+checks both return identical rankings. Also checks that entries with
+naive, aware and missing created_at load and rank oldest first, and that
+a slot crossing midnight matches the windows that cover both its parts,
+and that out-of-range preferred times are rejected.
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from pydantic import ValidationError
+
+from benchmarks.synthetic import waitlist_entries
+from schemas import PreferredTimeRange, WaitlistLoadRequest, WaitlistMatchRequest
+from waitlist import WaitlistIndex, entry_windows
+
+
+def scan_match(entries, request):
+    """Reference implementation: filter and sort the whole waitlist."""
+    start = request.start_time
+    minute = start.hour * 60 + start.minute
+    minute_end = minute + int((request.end_time - start).total_seconds() // 60)
+    slot_date = start.date().isoformat()
+    slot_day = (start.weekday() + 1) % 7
+    ranked = []
+    for seq, entry in enumerate(entries):
+        if entry.service_id != request.service_id:
+            continue
+        if not any(lo <= minute and minute_end <= hi for lo, hi in entry_windows(entry)):
+            continue
+        if entry.preferred_dates and slot_date not in entry.preferred_dates:
+            continue
+        if entry.preferred_days and slot_day not in entry.preferred_days:
+            continue
+        preferred = entry.preferred_practitioner_id
+        if preferred is None:
+            rank = 1
+        elif preferred == request.practitioner_id:
+            rank = 0
+        else:
+            continue
+        ranked.append((-entry.priority, rank, seq, entry.id))
+    return [entry_id for *_, entry_id in sorted(ranked)[:request.limit]]
+
+
+def check_created_at_order():
+    """Failure message if mixed naive/aware/missing created_at don't rank oldest first, else None."""
+    base = datetime(2026, 1, 5, 12)
+    created = {
+        "wl-missing": None,
+        "wl-aware-late": (base + timedelta(hours=2)).replace(tzinfo=timezone(timedelta(hours=-5))),  # 19:00 UTC
+        "wl-naive": base + timedelta(hours=1),  # 13:00 UTC
+        "wl-aware-early": base.replace(tzinfo=timezone.utc),
+    }
+    index = WaitlistIndex()
+    try:
+        index.load(WaitlistLoadRequest(entries=[
+            {"id": entry_id, "patientId": "pat", "serviceId": "svc", "createdAt": created_at}
+            for entry_id, created_at in created.items()
+        ]))
+    except TypeError as e:
+        return f"mixed created_at failed to load: {e}"
+    start = datetime(2026, 1, 6, 10, tzinfo=timezone.utc)
+    ranked = [m.id for m in index.match(WaitlistMatchRequest(
+        service_id="svc", start_time=start, end_time=start + timedelta(minutes=30))).matches]
+    expected = ["wl-aware-early", "wl-naive", "wl-aware-late", "wl-missing"]
+    if ranked != expected:
+        return f"mixed created_at ranked {ranked}, expected {expected}"
+    return None
+
+
+def check_midnight_slot():
+    """Failure message if a 23:30-00:30 slot matches the wrong entries, else None."""
+    ranges = {
+        "wl-any-time": None,
+        "wl-wraps": {"start": "22:00", "end": "02:00"},
+        "wl-late-evening": {"start": "23:00", "end": "24:00"},
+        "wl-after-midnight": {"start": "00:00", "end": "01:00"},
+        "wl-daytime": {"start": "09:00", "end": "17:00"},
+    }
+    index = WaitlistIndex()
+    index.load(WaitlistLoadRequest(entries=[
+        {"id": entry_id, "patientId": "pat", "serviceId": "svc", "preferredTimeRange": time_range}
+        for entry_id, time_range in ranges.items()
+    ]))
+    start = datetime(2026, 1, 6, 23, 30, tzinfo=timezone.utc)
+    matched = sorted(m.id for m in index.match(WaitlistMatchRequest(
+        service_id="svc", start_time=start, end_time=start + timedelta(hours=1))).matches)
+    if matched != ["wl-any-time", "wl-wraps"]:
+        return f"23:30-00:30 slot matched {matched}, expected ['wl-any-time', 'wl-wraps']"
+    return None
+
+
+def check_time_range_validation():
+    """Failure message if an out-of-range preferred time is accepted or a valid one rejected, else None."""
+    def accepted(start, end):
+        try:
+            PreferredTimeRange(start=start, end=end)
+            return True
+        except ValidationError:
+            return False
+
+    for start, end in (("99:99", "10:00"), ("24:30", "10:00"), ("24:00", "10:00"), ("09:60", "10:00"),
+                       ("09:00", "24:01"), ("9:00", "10:00")):
+        if accepted(start, end):
+            return f"preferred time range {start}-{end} accepted"
+    for start, end in (("00:00", "23:59"), ("22:00", "24:00")):
+        if not accepted(start, end):
+            return f"preferred time range {start}-{end} rejected"
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=9)
+    args = parser.parse_args()
+
+    failures = [failure for failure in (check_created_at_order(), check_midnight_slot(),
+                                                 check_time_range_validation()) if failure]
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        return 1
+
+    request = WaitlistLoadRequest.model_validate({"entries": waitlist_entries(args.entries)})
+    index = WaitlistIndex()
+    started = time.perf_counter()
+    index.load(request)
+    load_ms = (time.perf_counter() - started) * 1000
+
+    rng = random.Random(args.seed)
+    base = datetime(2026, 1, 5, tzinfo=timezone.utc)
+    queries = []
+    for _ in range(args.queries):
+        start = base + timedelta(days=rng.randrange(14), hours=rng.randint(8, 18), minutes=rng.choice([0, 15, 30, 45]))
+        queries.append(WaitlistMatchRequest(
+            service_id=f"svc-{rng.randrange(40):02d}",
+            practitioner_id=f"prov-{rng.randrange(30):03d}",
+            start_time=start,
+            end_time=start + timedelta(minutes=rng.choice([30, 60])),
+        ))
+
+    started = time.perf_counter()
+    indexed = [index.match(q) for q in queries]
+    indexed_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    scanned = [scan_match(request.entries, q) for q in queries]
+    scan_s = time.perf_counter() - started
+
+    mismatches = sum([m.id for m in a.matches] != b for a, b in zip(indexed, scanned))
+    print(f"Loaded {index.stats().entries} active entries in {load_ms:.0f} ms")
+    print(f"Indexed match: {indexed_s / len(queries) * 1e6:.0f} us/query "
+          f"({sum(r.scanned for r in indexed) / len(queries):.0f} index entries scanned avg)")
+    print(f"Full scan:     {scan_s / len(queries) * 1e6:.0f} us/query ({scan_s / indexed_s:.1f}x slower)")
+
+    started = time.perf_counter()
+    for entry in request.entries[:1000]:
+        index.remove(entry.id)
+        index.upsert(entry)
+    print(f"Remove + upsert: {(time.perf_counter() - started) * 1000:.1f} us per entry")
+
+    if mismatches:
+        print(f"FAIL: {mismatches} queries ranked differently from the full scan")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
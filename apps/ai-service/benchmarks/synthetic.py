@@ -0,0 +1,188 @@
+"""
+Synthetic clinic generator for the AI service benchmarks.
+
+Builds a reproducible week of providers, rooms, resource pools, breaks and
+appointments shaped like a busy multi-room med spa.
+"""
+
+import random
+from datetime import date, datetime, timedelta, timezone
+
+from schemas import OptimizeScheduleRequest
+
+SERVICE_DURATIONS = [15, 30, 30, 45, 60]
+GAPS = [0, 0, 0, 5, 15, 30, 45]
+EQUIPMENT = ["laser", "hydrafacial", "iv_chair", "cryo"]
+
+
+def clinic_week(providers=30, appointments=2000, rooms=36, days=5, seed=42,
+                max_shift_minutes=30, start=datetime(2026, 1, 5, tzinfo=timezone.utc)):
+    """Return an OptimizeScheduleRequest payload (dict) for a synthetic week."""
+    rng = random.Random(seed)
+    day_starts = [start + timedelta(days=d, hours=9) for d in range(days)]
+
+    provider_rows = []
+    breaks = []
+    lunches = {}
+    for p in range(providers):
+        pid = f"prov-{p:03d}"
+        hours = [{"startTime": d.isoformat(), "endTime": (d + timedelta(hours=11)).isoformat()} for d in day_starts]
+        provider_rows.append({"id": pid, "name": f"Provider {p}", "workingHours": hours})
+        for d, day in enumerate(day_starts):
+            lunch = day + timedelta(hours=3, minutes=rng.choice([0, 30, 60]))
+            lunches[p, d] = (lunch, lunch + timedelta(minutes=30))
+            breaks.append({
+                "practitionerId": pid,
+                "type": "lunch",
+                "startTime": lunch.isoformat(),
+                "endTime": (lunch + timedelta(minutes=30)).isoformat(),
+            })
+
+    room_rows = [
+        {
+            "id": f"room-{r:02d}",
+            "name": f"Room {r}",
+            "capacity": 2 if r % 5 == 0 else 1,
+            "bufferMinutes": rng.choice([0, 0, 5]),
+            "equipment": [EQUIPMENT[r % len(EQUIPMENT)]] if r % 3 == 0 else [],
+        }
+        for r in range(rooms)
+    ]
+
+    pools = [
+        {
+            "id": "pool-laser",
+            "name": "Laser Machines",
+            "defaultBufferMinutes": 5,
+            "resources": [{"id": f"laser-{i}"} for i in range(4)],
+        },
+        {
+            "id": "pool-beds",
+            "name": "Treatment Beds",
+            "resources": [{"id": f"bed-{i}"} for i in range(6)],
+        },
+    ]
+
+    # Lay each provider-day out back to back with realistic gaps, then
+    # sprinkle in double-bookings and room clashes for the solver to fix.
+    appt_rows = []
+    slots = [(p, d) for p in range(providers) for d in range(days)]
+    per_slot = [appointments // len(slots)] * len(slots)
+    for i in range(appointments - sum(per_slot)):
+        per_slot[i % len(slots)] += 1
+
+    for (p, d), count in zip(slots, per_slot):
+        pid = f"prov-{p:03d}"
+        home_room = f"room-{p % rooms:02d}"
+        cursor = day_starts[d]
+        close = cursor + timedelta(hours=11)
+        prev_begin = None
+        for _ in range(count):
+            duration = rng.choice(SERVICE_DURATIONS)
+            begin = cursor + timedelta(minutes=rng.choice(GAPS))
+            lunch_start, lunch_end = lunches[p, d]
+            if begin < lunch_end and begin + timedelta(minutes=duration) > lunch_start:
+                begin = lunch_end
+            if prev_begin is not None and rng.random() < 0.05:
+                begin = prev_begin + timedelta(minutes=10)  # double-booked provider
+            if begin + timedelta(minutes=duration) > close:
+                begin = close - timedelta(minutes=duration)
+            prev_begin = begin
+            cursor = max(cursor, begin + timedelta(minutes=duration))
+
+            a = len(appt_rows)
+            row = {
+                "id": f"appt-{a:05d}",
+                "practitionerId": pid,
+                "roomId": home_room if rng.random() > 0.05 else f"room-{rng.randrange(rooms):02d}",
+                "startTime": begin.isoformat(),
+                "endTime": (begin + timedelta(minutes=duration)).isoformat(),
+                "duration": duration,
+                "postTreatmentTime": rng.choice([0, 0, 5]),
+                "status": rng.choices(["scheduled", "confirmed", "arrived", "cancelled"], [60, 30, 5, 5])[0],
+            }
+            roll = rng.random()
+            if roll < 0.10:
+                row["resources"] = [{"resourcePoolId": "pool-laser"}]
+            elif roll < 0.25:
+                row["resources"] = [{"resourceId": f"bed-{rng.randrange(6)}"}]
+            appt_rows.append(row)
+
+    return {
+        "locationId": "loc-bench",
+        "providers": provider_rows,
+        "rooms": room_rows,
+        "resourcePools": pools,
+        "breaks": breaks,
+        "appointments": appt_rows,
+        "maxShiftMinutes": max_shift_minutes,
+    }
+
+
+def clinic_week_request(**kwargs):
+    return OptimizeScheduleRequest.model_validate(clinic_week(**kwargs))
+
+
+def appointment_history(appointments=50000, patients=8000, seed=11,
+                        start=datetime(2025, 1, 1, tzinfo=timezone.utc)):
+    """
+    Synthetic appointment-history export rows (packages/types Appointment
+    fields) with a planted no-show signal: short lead times, no deposit,
+    phone/web bookings and patients who no-showed before miss more often.
+    """
+    rng = random.Random(seed)
+    flakiness = [rng.betavariate(1.2, 12) for _ in range(patients)]
+    source_risk = {"app": -0.4, "web": 0.0, "phone": 0.3, "walk_in": -1.5}
+    prior = [0] * patients
+
+    rows = []
+    for a in range(appointments):
+        patient = rng.randrange(patients)
+        begin = start + timedelta(days=rng.uniform(0, 365), hours=rng.randint(9, 18))
+        lead_hours = rng.expovariate(1 / 120)
+        source = rng.choices(list(source_risk), [35, 40, 20, 5])[0]
+        deposit = rng.random() < 0.4
+        logit = (-2.2 + 6 * flakiness[patient] + source_risk[source]
+                 - 0.9 * deposit - 0.25 * min(lead_hours, 720) ** 0.25 + 0.5 * prior[patient])
+        status = "completed"
+        roll = rng.random()
+        if roll < 0.08:
+            status = "cancelled"
+        elif rng.random() < 1 / (1 + 2.718281828 ** -logit):
+            status = "no_show"
+            prior[patient] += 1
+        rows.append({
+            "id": f"hist-{a:06d}",
+            "patientId": f"pat-{patient:05d}",
+            "startTime": begin.isoformat(),
+            "bookedAt": (begin - timedelta(hours=lead_hours)).isoformat(),
+            "bookingSource": source,
+            "depositPaid": deposit,
+            "status": status,
+        })
+    return rows
+
+
+def waitlist_entries(entries=100000, services=40, providers=30, seed=5):
+    """Synthetic waitlist_entries rows with mixed date, weekday and time-range preferences."""
+    rng = random.Random(seed)
+    base = date(2026, 1, 5)
+    rows = []
+    for i in range(entries):
+        row = {
+            "id": f"wl-{i:06d}",
+            "patientId": f"pat-{rng.randrange(entries // 2):06d}",
+            "serviceId": f"svc-{rng.randrange(services):02d}",
+            "priority": rng.choices([0, 1, 2, 5], [70, 15, 10, 5])[0],
+        }
+        if rng.random() < 0.5:
+            row["preferredPractitionerId"] = f"prov-{rng.randrange(providers):03d}"
+        if rng.random() < 0.8:
+            start = rng.randrange(8, 17)
+            row["preferredTimeRange"] = {"start": f"{start:02d}:00", "end": f"{min(start + rng.randint(2, 6), 20):02d}:00"}
+        if rng.random() < 0.3:
+            row["preferredDays"] = rng.sample(range(7), rng.randint(1, 4))
+        if rng.random() < 0.2:
+            row["preferredDates"] = [(base + timedelta(days=rng.randrange(14))).isoformat() for _ in range(3)]
+        rows.append(row)
+    return rows
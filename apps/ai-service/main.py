@@ -1,7 +1,55 @@
-from fastapi import FastAPI
+import asyncio
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
+
+from availability import AvailabilityIndex
+from no_show import NoShowModel
+from waitlist import WaitlistIndex
+from optimizer import optimize_schedule as solve_schedule, solve_json, split_batch
+from schemas import (
+    Appointment,
+    AvailabilityLoadRequest,
+    AvailabilityQuery,
+    AvailabilityResponse,
+    AvailabilityStats,
+    NoShowScoreRequest,
+    NoShowScoreResponse,
+    OptimizeScheduleRequest,
+    OptimizeScheduleResponse,
+    WaitlistEntry,
+    WaitlistLoadRequest,
+    WaitlistMatchRequest,
+    WaitlistMatchResponse,
+    WaitlistStats,
+)
+
+OPTIMIZER_WORKERS = int(os.environ.get("OPTIMIZER_WORKERS", 0)) or os.cpu_count() or 1
+NO_SHOW_MODEL_PATH = os.environ.get(
+    "NO_SHOW_MODEL_PATH", os.path.join(os.path.dirname(__file__), "models", "no_show_model.json")
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # spawn, not fork: the server already has threads running when workers start
+    app.state.process_pool = ProcessPoolExecutor(
+        max_workers=OPTIMIZER_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+    # Loaded once and kept in memory; train it offline with `python no_show.py train`.
+    app.state.no_show_model = NoShowModel.load(NO_SHOW_MODEL_PATH) if os.path.exists(NO_SHOW_MODEL_PATH) else None
+    try:
+        yield
+    finally:
+        app.state.process_pool.shutdown(wait=False, cancel_futures=True)
 
-app = FastAPI(title="Medical Spa AI Service")
+app = FastAPI(title="Medical Spa AI Service", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -10,11 +58,113 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+availability_index = AvailabilityIndex()
+waitlist_index = WaitlistIndex()
+
 @app.get("/health")
 async def health():
     return {"status": "healthy", "service": "ai"}
 
-@app.post("/optimize-schedule")
-async def optimize_schedule(data: dict):
-    # AI optimization logic here
-    return {"optimized": True}
+@app.post("/optimize-schedule", response_model=OptimizeScheduleResponse)
+def optimize_schedule(request: OptimizeScheduleRequest):
+    # CPU-bound: a sync handler runs in FastAPI's threadpool instead of the event loop
+    return solve_schedule(request)
+
+@app.post(
+    "/optimize-schedule/batch",
+    openapi_extra={"requestBody": {"required": True, "content": {"application/json": {"schema": {
+        "type": "object",
+        "required": ["locations"],
+        "properties": {"locations": {"type": "array", "items": {"$ref": "#/components/schemas/OptimizeScheduleRequest"}}},
+    }}}}},
+)
+async def optimize_schedule_batch(request: Request):
+    """
+    Solve one /optimize-schedule payload per location in parallel on the
+    process pool. Results stream back as NDJSON in completion order, one
+    {"index", "locationId", "result" | "error"} object per line. Parsing,
+    validation and serialization all happen in the workers, so the event
+    loop (and /health) stays responsive while a large batch is running.
+    """
+    loop = asyncio.get_running_loop()
+    pool = request.app.state.process_pool
+    body = await request.body()
+    try:
+        locations = await loop.run_in_executor(pool, split_batch, body)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+
+    async def solve(index, location_id, payload):
+        try:
+            return index, location_id, await loop.run_in_executor(pool, solve_json, payload), None
+        except Exception as exc:
+            return index, location_id, None, f"{type(exc).__name__}: {exc}"
+
+    async def stream():
+        tasks = [asyncio.ensure_future(solve(i, *location)) for i, location in enumerate(locations)]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                index, location_id, result, error = await finished
+                head = f'{{"index":{index},"locationId":{json.dumps(location_id)}'
+                if error is None:
+                    yield f'{head},"result":{result}}}\n'
+                else:
+                    yield f'{head},"error":{json.dumps(error)}}}\n'
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@app.post("/availability", response_model=AvailabilityResponse)
+def availability(query: AvailabilityQuery):
+    return availability_index.query(query)
+
+@app.get("/availability/stats", response_model=AvailabilityStats)
+def availability_stats():
+    return availability_index.stats()
+
+@app.post("/availability/load", response_model=AvailabilityStats)
+def availability_load(request: AvailabilityLoadRequest):
+    availability_index.load(request)
+    return availability_index.stats()
+
+@app.post("/availability/appointments", status_code=204)
+def availability_insert(appointment: Appointment):
+    availability_index.add_appointment(appointment)
+
+@app.delete("/availability/appointments/{appointment_id}", status_code=204)
+def availability_cancel(appointment_id: str):
+    if not availability_index.cancel(appointment_id):
+        raise HTTPException(status_code=404, detail="Appointment not indexed")
+
+@app.post("/score/no-show", response_model=NoShowScoreResponse)
+def score_no_show(request: NoShowScoreRequest, http_request: Request):
+    model = http_request.app.state.no_show_model
+    if model is None:
+        raise HTTPException(status_code=503, detail="No-show model not loaded")
+    # Returned as a Response so FastAPI doesn't validate every score again against
+    # response_model, which stays for the schema
+    return Response(model.score(request).model_dump_json(by_alias=True), media_type="application/json")
+
+@app.post("/waitlist/match", response_model=WaitlistMatchResponse)
+def waitlist_match(request: WaitlistMatchRequest):
+    return waitlist_index.match(request)
+
+@app.get("/waitlist/stats", response_model=WaitlistStats)
+def waitlist_stats():
+    return waitlist_index.stats()
+
+@app.post("/waitlist/load", response_model=WaitlistStats)
+def waitlist_load(request: WaitlistLoadRequest):
+    waitlist_index.load(request)
+    return waitlist_index.stats()
+
+@app.post("/waitlist/entries", status_code=204)
+def waitlist_upsert(entry: WaitlistEntry):
+    waitlist_index.upsert(entry)
+
+@app.delete("/waitlist/entries/{entry_id}", status_code=204)
+def waitlist_remove(entry_id: str):
+    if not waitlist_index.remove(entry_id):
+        raise HTTPException(status_code=404, detail="Waitlist entry not indexed")
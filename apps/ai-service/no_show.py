@@ -0,0 +1,226 @@
+"""
+No-show risk model.
+
+Training is offline, from appointment-history exports shaped like
+packages/types/src/appointment.ts (bookingSource, depositPaid, bookedAt,
+startTime, status, patientId), using pandas for feature engineering and a
+scikit-learn logistic regression:
+
+    python no_show.py train history.csv --out models/no_show_model.json
+
+The fitted scaler and coefficients are folded into one weight vector and
+written as JSON, so serving is a single NumPy matrix-vector product over the
+whole batch and never unpickles anything.
+"""
+
+import argparse
+import json
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from schemas import NoShowScore, NoShowScoreResponse
+
+BOOKING_SOURCES = ["app", "web", "phone", "walk_in"]
+FEATURES = [
+    "lead_time_log_hours",
+    "deposit_paid",
+    *(f"source_{source}" for source in BOOKING_SOURCES),
+    "prior_appointments_log",
+    "prior_no_shows",
+    "prior_no_show_rate",
+    "is_new_patient",
+]
+# Statuses whose outcome is known; everything else is still upcoming.
+OUTCOME_STATUSES = {"completed", "no_show"}
+DEFAULT_THRESHOLDS = {"medium": 0.15, "high": 0.35}
+RISK_LEVELS = np.array(["low", "medium", "high"])
+
+
+def feature_matrix(lead_hours, deposit_paid, booking_source, prior_appointments, prior_no_shows):
+    """Build the (n, len(FEATURES)) matrix from column arrays."""
+    lead_hours = np.clip(np.asarray(lead_hours, dtype=np.float64), 0, None)
+    prior_appointments = np.asarray(prior_appointments, dtype=np.float64)
+    prior_no_shows = np.asarray(prior_no_shows, dtype=np.float64)
+    booking_source = np.asarray(booking_source, dtype=object)
+
+    columns = [
+        np.log1p(lead_hours),
+        np.asarray(deposit_paid, dtype=np.float64),
+        *((booking_source == source).astype(np.float64) for source in BOOKING_SOURCES),
+        np.log1p(prior_appointments),
+        prior_no_shows,
+        prior_no_shows / (prior_appointments + 1.0),
+        (prior_appointments == 0).astype(np.float64),
+    ]
+    return np.column_stack(columns)
+
+
+class NoShowModel:
+    def __init__(self, weights, intercept, thresholds=None, metadata=None):
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.intercept = float(intercept)
+        self.thresholds = {**DEFAULT_THRESHOLDS, **(thresholds or {})}
+        self.metadata = metadata or {}
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r") as f:
+            data = json.load(f)
+        if data.get("features") != FEATURES:
+            raise ValueError(f"Model at {path} was trained on different features")
+        return cls(data["weights"], data["intercept"], data.get("thresholds"), data.get("metadata"))
+
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({
+                "features": FEATURES,
+                "weights": self.weights.tolist(),
+                "intercept": self.intercept,
+                "thresholds": self.thresholds,
+                "metadata": self.metadata,
+            }, f, indent=2)
+
+    def predict_proba(self, X):
+        return 1.0 / (1.0 + np.exp(-(X @ self.weights + self.intercept)))
+
+    def risk_levels(self, probabilities):
+        level = (probabilities >= self.thresholds["medium"]).astype(np.int8)
+        level += probabilities >= self.thresholds["high"]
+        return RISK_LEVELS[level]
+
+    def score(self, request):
+        """Score a NoShowScoreRequest in one vectorized pass."""
+        appts = request.appointments
+        n = len(appts)
+        start = np.fromiter((a.start_time.timestamp() for a in appts), np.float64, n)
+        booked = np.fromiter(
+            ((a.booked_at or a.start_time).timestamp() for a in appts), np.float64, n
+        )
+        X = feature_matrix(
+            lead_hours=(start - booked) / 3600.0,
+            deposit_paid=np.fromiter((a.deposit_paid for a in appts), np.float64, n),
+            booking_source=[a.booking_source for a in appts],
+            prior_appointments=np.fromiter((a.prior_appointments for a in appts), np.float64, n),
+            prior_no_shows=np.fromiter((a.prior_no_shows for a in appts), np.float64, n),
+        )
+        probabilities = self.predict_proba(X)
+        levels = self.risk_levels(probabilities)
+        # Inputs are already validated, and /score/no-show serializes this straight to
+        # JSON, so the thousands of output rows are never validated.
+        return NoShowScoreResponse.model_construct(
+            trained_at=self.metadata.get("trained_at"),
+            scores=[
+                NoShowScore.model_construct(id=a.id, probability=p, risk=r)
+                for a, p, r in zip(appts, np.round(probabilities, 4).tolist(), levels.tolist())
+            ],
+        )
+
+
+# ---------------------------------------------------------------------------
+# Offline training
+# ---------------------------------------------------------------------------
+
+def history_features(history):
+    """
+    Turn an appointment-history DataFrame into (X, y) for rows with a known
+    outcome. Prior counts come from each patient's earlier rows, so the
+    features match what the scorer is given for upcoming appointments.
+    """
+    import pandas as pd
+
+    df = history.copy()
+    df["startTime"] = pd.to_datetime(df["startTime"], utc=True)
+    booked = df["bookedAt"] if "bookedAt" in df else df.get("createdAt", df["startTime"])
+    df["bookedAt"] = pd.to_datetime(booked, utc=True).fillna(df["startTime"])
+    df["depositPaid"] = df.get("depositPaid", False)
+    df["depositPaid"] = df["depositPaid"].fillna(False).astype(bool)
+    df["bookingSource"] = df.get("bookingSource", "web")
+    df = df.sort_values(["patientId", "startTime"], kind="stable")
+
+    has_outcome = df["status"].isin(OUTCOME_STATUSES).astype(np.int64)
+    no_show = (df["status"] == "no_show").astype(np.int64)
+    by_patient = df["patientId"]
+    prior_appointments = has_outcome.groupby(by_patient).cumsum() - has_outcome
+    prior_no_shows = no_show.groupby(by_patient).cumsum() - no_show
+
+    X = feature_matrix(
+        lead_hours=(df["startTime"] - df["bookedAt"]).dt.total_seconds().to_numpy() / 3600.0,
+        deposit_paid=df["depositPaid"].to_numpy(),
+        booking_source=df["bookingSource"].to_numpy(),
+        prior_appointments=prior_appointments.to_numpy(),
+        prior_no_shows=prior_no_shows.to_numpy(),
+    )
+    mask = has_outcome.to_numpy().astype(bool)
+    return X[mask], no_show.to_numpy()[mask]
+
+
+def train(history, thresholds=None):
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.metrics import roc_auc_score
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import StandardScaler
+
+    X, y = history_features(history)
+    if len(np.unique(y)) < 2:
+        raise ValueError("History needs both completed and no_show outcomes to train on")
+
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=0, stratify=y)
+    scaler = StandardScaler().fit(X_train)
+    clf = LogisticRegression(max_iter=1000)
+    clf.fit(scaler.transform(X_train), y_train)
+
+    # Fold the scaler into the linear model: w·((x - mu) / sigma) + b
+    scale = np.where(scaler.scale_ == 0, 1.0, scaler.scale_)
+    weights = clf.coef_[0] / scale
+    intercept = clf.intercept_[0] - np.dot(weights, scaler.mean_)
+
+    model = NoShowModel(weights, intercept, thresholds)
+    model.metadata = {
+        "trained_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "rows": int(len(y)),
+        "no_show_rate": round(float(y.mean()), 4),
+        "test_auc": round(float(roc_auc_score(y_test, model.predict_proba(X_test))), 4),
+    }
+    return model
+
+
+def read_history(path):
+    import pandas as pd
+
+    path = Path(path)
+    if path.suffix == ".csv":
+        return pd.read_csv(path)
+    with open(path, "r") as f:
+        data = json.load(f)
+    # Accept a bare list or an export wrapper like {"appointments": [...]}
+    return pd.DataFrame(data.get("appointments", data) if isinstance(data, dict) else data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the no-show risk model")
+    sub = parser.add_subparsers(dest="command", required=True)
+    train_cmd = sub.add_parser("train", help="Fit from an appointment-history export (.csv or .json)")
+    train_cmd.add_argument("history")
+    train_cmd.add_argument("--out", default="models/no_show_model.json")
+    train_cmd.add_argument("--medium", type=float, default=DEFAULT_THRESHOLDS["medium"])
+    train_cmd.add_argument("--high", type=float, default=DEFAULT_THRESHOLDS["high"])
+    args = parser.parse_args()
+
+    history = read_history(args.history)
+    print(f"Loaded {len(history)} appointments from {args.history}")
+    model = train(history, {"medium": args.medium, "high": args.high})
+    model.save(args.out)
+    meta = model.metadata
+    print(f"Trained on {meta['rows']} outcomes (no-show rate {meta['no_show_rate']:.1%}), "
+          f"held-out AUC {meta['test_auc']:.3f}")
+    print(f"Model saved to: {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,405 @@
+"""
+Constraint-based schedule optimizer.
+
+Appointments are list-scheduled in start-time order onto per-lane timelines
+(one lane per provider, per unit of room capacity and per pooled resource).
+Each appointment is pulled towards its provider's previous end time to close
+idle gaps, within its allowed shift window, and moved to another room or
+pooled resource when its booked one is taken. Locked appointments (already
+arrived / in progress / completed) are never moved.
+"""
+
+import json
+import time
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import timedelta, timezone
+
+from pydantic import ValidationError
+
+from schemas import (
+    OptimizeScheduleRequest,
+    OptimizeScheduleResponse,
+    ScheduledAppointment,
+    ScheduleMetrics,
+)
+
+SKIPPED_STATUSES = {"cancelled", "no_show", "deleted"}
+LOCKED_STATUSES = {"arrived", "checked_in", "in_progress", "completed"}
+
+NEG_INF = -(1 << 62)
+POS_INF = 1 << 62
+
+
+def utc_minutes(dt):
+    """Minutes since the epoch; naive datetimes are taken to be UTC, never server-local time."""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp()) // 60
+
+
+class Timeline:
+    """Sorted, non-overlapping busy intervals [start, end) in minutes."""
+
+    __slots__ = ("key", "starts", "ends")
+
+    def __init__(self, key):
+        self.key = key
+        self.starts = []
+        self.ends = []
+
+    def earliest_fit(self, t, duration):
+        """Smallest start >= t such that [start, start + duration) is free."""
+        starts, ends = self.starts, self.ends
+        i = bisect_right(ends, t)
+        n = len(starts)
+        while i < n and starts[i] < t + duration:
+            if ends[i] > t:
+                t = ends[i]
+            i += 1
+        return t
+
+    def is_free(self, start, end):
+        i = bisect_right(self.ends, start)
+        return i == len(self.starts) or self.starts[i] >= end
+
+    def reserve(self, start, end):
+        """Mark [start, end) busy, merging with any overlapping intervals."""
+        if end <= start:
+            return
+        starts, ends = self.starts, self.ends
+        lo = bisect_left(ends, start)
+        hi = bisect_right(starts, end)
+        if lo < hi:
+            start = min(start, starts[lo])
+            end = max(end, ends[hi - 1])
+        starts[lo:hi] = [start]
+        ends[lo:hi] = [end]
+
+
+class _Item:
+    __slots__ = (
+        "appt", "start", "duration", "post", "day", "locked",
+        "lo", "hi", "new_start", "room_id", "resource_ids", "conflict",
+    )
+
+
+class ScheduleOptimizer:
+    def __init__(self, request: OptimizeScheduleRequest):
+        self.request = request
+        self.slot = request.slot_minutes
+
+        self.provider_lanes = {}
+        for provider in request.providers:
+            lane = Timeline(provider.id)
+            windows = sorted((utc_minutes(w.start_time), utc_minutes(w.end_time)) for w in provider.working_hours)
+            if windows:
+                # Everything outside working hours is blocked.
+                cursor = NEG_INF
+                for start, end in windows:
+                    lane.reserve(cursor, start)
+                    cursor = max(cursor, end)
+                lane.reserve(cursor, POS_INF)
+            self.provider_lanes[provider.id] = lane
+
+        self.breaks_by_provider = defaultdict(list)
+        for brk in request.breaks:
+            start, end = utc_minutes(brk.start_time), utc_minutes(brk.end_time)
+            self._provider_lane(brk.practitioner_id).reserve(start, end)
+            self.breaks_by_provider[brk.practitioner_id].append((start, end))
+
+        self.rooms = {room.id: room for room in request.rooms}
+        self.room_lanes = {
+            room.id: [Timeline(room.id) for _ in range(room.capacity)]
+            for room in request.rooms
+        }
+
+        self.pool_lanes = {}
+        self.resource_lane = {}
+        self.resource_pool = {}
+        self.resource_buffer = {}
+        for pool in request.resource_pools:
+            lanes = []
+            for resource in pool.resources:
+                lane = Timeline(resource.id)
+                self.resource_lane[resource.id] = lane
+                self.resource_pool[resource.id] = pool.id
+                self.resource_buffer[resource.id] = (
+                    resource.buffer_minutes if resource.buffer_minutes is not None
+                    else pool.default_buffer_minutes
+                )
+                if resource.is_active:
+                    lanes.append(lane)
+            self.pool_lanes[pool.id] = lanes
+
+    def _provider_lane(self, provider_id):
+        lane = self.provider_lanes.get(provider_id)
+        if lane is None:
+            lane = self.provider_lanes[provider_id] = Timeline(provider_id)
+        return lane
+
+    def _candidate_rooms(self, appt):
+        """Room lanes to try, booked room first."""
+        booked = appt.room_id
+        if booked and (not self.request.allow_room_changes or booked not in self.rooms):
+            return self.room_lanes.get(booked, [])
+        if not booked and not appt.required_equipment:
+            return []
+
+        lanes = list(self.room_lanes.get(booked, [])) if booked else []
+        needed = set(appt.required_equipment)
+        for room in self.request.rooms:
+            if room.id == booked or not room.is_active:
+                continue
+            if appt.location_id and room.location_id and room.location_id != appt.location_id:
+                continue
+            if needed.issubset(room.equipment):
+                lanes.extend(self.room_lanes[room.id])
+        return lanes
+
+    def _candidate_resources(self, appt):
+        """One list of interchangeable resource lanes per requirement, booked resource first."""
+        groups = []
+        for req in appt.resources:
+            pool_id = req.resource_pool_id or self.resource_pool.get(req.resource_id)
+            booked = self.resource_lane.get(req.resource_id) if req.resource_id else None
+            lanes = [booked] if booked else []
+            if pool_id:
+                lanes.extend(lane for lane in self.pool_lanes.get(pool_id, []) if lane is not booked)
+            if lanes:
+                groups.append(lanes)
+        return groups
+
+    def _room_span(self, item, lane):
+        room = self.rooms.get(lane.key)
+        buffer = room.buffer_minutes if room else 0
+        return item.duration + item.post + buffer
+
+    def _resource_span(self, item, lane):
+        return item.duration + self.resource_buffer.get(lane.key, 0)
+
+    def _find_slot(self, item, provider, room_lanes, resource_groups, target):
+        """Earliest feasible grid-aligned start >= target, or None past the window."""
+        slot, origin = self.slot, item.start
+        t = target
+        while True:
+            offset = t - origin
+            if offset % slot:
+                t = origin + (offset // slot + 1) * slot
+            if t > item.hi:
+                return None
+
+            fit = provider.earliest_fit(t, item.duration)
+            room = None
+            if room_lanes:
+                # Room spans differ per room only by buffer, so search with each room's own span.
+                best, room = POS_INF, None
+                for lane in room_lanes:
+                    cand = lane.earliest_fit(fit, self._room_span(item, lane))
+                    if cand < best:
+                        best, room = cand, lane
+                        if cand == fit:
+                            break
+                fit = best
+            chosen = []
+            for lanes in resource_groups:
+                best, pick = POS_INF, None
+                for lane in lanes:
+                    cand = lane.earliest_fit(fit, self._resource_span(item, lane))
+                    if cand < best:
+                        best, pick = cand, lane
+                        if cand == fit:
+                            break
+                fit = best
+                chosen.append(pick)
+
+            if fit == t:
+                return t, room, chosen
+            t = fit
+
+    def _commit(self, item, provider, room, resources, start):
+        provider.reserve(start, start + item.duration)
+        if room is not None:
+            room.reserve(start, start + self._room_span(item, room))
+        for lane in resources:
+            lane.reserve(start, start + self._resource_span(item, lane))
+        item.new_start = start
+        item.room_id = room.key if room is not None else item.appt.room_id
+        item.resource_ids = [lane.key for lane in resources]
+
+    def _build_items(self):
+        default_shift = self.request.max_shift_minutes
+        items, skipped = [], 0
+        for appt in self.request.appointments:
+            if appt.status in SKIPPED_STATUSES:
+                skipped += 1
+                continue
+            item = _Item()
+            item.appt = appt
+            item.start = utc_minutes(appt.start_time)
+            item.duration = appt.duration or (utc_minutes(appt.end_time) - item.start)
+            item.post = appt.post_treatment_time
+            item.day = (appt.practitioner_id, appt.start_time.date())
+            item.locked = appt.status in LOCKED_STATUSES
+            shift = 0 if item.locked else (
+                appt.max_shift_minutes if appt.max_shift_minutes is not None else default_shift
+            )
+            item.lo = item.start - shift
+            item.hi = item.start + shift
+            item.conflict = None
+            items.append(item)
+        return items, skipped
+
+    def solve(self):
+        items, skipped = self._build_items()
+        order = sorted(items, key=lambda it: (not it.locked, it.start, -it.duration))
+        last_end = {}
+
+        for item in order:
+            appt = item.appt
+            provider = self._provider_lane(appt.practitioner_id)
+            room_lanes = self._candidate_rooms(appt)
+            resource_groups = self._candidate_resources(appt)
+
+            # Pull towards the provider's previous end to close the gap, but
+            # never earlier than the window allows nor later than booked.
+            prev = last_end.get(item.day)
+            target = item.start if prev is None else min(max(prev, item.lo), item.start)
+
+            found = self._find_slot(item, provider, room_lanes, resource_groups, target)
+            if found is None:
+                # Keep the booking as-is and report it.
+                start = item.start
+                room = next((lane for lane in room_lanes if lane.is_free(start, start + self._room_span(item, lane))),
+                            room_lanes[0] if room_lanes else None)
+                resources = [
+                    next((lane for lane in lanes if lane.is_free(start, start + self._resource_span(item, lane))), lanes[0])
+                    for lanes in resource_groups
+                ]
+                item.conflict = "locked_conflict" if item.locked else "no_feasible_slot"
+            else:
+                start, room, resources = found
+            self._commit(item, provider, room, resources, start)
+            last_end[item.day] = max(last_end.get(item.day, NEG_INF), start + item.duration)
+
+        return items, skipped
+
+    def idle_minutes(self, items, use_new):
+        """Gaps between consecutive appointments per provider-day, excluding break time."""
+        by_day = defaultdict(list)
+        for item in items:
+            start = item.new_start if use_new else item.start
+            by_day[item.day].append((start, start + item.duration))
+
+        total = 0
+        for (provider_id, _), spans in by_day.items():
+            spans.sort()
+            breaks = self.breaks_by_provider.get(provider_id, ())
+            reach = spans[0][1]
+            for start, end in spans[1:]:
+                if start > reach:
+                    gap = start - reach
+                    for b_start, b_end in breaks:
+                        overlap = min(b_end, start) - max(b_start, reach)
+                        if overlap > 0:
+                            gap -= overlap
+                    total += max(gap, 0)
+                reach = max(reach, end)
+        return total
+
+    def room_conflicts(self, items, use_new):
+        """Appointments that start while their room is already at capacity."""
+        events = defaultdict(list)
+        for item in items:
+            room_id = item.room_id if use_new else item.appt.room_id
+            if not room_id:
+                continue
+            room = self.rooms.get(room_id)
+            buffer = room.buffer_minutes if room else 0
+            start = item.new_start if use_new else item.start
+            events[room_id].append((start, 1))
+            events[room_id].append((start + item.duration + item.post + buffer, -1))
+
+        conflicts = 0
+        for room_id, room_events in events.items():
+            room = self.rooms.get(room_id)
+            capacity = room.capacity if room else 1
+            room_events.sort()  # ends (-1) sort before starts (+1) at the same minute
+            active = 0
+            for _, delta in room_events:
+                if delta > 0 and active >= capacity:
+                    conflicts += 1
+                active += delta
+        return conflicts
+
+
+def optimize_schedule(request: OptimizeScheduleRequest) -> OptimizeScheduleResponse:
+    started = time.perf_counter()
+    optimizer = ScheduleOptimizer(request)
+    items, skipped = optimizer.solve()
+
+    scheduled = []
+    moved = room_changes = unresolved = 0
+    for item in items:
+        appt = item.appt
+        delta = timedelta(minutes=item.new_start - item.start)
+        is_moved = delta != timedelta(0)
+        room_changed = item.room_id != appt.room_id
+        moved += is_moved
+        room_changes += room_changed
+        unresolved += item.conflict is not None
+        scheduled.append(ScheduledAppointment(
+            id=appt.id,
+            practitioner_id=appt.practitioner_id,
+            room_id=item.room_id,
+            resource_ids=item.resource_ids,
+            start_time=appt.start_time + delta,
+            end_time=appt.start_time + delta + timedelta(minutes=item.duration),
+            moved=is_moved,
+            room_changed=room_changed,
+            conflict=item.conflict,
+        ))
+
+    metrics = ScheduleMetrics(
+        appointments=len(items),
+        skipped=skipped,
+        moved=moved,
+        room_changes=room_changes,
+        unresolved=unresolved,
+        idle_minutes_before=optimizer.idle_minutes(items, use_new=False),
+        idle_minutes_after=optimizer.idle_minutes(items, use_new=True),
+        room_conflicts_before=optimizer.room_conflicts(items, use_new=False),
+        room_conflicts_after=optimizer.room_conflicts(items, use_new=True),
+    )
+    return OptimizeScheduleResponse(
+        optimized=True,
+        location_id=request.location_id,
+        appointments=scheduled,
+        metrics=metrics,
+        solve_ms=round((time.perf_counter() - started) * 1000, 3),
+    )
+
+
+# Process-pool entry points for /optimize-schedule/batch. They take and return
+# JSON text so the server process never parses, validates or serializes a
+# location itself and its event loop stays free.
+
+def split_batch(body: bytes) -> list:
+    """Split a batch body into (locationId, location JSON) pairs."""
+    data = json.loads(body)
+    locations = data.get("locations") if isinstance(data, dict) else None
+    if not isinstance(locations, list) or not locations:
+        raise ValueError('Body must be {"locations": [...]} with at least one location')
+    return [
+        (location.get("locationId") if isinstance(location, dict) else None, json.dumps(location))
+        for location in locations
+    ]
+
+
+def solve_json(payload: str) -> str:
+    try:
+        request = OptimizeScheduleRequest.model_validate_json(payload)
+    except ValidationError as exc:
+        # ValidationError does not pickle back across the pool.
+        raise ValueError(str(exc)) from None
+    return optimize_schedule(request).model_dump_json(by_alias=True)
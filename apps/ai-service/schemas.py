@@ -0,0 +1,283 @@
+"""
+Request/response models for the AI service.
+
+Field names mirror the Drizzle tables in packages/db/src/schema and are
+exposed in camelCase on the wire, so payloads can be built straight from
+query results.
+"""
+
+from datetime import datetime
+from typing import Literal, Optional
+
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from pydantic.alias_generators import to_camel
+
+
+class CamelModel(BaseModel):
+    model_config = ConfigDict(alias_generator=to_camel, populate_by_name=True)
+
+
+class TimeWindow(CamelModel):
+    start_time: datetime
+    end_time: datetime
+
+    @model_validator(mode="after")
+    def check_order(self):
+        if self.end_time <= self.start_time:
+            raise ValueError("endTime must be after startTime")
+        return self
+
+
+# ---------------------------------------------------------------------------
+# Schedule optimization
+# ---------------------------------------------------------------------------
+
+class Provider(CamelModel):
+    """A practitioner (users table). Without working hours they are always available."""
+    id: str
+    name: Optional[str] = None
+    working_hours: list[TimeWindow] = []
+
+
+class Room(CamelModel):
+    """rooms table"""
+    id: str
+    location_id: Optional[str] = None
+    name: Optional[str] = None
+    capacity: int = Field(1, ge=1)
+    buffer_minutes: int = Field(0, ge=0)
+    is_active: bool = True
+    equipment: list[str] = []
+
+
+class Resource(CamelModel):
+    """resources table"""
+    id: str
+    name: Optional[str] = None
+    buffer_minutes: Optional[int] = Field(None, ge=0)
+    is_active: bool = True
+
+
+class ResourcePool(CamelModel):
+    """resource_pools table, with its resources inlined"""
+    id: str
+    location_id: Optional[str] = None
+    name: Optional[str] = None
+    default_buffer_minutes: int = Field(0, ge=0)
+    resources: list[Resource] = []
+
+
+class Break(TimeWindow):
+    """breaks table"""
+    id: Optional[str] = None
+    practitioner_id: str
+    type: Optional[Literal["lunch", "personal", "meeting", "training", "out_of_office", "other"]] = None
+
+
+class AppointmentResource(CamelModel):
+    """
+    appointment_resources row. A booked resourceId is kept when possible;
+    resourcePoolId lets the solver pick any free resource from the pool.
+    """
+    resource_id: Optional[str] = None
+    resource_pool_id: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_target(self):
+        if not self.resource_id and not self.resource_pool_id:
+            raise ValueError("resourceId or resourcePoolId is required")
+        return self
+
+
+class Appointment(TimeWindow):
+    """appointments table (scheduling-relevant columns only)"""
+    id: str
+    practitioner_id: str
+    patient_id: Optional[str] = None
+    service_id: Optional[str] = None
+    location_id: Optional[str] = None
+    room_id: Optional[str] = None
+    duration: Optional[int] = Field(None, gt=0)  # minutes, derived from times if omitted
+    post_treatment_time: int = Field(0, ge=0)
+    status: str = "scheduled"
+    resources: list[AppointmentResource] = []
+    required_equipment: list[str] = []
+    max_shift_minutes: Optional[int] = Field(None, ge=0)  # overrides the request default
+
+
+class OptimizeScheduleRequest(CamelModel):
+    location_id: Optional[str] = None
+    providers: list[Provider] = []
+    rooms: list[Room] = []
+    resource_pools: list[ResourcePool] = []
+    breaks: list[Break] = []
+    appointments: list[Appointment]
+    max_shift_minutes: int = Field(0, ge=0)
+    slot_minutes: int = Field(5, ge=1, le=60)
+    allow_room_changes: bool = True
+
+
+class ScheduledAppointment(CamelModel):
+    id: str
+    practitioner_id: str
+    room_id: Optional[str] = None
+    resource_ids: list[str] = []
+    start_time: datetime
+    end_time: datetime
+    moved: bool = False
+    room_changed: bool = False
+    conflict: Optional[str] = None
+
+
+class ScheduleMetrics(CamelModel):
+    appointments: int
+    skipped: int
+    moved: int
+    room_changes: int
+    unresolved: int
+    idle_minutes_before: int
+    idle_minutes_after: int
+    room_conflicts_before: int
+    room_conflicts_after: int
+
+
+class OptimizeScheduleResponse(CamelModel):
+    optimized: bool
+    location_id: Optional[str] = None
+    appointments: list[ScheduledAppointment]
+    metrics: ScheduleMetrics
+    solve_ms: float
+
+
+# ---------------------------------------------------------------------------
+# Availability
+# ---------------------------------------------------------------------------
+
+class AvailabilityLoadRequest(CamelModel):
+    """Bulk (re)load of the availability index, same shapes as the optimizer."""
+    providers: list[Provider] = []
+    rooms: list[Room] = []
+    resource_pools: list[ResourcePool] = []
+    breaks: list[Break] = []
+    appointments: list[Appointment] = []
+    replace: bool = True
+
+
+class AvailabilityQuery(TimeWindow):
+    """Open slots inside [startTime, endTime) for a service of the given length."""
+    duration_minutes: int = Field(gt=0)
+    post_treatment_minutes: int = Field(0, ge=0)
+    provider_ids: list[str] = []  # any of; empty means any indexed provider
+    room_ids: list[str] = []  # any of; empty means no room requirement
+    resource_pool_ids: list[str] = []  # all of
+    step_minutes: int = Field(15, ge=5)
+    limit: int = Field(100, ge=1, le=5000)
+
+
+class AvailableSlot(CamelModel):
+    start_time: datetime
+    end_time: datetime
+    provider_ids: list[str]
+    room_ids: list[str] = []
+
+
+class AvailabilityResponse(CamelModel):
+    slots: list[AvailableSlot]
+    query_ms: float
+
+
+class AvailabilityStats(CamelModel):
+    providers: int
+    rooms: int
+    resources: int
+    bookings: int
+    bitmaps: int
+
+
+# ---------------------------------------------------------------------------
+# No-show scoring
+# ---------------------------------------------------------------------------
+
+class NoShowAppointment(CamelModel):
+    """An upcoming appointment (packages/types Appointment) plus the patient's history counts."""
+    id: str
+    start_time: datetime
+    booked_at: Optional[datetime] = None
+    booking_source: Literal["app", "web", "phone", "walk_in"] = "web"
+    deposit_paid: bool = False
+    prior_appointments: int = Field(0, ge=0)  # completed + no_show
+    prior_no_shows: int = Field(0, ge=0)
+
+
+class NoShowScoreRequest(CamelModel):
+    appointments: list[NoShowAppointment] = Field(max_length=50000)
+
+
+class NoShowScore(CamelModel):
+    id: str
+    probability: float
+    risk: Literal["low", "medium", "high"]  # appointments.no_show_risk
+
+
+class NoShowScoreResponse(CamelModel):
+    trained_at: Optional[str] = None
+    scores: list[NoShowScore]
+
+
+# ---------------------------------------------------------------------------
+# Waitlist matching
+# ---------------------------------------------------------------------------
+
+class PreferredTimeRange(CamelModel):
+    """Local wall-clock times, "HH:MM" (end may be "24:00"). end < start wraps past midnight."""
+    start: str = Field(pattern=r"^([01]\d|2[0-3]):[0-5]\d$")
+    end: str = Field(pattern=r"^(([01]\d|2[0-3]):[0-5]\d|24:00)$")
+
+
+class WaitlistEntry(CamelModel):
+    """waitlist_entries table"""
+    id: str
+    patient_id: str
+    service_id: str
+    preferred_practitioner_id: Optional[str] = None
+    location_id: Optional[str] = None
+    preferred_dates: list[str] = []  # ISO dates
+    preferred_time_range: Optional[PreferredTimeRange] = None
+    preferred_days: list[int] = []  # 0-6, Sunday = 0
+    status: Literal["active", "offered", "booked", "expired", "cancelled"] = "active"
+    priority: int = 0
+    expires_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+
+
+class WaitlistLoadRequest(CamelModel):
+    entries: list[WaitlistEntry]
+    replace: bool = True
+
+
+class WaitlistMatchRequest(TimeWindow):
+    """A freed slot, typically from a cancelled appointment."""
+    service_id: str
+    practitioner_id: Optional[str] = None
+    location_id: Optional[str] = None
+    include_other_practitioners: bool = False
+    limit: int = Field(10, ge=1, le=500)
+
+
+class WaitlistMatch(CamelModel):
+    id: str
+    patient_id: str
+    priority: int
+    preferred_practitioner_id: Optional[str] = None
+    practitioner_match: bool
+
+
+class WaitlistMatchResponse(CamelModel):
+    matches: list[WaitlistMatch]
+    scanned: int  # index entries examined before the limit was reached
+    query_ms: float
+
+
+class WaitlistStats(CamelModel):
+    entries: int
+    services: int
@@ -0,0 +1,239 @@
+"""
+Waitlist-to-cancellation matching.
+
+Active waitlist entries are indexed per (service, preferred practitioner) in
+a segment tree over minute-of-day: each preferred time range is stored on
+the O(log D) tree nodes that exactly cover it, and every node keeps its
+entries sorted by rank (priority, then waitlist age). The entries whose
+range contains a freed slot sit on one leaf-to-root path, so matching
+lazily merges those ~11 sorted lists and stops after `limit` entries pass
+the date, weekday, location and expiry checks instead of ranking the whole
+waitlist.
+"""
+
+import itertools
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import timezone
+from heapq import merge
+
+from schemas import WaitlistMatch, WaitlistMatchResponse, WaitlistStats
+
+DAY_MINUTES = 24 * 60
+TREE_LEAVES = 2048  # power of two >= DAY_MINUTES
+
+
+def as_utc(dt):
+    """Naive datetimes are taken to be UTC, so they compare with aware ones."""
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def parse_hhmm(value):
+    """Minute of day; PreferredTimeRange has already checked the format and ranges."""
+    hours, minutes = value.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def entry_windows(entry):
+    """Minute-of-day [lo, hi) windows for an entry, splitting ranges that wrap midnight."""
+    if entry.preferred_time_range is None:
+        return [(0, DAY_MINUTES)]
+    lo = parse_hhmm(entry.preferred_time_range.start)
+    hi = parse_hhmm(entry.preferred_time_range.end)
+    if lo < hi:
+        return [(lo, hi)]
+    if lo == hi:
+        return [(0, DAY_MINUTES)]
+    return [(lo, DAY_MINUTES), (0, hi)]
+
+
+def slot_windows(minute, duration):
+    """Minute-of-day [lo, hi) pieces of a slot, split where it crosses midnight."""
+    end = minute + duration
+    if end <= DAY_MINUTES:
+        return [(minute, end)]
+    return [(minute, DAY_MINUTES), (0, min(end - DAY_MINUTES, DAY_MINUTES))]
+
+
+def covers(windows, pieces):
+    return all(any(lo <= a and b <= hi for lo, hi in windows) for a, b in pieces)
+
+
+class MinuteSegmentTree:
+    """Segment tree over minute-of-day holding rank-sorted (key, entry id) lists."""
+
+    __slots__ = ("nodes",)
+
+    def __init__(self):
+        self.nodes = {}  # node index -> sorted [(rank key, entry id)]
+
+    @staticmethod
+    def _cover(lo, hi):
+        lo += TREE_LEAVES
+        hi += TREE_LEAVES
+        while lo < hi:
+            if lo & 1:
+                yield lo
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                yield hi
+            lo >>= 1
+            hi >>= 1
+
+    def add(self, lo, hi, item):
+        for node in self._cover(lo, hi):
+            insort(self.nodes.setdefault(node, []), item)
+
+    def remove(self, lo, hi, item):
+        for node in self._cover(lo, hi):
+            items = self.nodes.get(node)
+            if items:
+                i = bisect_left(items, item)
+                if i < len(items) and items[i] == item:
+                    del items[i]
+                if not items:
+                    del self.nodes[node]
+
+    def stab(self, minute):
+        """Rank-ordered stream of every item whose range contains minute."""
+        lists = []
+        node = minute + TREE_LEAVES
+        while node:
+            items = self.nodes.get(node)
+            if items:
+                lists.append(items)
+            node >>= 1
+        return merge(*lists)
+
+
+def _with_rank(items, rank):
+    for neg_priority, seq, entry_id in items:
+        yield neg_priority, rank, seq, entry_id
+
+
+class _Indexed:
+    __slots__ = ("entry", "windows", "dates", "days", "seq")
+
+
+class WaitlistIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._seq = itertools.count()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}  # entry id -> _Indexed
+            self._trees = {}  # service id -> {preferred practitioner id or None: MinuteSegmentTree}
+
+    def load(self, request):
+        with self._lock:
+            if request.replace:
+                self.clear()
+            # Oldest first so ties keep waitlist order; entries without created_at go last.
+            for entry in sorted(request.entries,
+                                key=lambda e: (e.created_at is None, e.created_at and as_utc(e.created_at))):
+                self.upsert(entry)
+
+    def upsert(self, entry):
+        """Insert or replace an entry; anything no longer active is dropped from the index."""
+        with self._lock:
+            previous = self._entries.get(entry.id)
+            self.remove(entry.id)
+            if entry.status != "active":
+                return
+            item = _Indexed()
+            item.entry = entry
+            item.windows = entry_windows(entry)
+            item.dates = frozenset(entry.preferred_dates)
+            item.days = frozenset(entry.preferred_days)
+            item.seq = previous.seq if previous else next(self._seq)
+            self._entries[entry.id] = item
+            trees = self._trees.setdefault(entry.service_id, {})
+            tree = trees.setdefault(entry.preferred_practitioner_id, MinuteSegmentTree())
+            for lo, hi in item.windows:
+                tree.add(lo, hi, self._rank_key(item))
+
+    def remove(self, entry_id):
+        with self._lock:
+            item = self._entries.pop(entry_id, None)
+            if item is None:
+                return False
+            entry = item.entry
+            trees = self._trees[entry.service_id]
+            tree = trees[entry.preferred_practitioner_id]
+            for lo, hi in item.windows:
+                tree.remove(lo, hi, self._rank_key(item))
+            if not tree.nodes:
+                del trees[entry.preferred_practitioner_id]
+                if not trees:
+                    del self._trees[entry.service_id]
+            return True
+
+    @staticmethod
+    def _rank_key(item):
+        return (-item.entry.priority, item.seq, item.entry.id)
+
+    def _ranked_streams(self, request, minute):
+        """One rank-ordered stream per acceptable practitioner preference."""
+        for preferred, tree in self._trees.get(request.service_id, {}).items():
+            if preferred is None or request.practitioner_id is None:
+                rank = 1
+            elif preferred == request.practitioner_id:
+                rank = 0
+            elif request.include_other_practitioners:
+                rank = 2
+            else:
+                continue
+            yield _with_rank(tree.stab(minute), rank)
+
+    def match(self, request):
+        started = time.perf_counter()
+        start, end = request.start_time, request.end_time
+        minute = start.hour * 60 + start.minute
+        pieces = slot_windows(minute, int((end - start).total_seconds() // 60))
+        slot_date = start.date().isoformat()
+        slot_day = (start.weekday() + 1) % 7  # JS getDay(): Sunday = 0
+        aware_start = as_utc(start)
+
+        scanned = 0
+        matches = []
+        with self._lock:
+            for _, rank, _, entry_id in merge(*self._ranked_streams(request, minute)):
+                scanned += 1
+                item = self._entries[entry_id]
+                entry = item.entry
+                if not covers(item.windows, pieces):
+                    continue
+                if item.dates and slot_date not in item.dates:
+                    continue
+                if item.days and slot_day not in item.days:
+                    continue
+                if request.location_id and entry.location_id and entry.location_id != request.location_id:
+                    continue
+                if entry.expires_at is not None and as_utc(entry.expires_at) <= aware_start:
+                    continue
+                matches.append(WaitlistMatch(
+                    id=entry.id,
+                    patient_id=entry.patient_id,
+                    priority=entry.priority,
+                    preferred_practitioner_id=entry.preferred_practitioner_id,
+                    practitioner_match=rank == 0,
+                ))
+                if len(matches) >= request.limit:
+                    break
+
+        return WaitlistMatchResponse(
+            matches=matches,
+            scanned=scanned,
+            query_ms=round((time.perf_counter() - started) * 1000, 4),
+        )
+
+    def stats(self):
+        with self._lock:
+            return WaitlistStats(
+                entries=len(self._entries),
+                services=len(self._trees),
+            )
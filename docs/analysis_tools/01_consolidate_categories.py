@@ -2,122 +2,182 @@
 """
 Stage 1: Category Consolidation
 Consolidates all articles within each category into comprehensive summaries
+
+A manifest records (path, mtime, size, content hash) for every article, so a
+rerun only regenerates the categories whose articles changed. Unchanged
+consolidated files are left untouched, byte for byte.
+
+Consolidated files are written as a stream: each article is parsed from disk
+and written out before the next is read, so article bodies are never held
+together and peak memory no longer grows with the total size of the
+content. What is kept per article is metadata (its path and manifest
+entry). The header, which counts the articles that parsed, is written once
+they are all through.
 """
 
+import argparse
+import hashlib
 import os
 import json
+import shutil
+import sys
 from pathlib import Path
-import re
 
-BASE_DIR = Path("/Users/daminirijhwani/medical-spa-platform/docs/mangomint-analysis")
-OUTPUT_DIR = Path("/Users/daminirijhwani/medical-spa-platform/docs/competitor_analysis")
+# Shared with the scraper and the fetch-queue builder in docs/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from article_markdown import parse_file
+
+# Paths, relative to this checkout so run_full_analysis.py fingerprints the same files
+DOCS_ROOT = Path(__file__).resolve().parent.parent
+BASE_DIR = DOCS_ROOT / "mangomint-analysis"
+OUTPUT_DIR = DOCS_ROOT / "competitor_analysis"
 CONSOLIDATED_DIR = OUTPUT_DIR / "consolidated_categories"
+MANIFEST_FILE = OUTPUT_DIR / ".consolidation_manifest.json"
+HASH_CHUNK = 1 << 16
+WRITE_BUFFER = 1 << 20
 
 def extract_content_from_markdown(file_path):
     """Extract article content from markdown file"""
-    with open(file_path, 'r') as f:
-        content = f.read()
-
-    # Extract title
-    title_match = re.search(r'^# (.+)$', content, re.MULTILINE)
-    title = title_match.group(1) if title_match else "Untitled"
-
-    # Extract URL
-    url_match = re.search(r'\*\*URL:\*\* (.+)$', content, re.MULTILINE)
-    url = url_match.group(1) if url_match else ""
-
-    # Extract article content section
-    article_section = re.search(r'## Article Content\s*\n\n(.*?)\n\n## Images', content, re.DOTALL)
-    article_text = article_section.group(1).strip() if article_section else ""
-
-    # Extract images
-    images = []
-    image_section = re.search(r'## Images and Screenshots\s*\n(.*?)(?=\n## |$)', content, re.DOTALL)
-    if image_section:
-        image_text = image_section.group(1)
-        # Parse image entries
-        image_entries = re.findall(r'\d+\.\s+\*\*(.+?)\*\*\s+- Source: (.+)', image_text)
-        images = [{'alt': alt, 'src': src} for alt, src in image_entries]
-
-    return {
-        'title': title,
-        'url': url,
-        'content': article_text,
-        'images': images,
-        'file_path': str(file_path)
-    }
-
-def consolidate_category(category_path, category_name):
-    """Consolidate all articles in a category"""
+    return parse_file(file_path).to_dict()
+
+def file_sha256(file_path):
+    """Content hash, read in chunks"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def load_manifest():
+    if MANIFEST_FILE.exists():
+        with open(MANIFEST_FILE, 'r') as f:
+            return json.load(f)
+    return {'articles': {}, 'categories': {}}
+
+def save_manifest(manifest):
+    with open(MANIFEST_FILE, 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+def consolidate_category(category_path, category_name, previous, manifest):
+    """
+    Find the articles in a category and check them against the previous
+    manifest; returns (category data, changed). Only paths are kept, the
+    articles are read when the consolidated file is written.
+    """
     print(f"Consolidating: {category_name}")
 
-    articles = []
+    files = []
+    seen = set()
+    changed = False
 
-    # Recursively find all markdown files
-    for md_file in category_path.rglob("*.md"):
+    # Recursively find all markdown files (sorted, so output is reproducible)
+    for md_file in sorted(category_path.rglob("*.md")):
         if md_file.name == "README.md":
             continue
 
+        key = str(md_file)
+        seen.add(key)
         try:
-            article_data = extract_content_from_markdown(md_file)
-            articles.append(article_data)
+            stat = md_file.stat()
+            entry = previous.get(key)
+            if not (entry and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size):
+                digest = file_sha256(md_file)
+                if not (entry and entry['sha256'] == digest):
+                    changed = True  # new or edited
+                entry = {'sha256': digest}
+            manifest['articles'][key] = {
+                'sha256': entry['sha256'],
+                'mtime_ns': stat.st_mtime_ns,
+                'size': stat.st_size,
+                'category': category_name
+            }
+            files.append(md_file)
         except Exception as e:
             print(f"  Error processing {md_file.name}: {e}")
 
+    # Deleted articles change the category too
+    if any(entry.get('category') == category_name and key not in seen for key, entry in previous.items()):
+        changed = True
+
     return {
         'category_name': category_name,
-        'total_articles': len(articles),
-        'articles': articles
-    }
+        'total_articles': len(files),
+        'files': files
+    }, changed
 
-def generate_consolidated_markdown(category_data, output_path):
-    """Generate a comprehensive markdown summary for the category"""
+def iter_articles(files):
+    """Parse articles one at a time, in order"""
+    for md_file in files:
+        try:
+            yield extract_content_from_markdown(md_file)
+        except Exception as e:
+            print(f"  Error processing {md_file.name}: {e}")
 
-    category_name = category_data['category_name']
-    articles = category_data['articles']
+def render_article(idx, article):
+    """Markdown section for one article"""
+    parts = [f"""
+### {idx}. {article['title']}
 
-    # Build markdown
-    md_content = f"""# {category_name} - Comprehensive Analysis
+**Source**: [{article['url']}]({article['url']})
 
-**Total Articles**: {len(articles)}
-**Competitor**: Mango Mint
+#### Content
 
----
+{article['content']}
 
-## Executive Summary
+"""]
 
-This category contains {len(articles)} articles covering various aspects of {category_name.replace('-', ' ').title()}.
+    # Add images if any
+    if article['images']:
+        parts.append(f"\n#### Screenshots ({len(article['images'])} images)\n\n")
+        for img_idx, img in enumerate(article['images'], 1):
+            if 'http' in img['src']:  # Only include actual image URLs, not base64
+                parts.append(f"{img_idx}. **{img['alt']}**: {img['src']}\n")
 
----
+    parts.append("\n---\n")
+    return "".join(parts)
 
-## Detailed Features
+def generate_consolidated_markdown(category_data, output_path):
+    """
+    Stream a comprehensive markdown summary for the category to disk;
+    returns the number of articles written
+    """
 
-"""
+    category_name = category_data['category_name']
 
-    # Add each article
-    for idx, article in enumerate(articles, 1):
-        md_content += f"""
-### {idx}. {article['title']}
+    # The articles go to a body file first, so the header can count only the
+    # ones that parsed; the body is then copied in behind it
+    body_path = output_path.with_suffix(".md.body")
+    total = 0
+    with open(body_path, 'w', buffering=WRITE_BUFFER) as f:
+        for article in iter_articles(category_data['files']):
+            total += 1
+            f.write(render_article(total, article))
+
+    # Written next to the output and renamed at the end, so an interrupted run
+    # never leaves a half-written file that looks current
+    tmp_path = output_path.with_suffix(".md.tmp")
+    with open(tmp_path, 'w', buffering=WRITE_BUFFER) as f:
+        f.write(f"""# {category_name} - Comprehensive Analysis
+
+**Total Articles**: {total}
+**Competitor**: Mango Mint
 
-**Source**: [{article['url']}]({article['url']})
+---
 
-#### Content
+## Executive Summary
 
-{article['content']}
+This category contains {total} articles covering various aspects of {category_name.replace('-', ' ').title()}.
 
-"""
+---
 
-        # Add images if any
-        if article['images']:
-            md_content += f"\n#### Screenshots ({len(article['images'])} images)\n\n"
-            for img_idx, img in enumerate(article['images'], 1):
-                if 'http' in img['src']:  # Only include actual image URLs, not base64
-                    md_content += f"{img_idx}. **{img['alt']}**: {img['src']}\n"
+## Detailed Features
 
-        md_content += "\n---\n"
+""")
+        with open(body_path, 'r') as body:
+            shutil.copyfileobj(body, f, WRITE_BUFFER)
 
-    # Add summary section
-    md_content += f"""
+        # Add summary section
+        f.write(f"""
 
 ## Category Summary
 
@@ -133,16 +193,41 @@ This category contains {len(articles)} articles covering various aspects of {cat
 
 <!-- This section will be filled by the feature extraction engine -->
 
-"""
-
-    # Write to file
-    with open(output_path, 'w') as f:
-        f.write(md_content)
+""")
+    os.replace(tmp_path, output_path)
+    body_path.unlink()
 
     print(f"  ✓ Generated: {output_path.name}")
+    return total
+
+def update_category_index(all_category_data):
+    """Update category_index.json in place; untouched if nothing differs"""
+    index_file = OUTPUT_DIR / "category_index.json"
+    index = {'total_categories': 0, 'categories': []}
+    if index_file.exists():
+        with open(index_file, 'r') as f:
+            index = json.load(f)
+
+    counts = {cat['category_name']: cat['total_articles'] for cat in all_category_data}
+    entries = [entry for entry in index['categories'] if entry['name'] in counts]
+    known = {entry['name'] for entry in entries}
+    entries += [{'name': name} for name in counts if name not in known]
+    for entry in entries:
+        entry['article_count'] = counts[entry['name']]
+    entries.sort(key=lambda entry: entry['name'])
+
+    updated = {'total_categories': len(entries), 'categories': entries}
+    if updated != index:
+        with open(index_file, 'w') as f:
+            json.dump(updated, f, indent=2)
+    return index_file
 
 def main():
     """Main consolidation process"""
+    parser = argparse.ArgumentParser(description="Stage 1: consolidate articles by category")
+    parser.add_argument("--force", action="store_true", help="re-parse and regenerate every category")
+    args = parser.parse_args()
+
     print("="*60)
     print("Stage 1: Category Consolidation")
     print("="*60)
@@ -157,39 +242,52 @@ def main():
     print(f"\nFound {len(categories)} categories to process\n")
 
     all_category_data = []
+    previous_manifest = load_manifest()
+    previous = {} if args.force else previous_manifest['articles']
+    # Articles written per category, the header's count; kept for categories not regenerated
+    written = {} if args.force else previous_manifest.get('categories', {})
+    manifest = {'articles': {}, 'categories': {}}
+    regenerated = 0
 
     for category_path in categories:
         category_name = category_path.name
 
         # Consolidate category
-        category_data = consolidate_category(category_path, category_name)
+        category_data, changed = consolidate_category(category_path, category_name, previous, manifest)
         all_category_data.append(category_data)
 
-        # Generate markdown
+        # Generate markdown only when an article in it changed
         output_file = CONSOLIDATED_DIR / f"{category_name}.md"
-        generate_consolidated_markdown(category_data, output_file)
+        if changed or not output_file.exists() or category_name not in written:
+            category_data['total_articles'] = generate_consolidated_markdown(category_data, output_file)
+            regenerated += 1
+        else:
+            category_data['total_articles'] = written[category_name]
+            print(f"  Unchanged: {output_file.name}")
+        manifest['categories'][category_name] = category_data['total_articles']
 
         print(f"  Articles processed: {category_data['total_articles']}\n")
 
-    # Save JSON index
-    index_file = OUTPUT_DIR / "category_index.json"
-    with open(index_file, 'w') as f:
-        json.dump({
-            'total_categories': len(all_category_data),
-            'categories': [
-                {
-                    'name': cat['category_name'],
-                    'article_count': cat['total_articles']
-                }
-                for cat in all_category_data
-            ]
-        }, f, indent=2)
+    # Consolidated files of categories this stage wrote before that no longer
+    # exist; anything else in the directory isn't ours to delete
+    current = {cat['category_name'] for cat in all_category_data}
+    ours = set(previous_manifest.get('categories', {}))
+    ours.update(entry['category'] for entry in previous_manifest['articles'].values())
+    for name in sorted(ours - current):
+        stale = CONSOLIDATED_DIR / f"{name}.md"
+        if stale.exists():
+            stale.unlink()
+            print(f"  Removed: {stale.name}")
+
+    save_manifest(manifest)
+    index_file = update_category_index(all_category_data)
 
     print("\n" + "="*60)
     print("CONSOLIDATION COMPLETE!")
     print("="*60)
     print(f"Total categories: {len(all_category_data)}")
     print(f"Total articles: {sum(cat['total_articles'] for cat in all_category_data)}")
+    print(f"Categories regenerated: {regenerated}")
     print(f"\nOutput directory: {CONSOLIDATED_DIR}")
     print(f"Index file: {index_file}")
 
@@ -2,40 +2,72 @@
 """
 Stage 2: Feature Extraction Engine
 Uses AI to extract structured features from consolidated categories
+
+Categories are extracted concurrently (--concurrency) and every response is
+cached under competitor_analysis/.llm_cache, so unchanged categories cost
+nothing on a re-run. Categories over --chunk-tokens are split on article
+boundaries, extracted chunk by chunk in parallel, and merged by feature
+name, instead of being truncated. --offline swaps in a fake client that lists each
+article as a feature, for trying the pipeline without an API key.
 """
 
-import os
+import argparse
+import asyncio
 import json
 from pathlib import Path
 import re
-from anthropic import Anthropic
+import sys
+
+from llm import (DEFAULT_CONCURRENCY, DEFAULT_MODEL, LLM, FakeAnthropic, estimate_tokens,
+                 parse_json_response, union)
 
-OUTPUT_DIR = Path("/Users/daminirijhwani/medical-spa-platform/docs/competitor_analysis")
+# Paths, relative to this checkout so run_full_analysis.py fingerprints the same files
+DOCS_ROOT = Path(__file__).resolve().parent.parent
+OUTPUT_DIR = DOCS_ROOT / "competitor_analysis"
 CONSOLIDATED_DIR = OUTPUT_DIR / "consolidated_categories"
 FEATURES_DIR = OUTPUT_DIR / "extracted_features"
-
-# Initialize Anthropic client (will use API key from environment)
-client = Anthropic()
-
-def extract_features_from_category(category_file):
-    """Use Claude to extract features from a consolidated category file"""
-
-    category_name = category_file.stem
-    print(f"Extracting features from: {category_name}")
-
-    # Read the consolidated markdown
-    with open(category_file, 'r') as f:
-        content = f.read()
-
-    # Truncate if too long (Claude has context limits)
-    if len(content) > 150000:
-        print(f"  Warning: Content truncated (original: {len(content)} chars)")
-        content = content[:150000] + "\n\n[Content truncated...]"
-
-    # Prompt for feature extraction
-    prompt = f"""Analyze this help center documentation for {category_name} and extract all features in a structured format.
-
-Documentation:
+CACHE_DIR = OUTPUT_DIR / ".llm_cache"
+
+# Categories bigger than this are extracted chunk by chunk, then merged
+CHUNK_TOKENS = 30000
+ARTICLE_HEADING = re.compile(r'^### \d+\. ', re.MULTILINE)
+COMPLEXITY_ORDER = {'basic': 0, 'intermediate': 1, 'advanced': 2}
+
+def offline_features(prompt):
+    """Fake-client response: one basic feature per article heading in the prompt"""
+    category = re.search(r'documentation for (\S+)', prompt).group(1)
+    titles = re.findall(r'^### \d+\. (.+)$', prompt, re.MULTILINE)
+    return json.dumps({
+        "category": category,
+        "features": [
+            {
+                "feature_name": title,
+                "description": f"{title} (offline placeholder)",
+                "capabilities": [],
+                "user_benefits": [],
+                "complexity": "basic",
+                "integrations": [],
+                "screenshots_available": False,
+                "keywords": title.lower().split()
+            }
+            for title in titles
+        ],
+        "key_workflows": [],
+        "integrations": [],
+        "competitive_advantages": []
+    })
+
+def build_prompt(category_name, content, part=None):
+    """Extraction prompt for a whole category, or for one part of it"""
+    if part:
+        index, total = part
+        documentation = f"Documentation (part {index} of {total}; the other parts are analyzed separately):"
+    else:
+        documentation = "Documentation:"
+
+    return f"""Analyze this help center documentation for {category_name} and extract all features in a structured format.
+
+{documentation}
 {content}
 
 Please provide a comprehensive JSON structure with the following format:
@@ -75,39 +107,137 @@ Please provide a comprehensive JSON structure with the following format:
 Be thorough and extract ALL features mentioned. Group related capabilities together.
 Return ONLY the JSON, no additional text."""
 
+def split_articles(content):
+    """Split consolidated markdown into (preamble, [article sections])"""
+    starts = [m.start() for m in ARTICLE_HEADING.finditer(content)]
+    if not starts:
+        return content, []
+    articles = [content[a:b] for a, b in zip(starts, starts[1:] + [len(content)])]
+    return content[:starts[0]], articles
+
+def chunk_articles(articles, budget):
+    """Greedily pack whole articles into chunks of at most budget tokens"""
+    chunks, current, used = [], [], 0
+    for article in articles:
+        # An article bigger than a chunk on its own is split on paragraph breaks
+        pieces = [article]
+        if estimate_tokens(article) > budget:
+            pieces, piece = [], ""
+            for paragraph in article.split("\n\n"):
+                if piece and estimate_tokens(piece + paragraph) > budget:
+                    pieces.append(piece)
+                    piece = ""
+                piece += paragraph + "\n\n"
+            pieces.append(piece)
+
+        for piece in pieces:
+            size = estimate_tokens(piece)
+            if current and used + size > budget:
+                chunks.append("".join(current))
+                current, used = [], 0
+            current.append(piece)
+            used += size
+    if current:
+        chunks.append("".join(current))
+    return chunks
+
+def feature_key(name):
+    return re.sub(r'[^a-z0-9]+', ' ', name.lower()).strip()
+
+def merge_chunk_results(category_name, results):
+    """Reduce step: merge per-chunk extractions, deduplicating by name"""
+    features, workflows, integrations = {}, {}, {}
+    advantages = []
+    for result in results:
+        for feature in result.get('features', []):
+            key = feature_key(feature.get('feature_name', ''))
+            merged = features.get(key)
+            if merged is None:
+                features[key] = dict(feature)
+                continue
+            for field in ('capabilities', 'user_benefits', 'integrations', 'keywords'):
+                merged[field] = union(merged.get(field), feature.get(field))
+            if len(feature.get('description', '')) > len(merged.get('description', '')):
+                merged['description'] = feature['description']
+            levels = [merged.get('complexity'), feature.get('complexity')]
+            merged['complexity'] = max(levels, key=lambda level: COMPLEXITY_ORDER.get(level, -1))
+            merged['screenshots_available'] = bool(merged.get('screenshots_available') or feature.get('screenshots_available'))
+
+        for workflow in result.get('key_workflows', []):
+            key = feature_key(workflow.get('workflow_name', ''))
+            if key in workflows:
+                workflows[key]['features_involved'] = union(workflows[key].get('features_involved'),
+                                                            workflow.get('features_involved'))
+            else:
+                workflows[key] = dict(workflow)
+
+        for integration in result.get('integrations', []):
+            integrations.setdefault(feature_key(integration.get('name', '')), integration)
+
+        advantages = union(advantages, result.get('competitive_advantages'))
+
+    return {
+        'category': category_name,
+        'features': list(features.values()),
+        'key_workflows': list(workflows.values()),
+        'integrations': list(integrations.values()),
+        'competitive_advantages': advantages
+    }
+
+async def extract_features_from_category(category_file, llm, chunk_tokens=CHUNK_TOKENS):
+    """Use Claude to extract features from a consolidated category file"""
+
+    category_name = category_file.stem
+    print(f"Extracting features from: {category_name}")
+
+    # Read the consolidated markdown
+    with open(category_file, 'r') as f:
+        content = f.read()
+
+    # Map-reduce over article-aligned chunks when one prompt would be too big
+    chunks = [content]
+    if estimate_tokens(content) > chunk_tokens:
+        preamble, articles = split_articles(content)
+        if articles:
+            # Every chunk opens with the category's title and summary, so it isn't read without context
+            budget = max(chunk_tokens - estimate_tokens(preamble), chunk_tokens // 2)
+            chunks = [preamble + chunk for chunk in chunk_articles(articles, budget)]
+        print(f"  {category_name}: {estimate_tokens(content)} tokens, split into {len(chunks)} chunks")
+
     try:
-        # Call Claude API
-        message = client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=16000,
-            messages=[{
-                "role": "user",
-                "content": prompt
-            }]
-        )
-
-        # Extract JSON from response
-        response_text = message.content[0].text
-
-        # Try to parse JSON
-        # Sometimes Claude wraps it in markdown code blocks
-        json_match = re.search(r'```json\s*\n(.*?)\n```', response_text, re.DOTALL)
-        if json_match:
-            json_text = json_match.group(1)
+        if len(chunks) == 1:
+            prompts = [build_prompt(category_name, content)]
         else:
-            json_text = response_text
+            prompts = [build_prompt(category_name, chunk, (i, len(chunks))) for i, chunk in enumerate(chunks, 1)]
 
-        features_data = json.loads(json_text)
+        # Call Claude API (or the cache); sometimes Claude wraps the JSON in code blocks
+        responses = await asyncio.gather(*(llm.complete(prompt, model=DEFAULT_MODEL, max_tokens=16000)
+                                           for prompt in prompts))
+        results = [parse_json_response(text) for text in responses]
+        features_data = results[0] if len(results) == 1 else merge_chunk_results(category_name, results)
 
-        print(f"  ✓ Extracted {len(features_data.get('features', []))} features")
+        print(f"  ✓ {category_name}: extracted {len(features_data.get('features', []))} features")
         return features_data
 
     except Exception as e:
-        print(f"  ✗ Error: {e}")
+        print(f"  ✗ {category_name}: {e}")
         return None
 
+async def extract_all(category_files, llm, chunk_tokens=CHUNK_TOKENS):
+    """Extract every category concurrently; results keep category order"""
+    return await asyncio.gather(*(extract_features_from_category(f, llm, chunk_tokens) for f in category_files))
+
 def main():
     """Main feature extraction process"""
+    parser = argparse.ArgumentParser(description="Stage 2: extract features from consolidated categories")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="max API calls in flight")
+    parser.add_argument("--no-cache", action="store_true", help="always call the API")
+    parser.add_argument("--offline", action="store_true", help="use a fake client instead of the API")
+    parser.add_argument("--chunk-tokens", type=int, default=CHUNK_TOKENS,
+                        help="categories larger than this are extracted in chunks and merged")
+    args = parser.parse_args()
+
     print("="*60)
     print("Stage 2: Feature Extraction")
     print("="*60)
@@ -121,7 +251,7 @@ def main():
     if not category_files:
         print("\nError: No consolidated category files found!")
         print(f"Please run Stage 1 first to generate files in: {CONSOLIDATED_DIR}")
-        return
+        return 1
 
     print(f"\nFound {len(category_files)} categories to analyze\n")
 
@@ -132,9 +262,16 @@ def main():
         'categories': {}
     }
 
-    for category_file in category_files:
-        features_data = extract_features_from_category(category_file)
+    llm = LLM(
+        client=FakeAnthropic(offline_features) if args.offline else None,
+        # Fake responses must never be served to a real run
+        cache_dir=None if args.no_cache else CACHE_DIR / ("offline" if args.offline else ""),
+        concurrency=args.concurrency
+    )
+    results = asyncio.run(extract_all(category_files, llm, args.chunk_tokens))
+    print(f"\nAPI calls: {llm.calls}, cached: {llm.cache_hits}")
 
+    for category_file, features_data in zip(category_files, results):
         if features_data:
             # Save individual category features
             output_file = FEATURES_DIR / f"{category_file.stem}_features.json"
@@ -146,8 +283,6 @@ def main():
 
             all_features.extend(features_data.get('features', []))
 
-        print()
-
     # Save master feature database
     master_file = OUTPUT_DIR / "feature_database.json"
     with open(master_file, 'w') as f:
@@ -178,5 +313,12 @@ def main():
     print(f"Feature index: {index_file}")
     print(f"Individual category features: {FEATURES_DIR}")
 
+    # Partial results are kept for inspection, but the run must not count as done
+    failed = [f.stem for f, features_data in zip(category_files, results) if not features_data]
+    if failed:
+        print(f"\n✗ {len(failed)} of {len(category_files)} categories failed: {', '.join(failed)}")
+        return 1
+    return 0
+
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -2,6 +2,10 @@
 """
 Stage 3: Codebase Analysis Scanner
 Analyzes the Luxe Medical Spa EMR codebase to inventory existing features
+
+The project is walked once with os.scandir, skipping dependency and build
+directories (SKIP_DIRS), and every file is classified against all of the
+structure and key-file patterns in the same pass.
 """
 
 import os
@@ -10,10 +14,30 @@ from pathlib import Path
 import re
 from anthropic import Anthropic
 
-PROJECT_ROOT = Path("/Users/daminirijhwani/medical-spa-platform")
+# Paths, relative to this checkout so run_full_analysis.py fingerprints the same files
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
 OUTPUT_DIR = PROJECT_ROOT / "docs/competitor_analysis"
 CODEBASE_DIR = OUTPUT_DIR / "codebase_analysis"
 
+# Never scanned: dependencies, build output, VCS metadata
+SKIP_DIRS = {"node_modules", ".next", ".turbo", "dist", "build", ".git", "__pycache__"}
+
+# pathlib-style globs, relative to PROJECT_ROOT
+STRUCTURE_PATTERNS = {
+    'frontend_pages': ['**/app/**/*.tsx', '**/pages/**/*.tsx', '**/app/**/page.tsx'],
+    'components': ['**/components/**/*.tsx', '**/components/**/*.ts'],
+    'backend_routes': ['**/api/**/*.ts', '**/routes/**/*.ts', '**/api/**/route.ts'],
+    'models': ['**/models/**/*.ts', '**/schemas/**/*.ts'],
+    'services': ['**/services/**/*.ts', '**/lib/**/*.ts']
+}
+KEY_FILE_PATTERNS = [
+    '**/package.json',
+    '**/tsconfig.json',
+    '**/next.config.js',
+    '**/app/**/layout.tsx',
+    '**/app/page.tsx'
+]
+
 # Initialize Anthropic client
 client = Anthropic()
 
@@ -24,33 +48,59 @@ def find_code_files(directory, extensions=['.ts', '.tsx', '.js', '.jsx', '.py'])
         code_files.extend(directory.rglob(f"*{ext}"))
     return code_files
 
-def analyze_directory_structure():
+def glob_to_regex(pattern):
+    """Regex source matching the same '/'-separated relative paths as a pathlib glob"""
+    parts = []
+    for part in pattern.split('/'):
+        if part == '**':
+            parts.append('(?:[^/]+/)*')  # zero or more directories
+        else:
+            parts.append(''.join('[^/]*' if c == '*' else '[^/]' if c == '?' else re.escape(c) for c in part) + '/')
+    return ''.join(parts)[:-1]
+
+def compile_patterns(patterns):
+    return re.compile('|'.join(f'(?:{glob_to_regex(p)})' for p in patterns))
+
+def scan_project(root=PROJECT_ROOT):
+    """
+    Walk the project once and sort files into the STRUCTURE_PATTERNS
+    categories, plus 'key_files' for KEY_FILE_PATTERNS. Paths are relative
+    and sorted.
+    """
+    matchers = {category: compile_patterns(patterns) for category, patterns in STRUCTURE_PATTERNS.items()}
+    matchers['key_files'] = compile_patterns(KEY_FILE_PATTERNS)
+    all_patterns = KEY_FILE_PATTERNS + [p for patterns in STRUCTURE_PATTERNS.values() for p in patterns]
+    suffixes = tuple({os.path.splitext(p)[1] for p in all_patterns})
+    found = {category: [] for category in matchers}
+
+    pending = ['']
+    while pending:
+        rel_dir = pending.pop()
+        try:
+            entries = list(os.scandir(os.path.join(root, rel_dir)))
+        except OSError as e:
+            print(f"  Could not scan {rel_dir}: {e}")
+            continue
+        for entry in entries:
+            rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in SKIP_DIRS:
+                    pending.append(rel)
+            elif entry.name.endswith(suffixes):
+                for category, matcher in matchers.items():
+                    if matcher.fullmatch(rel):
+                        found[category].append(rel)
+
+    return {category: sorted(paths) for category, paths in found.items()}
+
+def analyze_directory_structure(scan):
     """Analyze the project structure to identify feature areas"""
 
     print("Analyzing project structure...")
 
-    structure = {
-        'frontend_pages': [],
-        'backend_routes': [],
-        'components': [],
-        'models': [],
-        'services': []
-    }
-
-    # Scan common directory patterns
-    patterns = {
-        'frontend_pages': ['**/app/**/*.tsx', '**/pages/**/*.tsx', '**/app/**/page.tsx'],
-        'components': ['**/components/**/*.tsx', '**/components/**/*.ts'],
-        'backend_routes': ['**/api/**/*.ts', '**/routes/**/*.ts', '**/api/**/route.ts'],
-        'models': ['**/models/**/*.ts', '**/schemas/**/*.ts'],
-        'services': ['**/services/**/*.ts', '**/lib/**/*.ts']
-    }
-
-    for category, glob_patterns in patterns.items():
-        files = []
-        for pattern in glob_patterns:
-            files.extend(PROJECT_ROOT.glob(pattern))
-        structure[category] = [str(f.relative_to(PROJECT_ROOT)) for f in files]
+    structure = {}
+    for category in ('frontend_pages', 'backend_routes', 'components', 'models', 'services'):
+        structure[category] = scan[category]
         print(f"  Found {len(structure[category])} {category}")
 
     return structure
@@ -141,33 +191,23 @@ Be thorough in inferring features from file paths. Return ONLY JSON."""
         print(f"  ✗ Error: {e}")
         return None
 
-def read_key_files_for_deep_analysis():
+def read_key_files_for_deep_analysis(scan):
     """Read key configuration and route files for detailed feature analysis"""
 
     print("\nReading key files for deep analysis...")
 
     key_files = []
 
-    # Look for main config files
-    config_patterns = [
-        '**/package.json',
-        '**/tsconfig.json',
-        '**/next.config.js',
-        '**/app/**/layout.tsx',
-        '**/app/page.tsx'
-    ]
-
-    for pattern in config_patterns:
-        for file_path in PROJECT_ROOT.glob(pattern):
-            try:
-                with open(file_path, 'r') as f:
-                    content = f.read()
-                    key_files.append({
-                        'path': str(file_path.relative_to(PROJECT_ROOT)),
-                        'content': content[:5000]  # Truncate for API limits
-                    })
-            except Exception as e:
-                print(f"  Could not read {file_path}: {e}")
+    for rel in scan['key_files']:
+        file_path = PROJECT_ROOT / rel
+        try:
+            with open(file_path, 'r') as f:
+                key_files.append({
+                    'path': rel,
+                    'content': f.read(5000)  # Truncate for API limits
+                })
+        except Exception as e:
+            print(f"  Could not read {file_path}: {e}")
 
     return key_files
 
@@ -238,8 +278,9 @@ def main():
     # Create output directory
     CODEBASE_DIR.mkdir(parents=True, exist_ok=True)
 
-    # Step 1: Analyze directory structure
-    structure = analyze_directory_structure()
+    # Step 1: Analyze directory structure (one walk serves steps 1 and 3)
+    scan = scan_project()
+    structure = analyze_directory_structure(scan)
 
     # Save structure
     structure_file = CODEBASE_DIR / "project_structure.json"
@@ -255,7 +296,7 @@ def main():
             json.dump(structural_features, f, indent=2)
 
     # Step 3: Read key files
-    key_files = read_key_files_for_deep_analysis()
+    key_files = read_key_files_for_deep_analysis(scan)
 
     # Step 4: Deep analysis
     if key_files:
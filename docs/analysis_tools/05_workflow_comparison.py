@@ -3,21 +3,43 @@
 Workflow Comparison Analysis
 Compares Mango Mint workflows vs Luxe Medical Spa EMR workflows
 Shows WHO WINS on UX/seamlessness for each feature
+
+Every consolidated category, and every feature in it, is compared
+concurrently. All requests share one LLM client with a global rate limit
+(--rate requests per minute) and retry 429/5xx responses with exponential
+backoff. Each category's JSON file is rewritten atomically as its
+comparisons complete, so the output is always valid JSON with everything
+finished so far. --offline swaps in a fake client with simulated latency.
+
+Components for a feature come from a ComponentIndex of
+apps/admin/src/components, saved in competitor_analysis/.component_index.json
+and refreshed by mtime, so matching a feature is a dictionary lookup.
 """
 
-import os
+import argparse
+import asyncio
+import hashlib
 import json
-import anthropic
+import os
+import re
+import sys
+import time
 from pathlib import Path
 
+from component_index import ComponentIndex
+from llm import DEFAULT_MODEL, LLM, FakeAnthropic, parse_json_response
+
 # Paths
 DOCS_ROOT = Path(__file__).parent.parent
 MANGOMINT_CONSOLIDATED = DOCS_ROOT / "competitor_analysis/consolidated_categories"
 CURRENT_CODEBASE_ROOT = DOCS_ROOT.parent / "apps/admin/src/components"
 OUTPUT_DIR = DOCS_ROOT / "competitor_analysis/workflow_comparisons"
+CACHE_DIR = DOCS_ROOT / "competitor_analysis/.llm_cache"
+COMPONENT_INDEX_FILE = DOCS_ROOT / "competitor_analysis/.component_index.json"
 
-# Anthropic API
-client = anthropic.Anthropic(api_key=os.environ.get("ANTHROPIC_API_KEY"))
+CONCURRENCY = 8
+RATE_LIMIT = 50  # requests per minute, across every category and feature
+OFFLINE_LATENCY = 0.5
 
 def read_file(filepath):
     """Read file contents"""
@@ -28,7 +50,12 @@ def read_file(filepath):
         print(f"Error reading {filepath}: {e}")
         return ""
 
-def analyze_mangomint_workflow(category_name, content):
+def category_title(stem):
+    """02-calendar-and-appointments -> Calendar & Appointments"""
+    name = re.sub(r'^\d+-', '', stem)
+    return name.replace('-and-', ' & ').replace('-', ' ').title()
+
+async def analyze_mangomint_workflow(category_name, content, llm):
     """Use Claude to extract Mango Mint workflows"""
 
     prompt = f"""Analyze this Mango Mint documentation for **{category_name}** and extract detailed workflows.
@@ -60,45 +87,24 @@ Return JSON:
 }}
 """
 
-    response = client.messages.create(
-        model="claude-sonnet-4-20250514",
-        max_tokens=8000,
-        messages=[{"role": "user", "content": prompt}]
-    )
-
-    content_text = response.content[0].text
-
-    # Extract JSON from response
     try:
-        json_start = content_text.find('{')
-        json_end = content_text.rfind('}') + 1
-        json_str = content_text[json_start:json_end]
-        return json.loads(json_str)
-    except:
+        content_text = await llm.complete(prompt, model=DEFAULT_MODEL, max_tokens=8000)
+        return parse_json_response(content_text)
+    except Exception as e:
+        print(f"Error extracting {category_name} workflows: {e}")
         return {"features": []}
 
-def analyze_current_platform_feature(feature_name, codebase_components):
-    """Analyze how Luxe platform currently implements a feature"""
-
-    # Find relevant components
-    relevant_files = []
-    search_terms = feature_name.lower().replace(" ", "").replace("-", "")
-
-    for root, dirs, files in os.walk(CURRENT_CODEBASE_ROOT):
-        for file in files:
-            if file.endswith('.tsx'):
-                filepath = os.path.join(root, file)
-                filename_lower = file.lower()
+def collect_component_code(feature_name, index):
+    """Heads of the (up to 3) components that best match a feature"""
+    component_code = ""
+    for rel in index.lookup(feature_name, limit=3):
+        component_code += f"\n\n// {os.path.basename(rel)}\n{index.head(rel)}"
+    return component_code
 
-                # Check if filename is relevant
-                if any(term in filename_lower for term in [search_terms[:6], 'calendar', 'appointment', 'waitlist', 'resource']):
-                    relevant_files.append(filepath)
+async def analyze_current_platform_feature(feature_name, llm, index):
+    """Analyze how Luxe platform currently implements a feature"""
 
-    # Read relevant files (limit to 3 most relevant)
-    component_code = ""
-    for filepath in relevant_files[:3]:
-        code = read_file(filepath)
-        component_code += f"\n\n// {os.path.basename(filepath)}\n{code[:1000]}"
+    component_code = collect_component_code(feature_name, index)
 
     if not component_code:
         return {"implemented": False, "workflow": "Not implemented"}
@@ -127,22 +133,13 @@ Return JSON:
 """
 
     try:
-        response = client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=4000,
-            messages=[{"role": "user", "content": prompt}]
-        )
-
-        content_text = response.content[0].text
-        json_start = content_text.find('{')
-        json_end = content_text.rfind('}') + 1
-        json_str = content_text[json_start:json_end]
-        return json.loads(json_str)
+        content_text = await llm.complete(prompt, model=DEFAULT_MODEL, max_tokens=4000)
+        return parse_json_response(content_text)
     except Exception as e:
         print(f"Error analyzing current platform: {e}")
         return {"implemented": "Unknown", "workflow_steps": []}
 
-def compare_workflows(feature_name, mangomint_workflow, current_workflow):
+async def compare_workflows(feature_name, mangomint_workflow, current_workflow, llm):
     """Compare workflows and determine winner"""
 
     prompt = f"""Compare these two implementations of "{feature_name}" and determine WHO WINS.
@@ -170,17 +167,8 @@ Return JSON:
 """
 
     try:
-        response = client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=3000,
-            messages=[{"role": "user", "content": prompt}]
-        )
-
-        content_text = response.content[0].text
-        json_start = content_text.find('{')
-        json_end = content_text.rfind('}') + 1
-        json_str = content_text[json_start:json_end]
-        return json.loads(json_str)
+        content_text = await llm.complete(prompt, model=DEFAULT_MODEL, max_tokens=3000)
+        return parse_json_response(content_text)
     except Exception as e:
         print(f"Error comparing workflows: {e}")
         return {
@@ -188,8 +176,107 @@ Return JSON:
             "winner_reasoning": str(e)
         }
 
-def run_workflow_comparison():
+async def compare_feature(feature, llm, index):
+    """Both platform calls for one Mango Mint feature"""
+    feature_name = feature['feature_name']
+    current_analysis = await analyze_current_platform_feature(feature_name, llm, index)
+    comparison = await compare_workflows(feature_name, feature, current_analysis, llm)
+    return {
+        "feature_name": feature_name,
+        "mangomint": feature,
+        "luxe_platform": current_analysis,
+        "comparison": comparison
+    }
+
+class ComparisonFile:
+    """One category's output, rewritten atomically each time a comparison completes"""
+
+    def __init__(self, path, category):
+        self.path = path
+        self.category = category
+        self.features_found = 0
+        self.completed = {}  # feature position -> comparison, kept in feature order on disk
+
+    def add(self, position, comparison):
+        self.completed[position] = comparison
+        self.save()
+
+    def save(self, status="in progress"):
+        comparisons = [self.completed[position] for position in sorted(self.completed)]
+        tmp_path = self.path.with_suffix(".json.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "category": self.category,
+                "status": status,
+                "features_found": self.features_found,
+                "total_features_compared": len(comparisons),
+                "comparisons": comparisons
+            }, f, indent=2)
+        os.replace(tmp_path, self.path)
+        return comparisons
+
+async def compare_category(category_file, llm, index):
+    """Extract a category's workflows, then compare all of its features concurrently"""
+    category = category_title(category_file.stem)
+    output = ComparisonFile(OUTPUT_DIR / f"{category_file.stem}_workflow_comparison.json", category)
+
+    mangomint_analysis = await analyze_mangomint_workflow(category, read_file(category_file), llm)
+    features = [f for f in mangomint_analysis.get('features', []) if f.get('feature_name')]
+    output.features_found = len(features)
+    output.save()
+    print(f"📋 {category}: {len(features)} features")
+
+    async def compare(position, feature):
+        return position, await compare_feature(feature, llm, index)
+
+    for finished in asyncio.as_completed([compare(i, f) for i, f in enumerate(features)]):
+        position, comparison = await finished
+        output.add(position, comparison)
+        print(f"   ✅ {category} / {comparison['feature_name']}: {comparison['comparison'].get('winner', 'Unknown')}")
+
+    print(f"✓ {category} complete: {output.path.name}")
+    return category, output.save(status="complete")
+
+async def run_all(category_files, llm, index):
+    return await asyncio.gather(*(compare_category(f, llm, index) for f in category_files))
+
+def offline_workflows(prompt):
+    """Fake-client response for each of the three prompts"""
+    if prompt.startswith("Analyze this Mango Mint documentation"):
+        titles = re.findall(r'^### \d+\. (.+)$', prompt, re.MULTILINE)
+        return json.dumps({"features": [
+            {
+                "feature_name": title,
+                "workflow_steps": [f"Open {title}", "Complete the form", "Save"],
+                "ux_highlights": ["offline placeholder"],
+                "key_interactions": [],
+                "mobile_support": "Partial",
+                "pain_points_solved": []
+            }
+            for title in titles
+        ]})
+    if "currently implements" in prompt:
+        return json.dumps({"implemented": "Partial", "workflow_steps": ["offline placeholder"],
+                           "ux_strengths": [], "ux_weaknesses": [], "missing_features": []})
+    # Stable pseudo-random verdict per feature
+    verdicts = ["Mango Mint", "Luxe Platform", "Tie"]
+    winner = verdicts[hashlib.sha256(prompt.encode()).digest()[0] % len(verdicts)]
+    return json.dumps({"winner": winner, "winner_reasoning": "offline placeholder",
+                       "mangomint_score": 5, "luxe_score": 5,
+                       "key_differentiators": [], "how_to_beat_them": []})
+
+def run_workflow_comparison(argv=None):
     """Main workflow comparison analysis"""
+    parser = argparse.ArgumentParser(description="Workflow comparison for every consolidated category")
+    parser.add_argument("--category", action="append",
+                        help="only categories whose file name contains this (repeatable)")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY, help="max API calls in flight")
+    parser.add_argument("--rate", type=float, default=RATE_LIMIT, help="max API requests per minute")
+    parser.add_argument("--no-cache", action="store_true", help="always call the API")
+    parser.add_argument("--offline", action="store_true", help="use a fake client instead of the API")
+    parser.add_argument("--latency", type=float, default=OFFLINE_LATENCY,
+                        help="simulated seconds per request with --offline")
+    args = parser.parse_args(argv)
 
     print("🔬 Starting Workflow Comparison Analysis...")
     print("=" * 60)
@@ -197,71 +284,44 @@ def run_workflow_comparison():
     # Create output directory
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
-    # Focus on Calendar & Appointments first (most critical)
-    category_file = MANGOMINT_CONSOLIDATED / "02-calendar-and-appointments.md"
-
-    print(f"\n📋 Analyzing: Calendar & Appointments")
-    print("-" * 60)
-
-    # Read Mango Mint docs
-    content = read_file(category_file)
-
-    # Extract Mango Mint workflows
-    print("1️⃣  Extracting Mango Mint workflows...")
-    mangomint_analysis = analyze_mangomint_workflow("Calendar & Appointments", content)
-
-    print(f"   Found {len(mangomint_analysis.get('features', []))} features")
-
-    # Compare each feature
-    comparisons = []
-
-    for idx, feature in enumerate(mangomint_analysis.get('features', [])[:10], 1):  # Limit to 10 features
-        feature_name = feature['feature_name']
-        print(f"\n2️⃣  Analyzing feature {idx}: {feature_name}")
-
-        # Analyze current platform
-        print(f"   → Checking Luxe implementation...")
-        current_analysis = analyze_current_platform_feature(feature_name, CURRENT_CODEBASE_ROOT)
-
-        # Compare workflows
-        print(f"   → Comparing workflows...")
-        comparison = compare_workflows(feature_name, feature, current_analysis)
-
-        # Combine results
-        full_comparison = {
-            "feature_name": feature_name,
-            "mangomint": feature,
-            "luxe_platform": current_analysis,
-            "comparison": comparison
-        }
-
-        comparisons.append(full_comparison)
-
-        winner = comparison.get('winner', 'Unknown')
-        print(f"   ✅ Winner: {winner}")
-
-    # Save results
-    output_file = OUTPUT_DIR / "calendar_workflow_comparison.json"
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump({
-            "category": "Calendar & Appointments",
-            "total_features_compared": len(comparisons),
-            "comparisons": comparisons
-        }, f, indent=2)
+    category_files = sorted(MANGOMINT_CONSOLIDATED.glob("*.md"))
+    if args.category:
+        category_files = [f for f in category_files if any(c in f.stem for c in args.category)]
+    if not category_files:
+        print(f"No consolidated categories found in {MANGOMINT_CONSOLIDATED}")
+        return 1
+    print(f"{len(category_files)} categories, {args.concurrency} concurrent requests, {args.rate:g}/min\n")
+
+    index = ComponentIndex.load(CURRENT_CODEBASE_ROOT, COMPONENT_INDEX_FILE)
+    print(f"Component index: {len(index.files)} files, {index.reads} read from disk\n")
+
+    llm = LLM(
+        client=FakeAnthropic(offline_workflows, latency=args.latency) if args.offline else None,
+        # Fake responses must never be served to a real run
+        cache_dir=None if args.no_cache else CACHE_DIR / ("offline" if args.offline else ""),
+        concurrency=args.concurrency,
+        rate_limit=args.rate
+    )
+    started = time.time()
+    results = asyncio.run(run_all(category_files, llm, index))
 
-    print(f"\n✅ Workflow comparison saved to: {output_file}")
-    print(f"\n📊 Summary:")
-    print(f"   Total features compared: {len(comparisons)}")
+    print(f"\n✅ Workflow comparisons saved to: {OUTPUT_DIR}")
+    print(f"\n📊 Summary ({time.time() - started:.0f}s, API calls: {llm.calls}, "
+          f"cached: {llm.cache_hits}, retries: {llm.retries}):")
 
     # Count winners
-    mango_wins = sum(1 for c in comparisons if 'Mango Mint' in c['comparison'].get('winner', ''))
-    luxe_wins = sum(1 for c in comparisons if "Luxe" in c['comparison'].get('winner', ''))
-
-    print(f"   Mango Mint wins: {mango_wins}")
-    print(f"   Luxe wins: {luxe_wins}")
-    print(f"   Not implemented: {len(comparisons) - mango_wins - luxe_wins}")
-
-    return output_file
+    totals = [0, 0, 0]
+    for category, comparisons in results:
+        mango_wins = sum(1 for c in comparisons if 'Mango Mint' in c['comparison'].get('winner', ''))
+        luxe_wins = sum(1 for c in comparisons if "Luxe" in c['comparison'].get('winner', ''))
+        totals = [totals[0] + len(comparisons), totals[1] + mango_wins, totals[2] + luxe_wins]
+        print(f"   {category}: {len(comparisons)} compared, Mango Mint {mango_wins}, Luxe {luxe_wins}")
+
+    print(f"\n   Total features compared: {totals[0]}")
+    print(f"   Mango Mint wins: {totals[1]}")
+    print(f"   Luxe wins: {totals[2]}")
+    print(f"   Not implemented: {totals[0] - totals[1] - totals[2]}")
+    return 0
 
 if __name__ == "__main__":
-    run_workflow_comparison()
+    sys.exit(run_workflow_comparison())
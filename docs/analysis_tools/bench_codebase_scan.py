@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Codebase scan benchmark for Stage 3
+
+Runs the old scan (one PROJECT_ROOT.glob per pattern, 18 in all) and the
+single os.scandir walk of 03_analyze_codebase.py over the real repo.
+It counts directory listings and measures wall time for each, and checks
+that the single walk finds the same files as the globs. Files under
+SKIP_DIRS and repeated matches are left out of that check.
+
+Every directory listing goes through os.scandir, pathlib's glob included,
+so wrapping it counts the listings for both scans.
+
+    python3 bench_codebase_scan.py
+    python3 bench_codebase_scan.py --root /path/to/medical-spa-platform --repeat 5
+"""
+
+import argparse
+import importlib.util
+import os
+import sys
+import time
+from pathlib import Path
+
+TOOLS_DIR = Path(__file__).parent
+REPO_ROOT = TOOLS_DIR.parent.parent
+
+
+def load_stage():
+    spec = importlib.util.spec_from_file_location("analyze_codebase", TOOLS_DIR / "03_analyze_codebase.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def legacy_scan(stage, root):
+    """The old analyze_directory_structure and read_key_files_for_deep_analysis globs"""
+    found = {}
+    for category, patterns in stage.STRUCTURE_PATTERNS.items():
+        found[category] = [str(f.relative_to(root)) for pattern in patterns for f in root.glob(pattern)]
+    found['key_files'] = [str(f.relative_to(root)) for pattern in stage.KEY_FILE_PATTERNS
+                          for f in root.glob(pattern) if f.is_file()]
+    return found
+
+
+class CountingScandir:
+    """Stand-in for os.scandir that counts calls"""
+
+    def __init__(self):
+        self.real = os.scandir
+        self.calls = 0
+
+    def __call__(self, *args, **kwargs):
+        self.calls += 1
+        return self.real(*args, **kwargs)
+
+
+def measure(scan, repeat):
+    """(directory listings per scan, best wall time, result)"""
+    counter = CountingScandir()
+    os.scandir = counter
+    try:
+        result = scan()
+    finally:
+        os.scandir = counter.real
+    listings = counter.calls
+
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        scan()
+        best = min(best, time.perf_counter() - started)
+    return listings, best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--root", type=Path, default=REPO_ROOT, help="project to scan (default: this repo)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per scan, best is reported")
+    args = parser.parse_args()
+
+    stage = load_stage()
+    root = args.root.resolve()
+    patterns = sum(len(p) for p in stage.STRUCTURE_PATTERNS.values()) + len(stage.KEY_FILE_PATTERNS)
+    directories = sum(1 for _ in os.walk(root))
+    pruned = sum(1 for dirpath, _, _ in os.walk(root)
+                 if stage.SKIP_DIRS & set(Path(dirpath).relative_to(root).parts))
+
+    old_listings, old_time, old = measure(lambda: legacy_scan(stage, root), args.repeat)
+    new_listings, new_time, new = measure(lambda: stage.scan_project(root), args.repeat)
+
+    failures = []
+    for category in new:
+        expected = {rel for rel in old[category] if not stage.SKIP_DIRS & set(Path(rel).parts[:-1])}
+        if set(new[category]) != expected:
+            missing = sorted(expected - set(new[category]))
+            extra = sorted(set(new[category]) - expected)
+            failures.append(f"{category}: {len(missing)} missing {missing[:3]}, {len(extra)} extra {extra[:3]}")
+        elif len(new[category]) != len(set(new[category])):
+            failures.append(f"{category}: duplicate paths")
+
+    print(f"Project: {root}")
+    print(f"{directories} directories ({pruned} under {', '.join(sorted(stage.SKIP_DIRS))})\n")
+    print(f"{'':<20} {'walks':>6} {'listings':>9} {'time':>9}")
+    print(f"{'old (pathlib.glob)':<20} {patterns:>6} {old_listings:>9} {old_time * 1000:>7.1f}ms")
+    print(f"{'new (os.scandir)':<20} {1:>6} {new_listings:>9} {new_time * 1000:>7.1f}ms")
+    print(f"\nspeedup {old_time / new_time:.1f}x, {old_listings / max(new_listings, 1):.1f}x fewer directory listings\n")
+
+    print(f"{'category':<16} {'old':>6} {'new':>6}")
+    for category in new:
+        print(f"{category:<16} {len(old[category]):>6} {len(new[category]):>6}")
+
+    if failures:
+        print("\nFAIL")
+        for failure in failures:
+            print(f"  ✗ {failure}")
+        return 1
+    print("\n✓ Same files as the per-pattern globs, outside SKIP_DIRS and without repeats")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
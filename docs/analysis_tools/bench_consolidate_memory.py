@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark for Stage 1 consolidation
+
+Writes a synthetic category of --articles help articles to a temporary
+directory and consolidates it twice, measuring the tracemalloc peak:
+
+  in-memory  every article parsed into a list, then the consolidated file
+             built by string concatenation and written at the end (the
+             previous implementation)
+  streaming  01_consolidate_categories.py: articles parsed from disk one at
+             a time and written straight to a buffered file
+
+Both must produce the same file. It also checks that an article that fails
+to parse is left out of the "Total Articles" count, and that a rerun after
+a category disappears removes that category's file but nothing else in
+consolidated_categories/.
+
+    python3 bench_consolidate_memory.py
+    python3 bench_consolidate_memory.py --articles 10000 --body-chars 4000
+"""
+
+import argparse
+import contextlib
+import filecmp
+import importlib.util
+import io
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+TOOLS_DIR = Path(__file__).parent
+CATEGORY = "99-synthetic-category"
+
+ARTICLE_TEMPLATE = """# Synthetic article {n}
+
+**URL:** https://www.mangomint.com/learn/synthetic-article-{n}/
+
+## Category
+99 Synthetic Category
+
+## Subcategory
+N/A
+
+## Article Content
+
+{body}
+
+## Images and Screenshots
+
+This article contains the following images:
+
+{images}
+
+## Analysis Notes
+<!-- Add your analysis notes here -->
+"""
+
+
+def load_stage():
+    spec = importlib.util.spec_from_file_location("consolidate", TOOLS_DIR / "01_consolidate_categories.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def write_category(directory, articles, body_chars):
+    category = directory / CATEGORY
+    category.mkdir(parents=True)
+    sentence = "Open the settings page and adjust the option to match how your spa schedules appointments. "
+    for n in range(articles):
+        body = (f"Step {n}. " + sentence * (body_chars // len(sentence) + 1))[:body_chars]
+        images = "".join(
+            f"{i}. **Screenshot {i} of article {n}**\n   - Source: https://cdn.example.com/{n}/{i}.png\n\n"
+            for i in range(1, 4)
+        )
+        (category / f"article-{n:06d}.md").write_text(ARTICLE_TEMPLATE.format(n=n, body=body, images=images))
+    return category
+
+
+def in_memory_consolidate(stage, category_path, output_path):
+    """The previous approach: parse everything, concatenate, write once"""
+    articles = [stage.extract_content_from_markdown(p) for p in sorted(category_path.rglob("*.md"))]
+
+    md_content = f"""# {CATEGORY} - Comprehensive Analysis
+
+**Total Articles**: {len(articles)}
+**Competitor**: Mango Mint
+
+---
+
+## Executive Summary
+
+This category contains {len(articles)} articles covering various aspects of {CATEGORY.replace('-', ' ').title()}.
+
+---
+
+## Detailed Features
+
+"""
+    for idx, article in enumerate(articles, 1):
+        md_content += f"""
+### {idx}. {article['title']}
+
+**Source**: [{article['url']}]({article['url']})
+
+#### Content
+
+{article['content']}
+
+"""
+        if article['images']:
+            md_content += f"\n#### Screenshots ({len(article['images'])} images)\n\n"
+            for img_idx, img in enumerate(article['images'], 1):
+                if 'http' in img['src']:
+                    md_content += f"{img_idx}. **{img['alt']}**: {img['src']}\n"
+        md_content += "\n---\n"
+
+    md_content += """
+
+## Category Summary
+
+### Key Capabilities Identified
+
+<!-- This section will be filled by the feature extraction engine -->
+
+### Notable Features
+
+<!-- This section will be filled by the feature extraction engine -->
+
+### Integration Points
+
+<!-- This section will be filled by the feature extraction engine -->
+
+"""
+    with open(output_path, 'w') as f:
+        f.write(md_content)
+
+
+def streaming_consolidate(stage, category_path, output_path):
+    category_data, _ = stage.consolidate_category(category_path, CATEGORY, {}, {'articles': {}})
+    stage.generate_consolidated_markdown(category_data, output_path)
+
+
+def check_failed_article(stage, tmp):
+    """Failure message if an unparseable article is counted in the header, else None"""
+    category_path = write_category(tmp / "broken", 3, 200)
+    (category_path / "article-000001.md").write_bytes(b"# Broken\n\xff\xfe not UTF-8\n")
+    output_path = tmp / "broken.md"
+    with contextlib.redirect_stdout(io.StringIO()):
+        category_data, _ = stage.consolidate_category(category_path, CATEGORY, {}, {'articles': {}})
+        written = stage.generate_consolidated_markdown(category_data, output_path)
+    text = output_path.read_text()
+    if written != 2 or "**Total Articles**: 2\n" not in text or "This category contains 2 articles" not in text:
+        return f"header counts {written} of 3 files with one unparseable"
+    if "### 2. Synthetic article 2" not in text or "### 3." in text:
+        return "articles after an unparseable one are misnumbered"
+    return None
+
+
+def check_stale_cleanup(stage, tmp):
+    """Failure message if a rerun removes the wrong consolidated files, else None"""
+    base = tmp / "stale" / "articles"
+    for name in ("01-kept", "02-dropped"):
+        write_category(base, 2, 200).rename(base / name)
+    stage.BASE_DIR, stage.OUTPUT_DIR = base, tmp / "stale" / "out"
+    stage.CONSOLIDATED_DIR = stage.OUTPUT_DIR / "consolidated_categories"
+    stage.MANIFEST_FILE = stage.OUTPUT_DIR / ".consolidation_manifest.json"
+
+    argv = sys.argv
+    sys.argv = [argv[0]]
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            stage.main()
+            (stage.CONSOLIDATED_DIR / "notes.md").write_text("kept by hand\n")
+            shutil.rmtree(base / "02-dropped")
+            stage.main()
+    finally:
+        sys.argv = argv
+    remaining = sorted(p.name for p in stage.CONSOLIDATED_DIR.glob("*.md"))
+    if remaining != ["01-kept.md", "notes.md"]:
+        return f"after dropping a category, consolidated_categories/ has {remaining}"
+    return None
+
+
+def measure(run, *args):
+    tracemalloc.start()
+    started = time.perf_counter()
+    run(*args)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=50_000)
+    parser.add_argument("--body-chars", type=int, default=1500)
+    args = parser.parse_args()
+
+    stage = load_stage()
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        failures = [failure for failure in (check_failed_article(load_stage(), tmp),
+                                            check_stale_cleanup(load_stage(), tmp)) if failure]
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        if failures:
+            return 1
+        print("✓ Unparseable articles left out of the header count; stale cleanup limited to our categories\n")
+
+        category_path = write_category(tmp / "articles", args.articles, args.body_chars)
+        corpus_mb = sum(p.stat().st_size for p in category_path.iterdir()) / 1e6
+        print(f"Synthetic category: {args.articles:,} articles, {corpus_mb:.0f} MB on disk\n")
+
+        results = {}
+        for name, run in (("in-memory", in_memory_consolidate), ("streaming", streaming_consolidate)):
+            output_path = tmp / f"{name}.md"
+            results[name] = measure(run, stage, category_path, output_path) + (output_path,)
+
+        print(f"\n{'approach':<10} {'peak MB':>9} {'seconds':>8}")
+        for name, (peak, elapsed, _) in results.items():
+            print(f"{name:<10} {peak / 1e6:>9.1f} {elapsed:>8.1f}")
+
+        old, new = results["in-memory"], results["streaming"]
+        print(f"\nstreaming peak is {new[0] / old[0]:.1%} of in-memory")
+        if not filecmp.cmp(old[2], new[2], shallow=False):
+            print("FAIL: consolidated files differ")
+            return 1
+        print(f"✓ Identical output ({new[2].stat().st_size / 1e6:.0f} MB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Local feature matching check for Stage 4 gap analysis
+
+Matches the real feature database against the platform inventory, then
+runs the gap analysis offline with and without the pre-match and compares
+what the model is sent. Checks that:
+
+  - every competitor feature ends up in category_analysis, at parity or missing
+  - the feature set matched against itself comes out fully matched
+  - a dense embedding gives the same verdicts as the sparse TF-IDF default
+
+    python3 bench_feature_matching.py
+    python3 bench_feature_matching.py --budget 20000
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import sys
+import time
+from pathlib import Path
+
+from feature_matching import competitor_features, match_features, tfidf_embed
+from llm import LLM, FakeAnthropic
+
+TOOLS_DIR = Path(__file__).parent
+DATA_DIR = TOOLS_DIR.parent / "competitor_analysis"
+
+
+def load_stage():
+    spec = importlib.util.spec_from_file_location("gap_analysis", TOOLS_DIR / "04_generate_gap_analysis.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def rating_some(stage):
+    """Fake response that rates only every other feature it is asked about, like a model cutting corners"""
+    def respond(prompt):
+        answer = json.loads(stage.offline_gap_analysis(prompt))
+        for details in answer['category_analysis'].values():
+            details['missing_features'] = details['missing_features'][::2]
+        return json.dumps(answer)
+    return respond
+
+
+def run_offline(stage, competitor_data, platform_data, budget, matches, respond=None):
+    """(analysis, prompts sent, estimated prompt tokens)"""
+    fake = FakeAnthropic(respond or stage.offline_gap_analysis)
+    analysis = asyncio.run(stage.perform_gap_analysis(competitor_data, platform_data, LLM(client=fake),
+                                                      budget, matches))
+    tokens = sum(stage.estimate_tokens(prompt, stage.JSON_CHARS_PER_TOKEN) for prompt in fake.prompts)
+    return analysis, len(fake.prompts), tokens
+
+
+def verdicts(matches):
+    return [(entry['feature'], entry['status']) for entries in matches['categories'].values() for entry in entries]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget", type=int, default=None, help="prompt token budget (default: the stage's)")
+    parser.add_argument("--repeat", type=int, default=5, help="timed matching runs, best is reported")
+    args = parser.parse_args()
+
+    stage = load_stage()
+    budget = args.budget or stage.PROMPT_BUDGET
+    with open(DATA_DIR / "feature_database.json") as f:
+        competitor_data = json.load(f)
+    with open(DATA_DIR / "current_platform_inventory.json") as f:
+        platform_data = json.load(f)
+
+    best = float("inf")
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        matches = match_features(competitor_data, platform_data)
+        best = min(best, time.perf_counter() - started)
+    counts = matches['summary']
+    print(f"{counts['competitor_features']} competitor x {counts['platform_features']} platform features "
+          f"matched in {best * 1000:.0f} ms")
+    print(f"  matched {counts['matched']}, partial {counts['partial']}, missing {counts['missing']}, "
+          f"duplicates {counts['duplicates']}\n")
+
+    failures = []
+    _, old_prompts, old_tokens = run_offline(stage, competitor_data, platform_data, budget, None)
+    analysis, new_prompts, new_tokens = run_offline(stage, competitor_data, platform_data, budget, matches,
+                                                    rating_some(stage))
+    print(f"{'':<16} {'prompts':>8} {'tokens':>8}")
+    print(f"{'all to the LLM':<16} {old_prompts:>8} {old_tokens:>8}")
+    print(f"{'pre-matched':<16} {new_prompts:>8} {new_tokens:>8}")
+    print(f"\n{old_tokens / new_tokens:.1f}x fewer prompt tokens\n")
+
+    # The fake skipped half of what it was asked; those must still get a verdict
+    for name, feature in competitor_features(competitor_data):
+        details = analysis['category_analysis'].get(name, {})
+        missing = {item.get('feature') for item in details.get('missing_features', [])}
+        if feature['feature_name'] not in missing and feature['feature_name'] not in details.get('parity_features', []):
+            failures.append(f"{feature['feature_name']} ({name}) has no verdict")
+    unrated = analysis['coverage']['prematch']['unrated']
+    print(f"{len(unrated)} uncertain features left unrated by the fake model, recorded as unrated gaps\n")
+    if counts['partial'] and not unrated:
+        failures.append("the fake model skipped features but none were reported unrated")
+
+    mirror = {'deep_analysis': {'core_features': [
+        {'name': feature['feature_name'], 'capabilities': [feature.get('description', '')]}
+        for _, feature in competitor_features(competitor_data)]}}
+    mirrored = match_features(competitor_data, mirror)
+    if mirrored['summary']['matched'] != counts['competitor_features'] or mirrored['unmatched_platform']:
+        failures.append(f"self-match: only {mirrored['summary']['matched']} of {counts['competitor_features']} matched")
+
+    dense = match_features(competitor_data, platform_data, embed=lambda texts: tfidf_embed(texts).toarray())
+    if verdicts(dense) != verdicts(matches):
+        failures.append("dense embedding gave different verdicts")
+
+    if failures:
+        print("FAIL")
+        for failure in failures[:20]:
+            print(f"  ✗ {failure}")
+        return 1
+    print(f"✓ All {counts['competitor_features']} features have a verdict; self-match and dense embedding agree")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
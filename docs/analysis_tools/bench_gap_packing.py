@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Prompt packing check for Stage 4 gap analysis
+
+Plans the gap-analysis prompts for the real feature database and platform
+inventory at a range of token budgets and runs them against the offline
+client, checking that:
+
+  - every category reaches a prompt and comes back in category_analysis
+  - every feature is in a prompt, as a full record or at least by name
+  - no prompt's data goes over the budget (by the stage's own estimate)
+  - a category the model leaves out of a combined answer is re-asked
+
+It also shows how much of the data the old [:50000] / [:20000] character
+slices let through.
+
+    python3 bench_gap_packing.py
+    python3 bench_gap_packing.py --budgets 60000 8000 2000
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import re
+import sys
+from pathlib import Path
+
+from llm import LLM, FakeAnthropic
+
+TOOLS_DIR = Path(__file__).parent
+DATA_DIR = TOOLS_DIR.parent / "competitor_analysis"
+
+
+def load_stage():
+    spec = importlib.util.spec_from_file_location("gap_analysis", TOOLS_DIR / "04_generate_gap_analysis.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def legacy_coverage(competitor_data):
+    """Categories and features whose names survive the old 50,000-character slice"""
+    visible = json.dumps(competitor_data, indent=2)[:50000]
+    categories = competitor_data['categories']
+    shown_categories = sum(1 for name in categories if f'"{name}": {{' in visible)
+    shown_features = len(re.findall(r'"feature_name": ', visible))
+    total_features = sum(len(c['features']) for c in categories.values())
+    return shown_categories, len(categories), shown_features, total_features
+
+
+def check_budget(stage, competitor_data, platform_data, budget):
+    """Run the stage offline at one budget; returns (stats, problems)"""
+    fake = FakeAnthropic(stage.offline_gap_analysis)
+    analysis = asyncio.run(stage.perform_gap_analysis(competitor_data, platform_data, LLM(client=fake), budget))
+    problems = []
+
+    prompt_tokens = [stage.estimate_tokens(prompt, stage.JSON_CHARS_PER_TOKEN) for prompt in fake.prompts]
+    template = stage.estimate_tokens(stage.build_prompt([], [], "x"), stage.JSON_CHARS_PER_TOKEN)
+    if max(prompt_tokens) - template > budget:
+        problems.append(f"a prompt carries {max(prompt_tokens) - template} data tokens")
+
+    sent = "\n".join(fake.prompts)
+    full = by_name = 0
+    for name, category in competitor_data['categories'].items():
+        if name not in analysis['category_analysis']:
+            problems.append(f"category {name} not analyzed")
+        for feature in category['features']:
+            quoted = json.dumps(feature['feature_name'], ensure_ascii=False)
+            if f'"feature_name":{quoted}' in sent:
+                full += 1
+            elif quoted in sent:
+                by_name += 1
+            else:
+                problems.append(f"feature {feature['feature_name']} ({name}) never sent")
+
+    stats = (len(fake.prompts), analysis['coverage']['mode'], full, by_name, max(prompt_tokens))
+    return stats, problems
+
+
+def check_skipped_category(stage, competitor_data, platform_data):
+    """A combined answer that leaves a category out gets a follow-up prompt for it"""
+    dropped = sorted(competitor_data['categories'])[-1]
+
+    def forgetful(prompt):
+        response = json.loads(stage.offline_gap_analysis(prompt))
+        if "Cover every competitor category" in prompt:
+            del response['category_analysis'][dropped]
+        return json.dumps(response)
+
+    fake = FakeAnthropic(forgetful)
+    analysis = asyncio.run(stage.perform_gap_analysis(competitor_data, platform_data, LLM(client=fake), 10**6))
+    return len(fake.prompts) == 2 and dropped in analysis['category_analysis']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budgets", type=int, nargs="+", default=[100000, 60000, 20000, 5000, 1500])
+    args = parser.parse_args()
+
+    stage = load_stage()
+    with open(DATA_DIR / "feature_database.json") as f:
+        competitor_data = json.load(f)
+    with open(DATA_DIR / "current_platform_inventory.json") as f:
+        platform_data = json.load(f)
+
+    indented = len(json.dumps(competitor_data, indent=2))
+    compacted = len(stage.compact(competitor_data))
+    print(f"Competitor data: {indented:,} chars indented, {compacted:,} compact "
+          f"({1 - compacted / indented:.0%} smaller)")
+    shown_categories, categories, shown_features, features = legacy_coverage(competitor_data)
+    print(f"Old [:50000] slice: {shown_categories}/{categories} categories, "
+          f"{shown_features}/{features} features, cut at a character offset\n")
+
+    failures = []
+    rows = []
+    for budget in args.budgets:
+        stats, problems = check_budget(stage, competitor_data, platform_data, budget)
+        rows.append((budget,) + stats)
+        failures += [f"budget {budget}: {problem}" for problem in problems]
+
+    print(f"{'budget':>8} {'prompts':>8} {'mode':<14} {'full':>5} {'by name':>8} {'max prompt':>11}")
+    for budget, prompts, mode, full, by_name, largest in rows:
+        print(f"{budget:>8} {prompts:>8} {mode:<14} {full:>5} {by_name:>8} {largest:>11}")
+
+    if not check_skipped_category(stage, competitor_data, platform_data):
+        failures.append("a category left out of a combined answer was not re-asked")
+
+    if failures:
+        print("\nFAIL")
+        for failure in failures[:20]:
+            print(f"  ✗ {failure}")
+        return 1
+    print(f"\n✓ All {categories} categories analyzed and all {features} features sent at every budget")
+    print("✓ Category missing from a combined answer is analyzed separately")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
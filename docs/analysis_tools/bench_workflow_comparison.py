@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Workflow comparison benchmark
+
+Runs 05_workflow_comparison.py over every consolidated category against
+FakeAnthropic, which adds latency to each request and fails a share of
+them with 429/500/529. Output goes to a temporary directory. Checks that:
+
+  - every feature of every category is compared, with no errors left over
+  - every injected error was retried
+  - request starts never come closer together than the rate limit allows
+  - the output files are valid JSON at every moment while results stream in
+
+    python3 bench_workflow_comparison.py
+    python3 bench_workflow_comparison.py --latency 0.5 --error-rate 0.2 --rate 1200
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from component_index import ComponentIndex
+from llm import LLM, FakeAnthropic
+
+TOOLS_DIR = Path(__file__).parent
+
+
+def load_stage():
+    spec = importlib.util.spec_from_file_location("workflow_comparison", TOOLS_DIR / "05_workflow_comparison.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class TimedFake(FakeAnthropic):
+    """FakeAnthropic that also records when each request started"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.starts = []
+
+    async def create(self, *args, **kwargs):
+        self.starts.append(time.monotonic())
+        return await super().create(*args, **kwargs)
+
+
+async def watch(output_dir, done, snapshots):
+    """Read every output file while the run is going; each read must parse"""
+    while not done.is_set():
+        for path in output_dir.glob("*.json"):
+            with open(path) as f:
+                data = json.load(f)  # a torn write would raise here
+            if data["status"] == "in progress":
+                snapshots["partial"] += 1
+            snapshots["reads"] += 1
+        await asyncio.sleep(0.05)
+
+
+async def run(stage, category_files, llm, index, output_dir):
+    done = asyncio.Event()
+    snapshots = {"reads": 0, "partial": 0}
+    watcher = asyncio.create_task(watch(output_dir, done, snapshots))
+    try:
+        results = await stage.run_all(category_files, llm, index)
+    finally:
+        done.set()
+        await watcher
+    return results, snapshots
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per fake request")
+    parser.add_argument("--error-rate", type=float, default=0.1, help="share of requests failing with 429/5xx")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rate", type=float, default=3000, help="requests per minute")
+    args = parser.parse_args()
+
+    stage = load_stage()
+    category_files = sorted(stage.MANGOMINT_CONSOLIDATED.glob("*.md"))
+    fake = TimedFake(stage.offline_workflows, latency=args.latency, error_rate=args.error_rate)
+    index = ComponentIndex.load(stage.CURRENT_CODEBASE_ROOT)
+    llm = LLM(client=fake, concurrency=args.concurrency, rate_limit=args.rate, backoff=0.05)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        stage.OUTPUT_DIR = Path(tmp)
+        started = time.monotonic()
+        results, snapshots = asyncio.run(run(stage, category_files, llm, index, stage.OUTPUT_DIR))
+        elapsed = time.monotonic() - started
+        files = {path.name: json.loads(path.read_text()) for path in stage.OUTPUT_DIR.glob("*.json")}
+
+    failures = []
+    compared = sum(len(comparisons) for _, comparisons in results)
+    for name, data in files.items():
+        if data["status"] != "complete" or data["total_features_compared"] != data["features_found"]:
+            failures.append(f"{name}: {data['total_features_compared']}/{data['features_found']} compared")
+    if len(files) != len(category_files):
+        failures.append(f"{len(files)} output files for {len(category_files)} categories")
+    errors = [c for _, comparisons in results for c in comparisons if c["comparison"].get("winner") == "Error"]
+    if errors:
+        failures.append(f"{len(errors)} comparisons still failed after retries")
+    if llm.retries != fake.errors:
+        failures.append(f"{fake.errors} injected errors but {llm.retries} retries")
+
+    gaps = [b - a for a, b in zip(fake.starts, fake.starts[1:])]
+    interval = 60 / args.rate
+    if gaps and min(gaps) < interval * 0.9:
+        failures.append(f"requests started {min(gaps) * 1000:.1f} ms apart, limit is {interval * 1000:.1f} ms")
+
+    # The old script ran each request after the previous one finished
+    sequential = len(fake.prompts) * args.latency
+    print(f"{len(category_files)} categories, {compared} features compared")
+    print(f"{len(fake.prompts)} requests ({fake.errors} failed and retried), "
+          f"{args.latency * 1000:.0f} ms latency, {args.concurrency} concurrent, {args.rate:g}/min")
+    print(f"\nwall time   {elapsed:>6.1f}s")
+    print(f"sequential  {sequential:>6.1f}s (requests x latency, no retries)")
+    print(f"speedup     {sequential / elapsed:>6.1f}x")
+    print(f"\nrate limit: closest request starts {min(gaps) * 1000:.1f} ms apart (limit {interval * 1000:.1f} ms)")
+    print(f"streaming: {snapshots['reads']} reads during the run, {snapshots['partial']} of partial results, all valid JSON")
+
+    if failures:
+        print("\nFAIL")
+        for failure in failures:
+            print(f"  ✗ {failure}")
+        return 1
+    print("\n✓ Every feature compared, every injected error retried, rate limit held")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""
+Component index for matching competitor features to our UI code
+
+One scan of the components directory builds an inverted index from tokens
+to files. The tokens come from each file's path (directory and file names
+split on camelCase, dashes and underscores) and from the PascalCase
+identifiers it declares (components, props interfaces, types). The first
+HEAD_CHARS of every file are kept alongside, so a lookup never touches the
+disk.
+
+The index is saved as JSON and reused on the next run. Each entry carries
+its file's mtime and size, and only files whose stat changed are read again.
+"""
+
+import json
+import math
+import os
+import re
+from collections import defaultdict
+
+EXTENSIONS = (".tsx",)
+HEAD_CHARS = 1000
+INDEX_VERSION = 1
+
+WORD_PART = re.compile(r'[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+')
+DECLARATION = re.compile(r'\b(?:function|const|class|interface|type|enum)\s+([A-Z]\w*)')
+STOP_WORDS = {"a", "an", "and", "by", "for", "in", "of", "on", "or", "the", "to", "with", "tsx", "index"}
+PATH_WEIGHT = 2.0  # a token in the file or directory name counts double
+
+
+def tokens(text):
+    """Lowercase word parts, singular: 'AppointmentSlots.tsx' -> {'appointment', 'slot'}"""
+    words = set()
+    for part in WORD_PART.findall(text):
+        word = part.lower()
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        if word not in STOP_WORDS:
+            words.add(word)
+    return words
+
+
+class ComponentIndex:
+    def __init__(self, root, cache_file=None):
+        self.root = str(root)
+        self.cache_file = cache_file
+        self.files = {}  # relative path -> {'mtime_ns', 'size', 'path_tokens', 'code_tokens', 'head'}
+        self.postings = {}  # token -> {relative path: weight}
+        self.reads = 0  # files read while refreshing
+
+    @classmethod
+    def load(cls, root, cache_file=None):
+        """Index for root, reusing cache_file entries whose file is unchanged"""
+        index = cls(root, cache_file)
+        cached = {}
+        if cache_file and os.path.exists(cache_file):
+            try:
+                with open(cache_file, 'r') as f:
+                    data = json.load(f)
+                if data.get("version") == INDEX_VERSION and data.get("root") == index.root:
+                    cached = data["files"]
+            except (OSError, ValueError, KeyError):
+                cached = {}
+        changed = index.refresh(cached)
+        if cache_file and (changed or not cached):
+            index.save()
+        index.build_postings()
+        return index
+
+    def refresh(self, cached):
+        """Stat every file once; read only new or modified ones. Returns whether anything changed."""
+        changed = False
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames.sort()
+            for name in sorted(filenames):
+                if not name.endswith(EXTENSIONS):
+                    continue
+                path = os.path.join(dirpath, name)
+                rel = os.path.relpath(path, self.root)
+                stat = os.stat(path)
+                entry = cached.get(rel)
+                if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+                    self.files[rel] = entry
+                    continue
+                self.files[rel] = self.read_entry(path, rel, stat)
+                changed = True
+        return changed or set(cached) != set(self.files)
+
+    def read_entry(self, path, rel, stat):
+        self.reads += 1
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                code = f.read()
+        except (OSError, UnicodeDecodeError):
+            code = ""
+        identifiers = set(DECLARATION.findall(code))
+        return {
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "path_tokens": sorted(tokens(rel)),
+            "code_tokens": sorted(set().union(*(tokens(name) for name in identifiers)) if identifiers else set()),
+            "head": code[:HEAD_CHARS],
+        }
+
+    def save(self):
+        tmp_path = f"{self.cache_file}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"version": INDEX_VERSION, "root": self.root, "files": self.files}, f)
+        os.replace(tmp_path, self.cache_file)
+
+    def build_postings(self):
+        postings = defaultdict(dict)
+        for rel, entry in self.files.items():
+            for token in entry["code_tokens"]:
+                postings[token][rel] = 1.0
+            for token in entry["path_tokens"]:
+                postings[token][rel] = PATH_WEIGHT
+        self.postings = dict(postings)
+
+    def lookup(self, feature_name, limit=3):
+        """Best-matching files for a feature name, by tf-idf-style score; [] when nothing matches"""
+        scores = defaultdict(float)
+        total = len(self.files) or 1
+        for token in tokens(feature_name):
+            matches = self.postings.get(token)
+            if not matches:
+                continue
+            idf = math.log(1 + total / len(matches))
+            for rel, weight in matches.items():
+                scores[rel] += weight * idf
+        ranked = sorted(scores, key=lambda rel: (-scores[rel], rel))
+        return ranked[:limit]
+
+    def head(self, rel):
+        return self.files[rel]["head"]
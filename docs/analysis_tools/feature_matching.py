@@ -0,0 +1,138 @@
+"""
+Local matching of competitor features against the current platform
+
+Every competitor feature ("name. description") and every platform feature
+("name. capabilities") is embedded, and one matrix product of the
+L2-normalised vectors gives the cosine similarity of every pair. Names
+are also compared on their own: a near-identical name (>= NAME_THRESHOLD)
+overrides a text score diluted by a long description. Each competitor
+feature is then classified by its best score:
+
+  matched   score >= matched threshold    at parity, no LLM needed
+  missing   score <  missing threshold    nothing similar, no LLM needed
+  partial   in between                    sent to the LLM with its candidates
+
+A competitor feature whose name repeats an earlier one's (name similarity
+>= NAME_THRESHOLD, so case, punctuation and plurals don't matter) is marked
+duplicate_of the first and takes its verdict instead of being asked about
+again. Descriptions are not used for this: "In-Store Gift Card Sales" and
+"In-Store Package Sales" read alike but are different features.
+
+The default embedding is TF-IDF over character n-grams, fitted on both
+feature sets, so it runs offline. Any function mapping a list of texts to
+a matrix with one row per text (dense or sparse) can be passed as embed.
+"""
+
+from collections import Counter
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+MATCHED_THRESHOLD = 0.6
+MISSING_THRESHOLD = 0.2
+NAME_THRESHOLD = 0.9
+CANDIDATES = 3  # platform features shown to the LLM per partial match
+
+
+def tfidf_embed(texts):
+    """Character 3-5 gram TF-IDF; robust to plurals and word order in short names"""
+    return TfidfVectorizer(analyzer='char_wb', ngram_range=(3, 5), sublinear_tf=True).fit_transform(texts)
+
+
+def dense(matrix):
+    return matrix.toarray() if hasattr(matrix, 'toarray') else matrix
+
+
+def competitor_features(competitor_data):
+    """(category, feature) for every competitor feature, in file order"""
+    return [(name, feature)
+            for name, category in competitor_data.get('categories', {}).items()
+            for feature in category.get('features', [])]
+
+
+def platform_features(current_platform_data):
+    """The current platform's features as {'name', 'category', 'capabilities', 'text'}"""
+    structural = current_platform_data.get('structural_analysis') or {}
+    deep = current_platform_data.get('deep_analysis') or {}
+
+    features = [{'name': feature, 'category': name, 'capabilities': []}
+                for name, details in structural.get('feature_categories', {}).items()
+                for feature in details.get('features', [])]
+    features += [{'name': feature, 'category': 'Additional Capabilities', 'capabilities': []}
+                 for feature in structural.get('additional_capabilities', [])]
+    features += [{'name': feature['name'], 'category': feature.get('category', ''),
+                  'capabilities': feature.get('capabilities', [])}
+                 for feature in deep.get('core_features', [])]
+    for feature in features:
+        feature['text'] = feature['name']
+        if feature['capabilities']:
+            feature['text'] += ". " + " ".join(feature['capabilities'])
+    return features
+
+
+def feature_text(feature):
+    return f"{feature.get('feature_name', '')}. {feature.get('description', '')}"
+
+
+def match_features(competitor_data, current_platform_data, embed=tfidf_embed,
+                   matched=MATCHED_THRESHOLD, missing=MISSING_THRESHOLD):
+    """
+    Classify every competitor feature as matched, partial or missing.
+    Returns {'thresholds', 'summary', 'categories': {name: [entry]},
+    'unmatched_platform'}, where an entry is {'feature', 'status',
+    'score', 'candidates': [{'name', 'score'}]} plus 'duplicate_of'.
+    """
+    features = competitor_features(competitor_data)
+    platform = platform_features(current_platform_data)
+    n = len(features)
+    scores = twins = None
+    if n:
+        names = normalize(embed([feature.get('feature_name', '') for _, feature in features]
+                                + [p['name'] for p in platform]))
+        twins = dense(names[:n] @ names[:n].T)
+    if n and platform:
+        texts = normalize(embed([feature_text(feature) for _, feature in features] + [p['text'] for p in platform]))
+        scores = dense(texts[:n] @ texts[n:].T)
+        name_scores = dense(names[:n] @ names[n:].T)
+        scores = np.where(name_scores >= NAME_THRESHOLD, np.maximum(name_scores, scores), scores)
+
+    categories = {name: [] for name in competitor_data.get('categories', {})}
+    first = list(range(n))  # index of the first feature with the same name
+    for i, (category, feature) in enumerate(features):
+        name = feature.get('feature_name', '')
+        entry = {'feature': name, 'status': 'missing', 'score': 0.0, 'candidates': []}
+        if scores is not None:
+            best = scores[i].argsort()[::-1][:CANDIDATES]
+            entry['score'] = round(float(scores[i, best[0]]), 3)
+            entry['candidates'] = [{'name': platform[j]['name'], 'score': round(float(scores[i, j]), 3)}
+                                   for j in best if scores[i, j] >= missing]
+            if entry['score'] >= matched:
+                entry['status'] = 'matched'
+            elif entry['score'] >= missing:
+                entry['status'] = 'partial'
+
+        if i:
+            j = int(twins[i, :i].argmax())
+            if twins[i, j] >= NAME_THRESHOLD:
+                first[i] = first[j]
+                entry['duplicate_of'] = {'category': features[first[i]][0],
+                                         'feature': features[first[i]][1].get('feature_name', '')}
+        categories[category].append(entry)
+
+    unmatched = [p['name'] for j, p in enumerate(platform) if scores is None or scores[:, j].max() < missing]
+    entries = [entry for category in categories.values() for entry in category]
+    summary = Counter(entry['status'] for entry in entries)
+    return {
+        'thresholds': {'matched': matched, 'missing': missing, 'name': NAME_THRESHOLD},
+        'summary': {
+            'competitor_features': n,
+            'platform_features': len(platform),
+            'matched': summary['matched'],
+            'partial': summary['partial'],
+            'missing': summary['missing'],
+            'duplicates': sum(1 for entry in entries if 'duplicate_of' in entry)
+        },
+        'categories': categories,
+        'unmatched_platform': unmatched
+    }
@@ -0,0 +1,216 @@
+"""
+Shared LLM access for the analysis stages
+
+LLM wraps AsyncAnthropic with a concurrency limit and a content-addressed
+response cache on disk, keyed by (model, prompt hash, max_tokens), so a
+re-run only pays for prompts that changed. An optional rate limit spaces
+requests across every task using the same LLM, and 429 and 5xx responses
+are retried with exponential backoff. Pass client=FakeAnthropic(...) to
+run a stage offline.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+DEFAULT_MODEL = "claude-sonnet-4-20250514"
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RETRIES = 5
+BACKOFF_BASE = 1.0  # seconds before the first retry, doubled each time
+BACKOFF_MAX = 60.0
+CHARS_PER_TOKEN = 4  # rough estimate for English markdown; JSON runs closer to 3
+
+
+def sha256(text):
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def estimate_tokens(text, chars_per_token=CHARS_PER_TOKEN):
+    """Token count estimate for budgeting prompts, without a tokenizer or an API call"""
+    return len(text) // chars_per_token + 1
+
+
+class ResponseCache:
+    """One JSON file per response, named by the hash of what produced it"""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(model, prompt, max_tokens):
+        return sha256(json.dumps([model, sha256(prompt), max_tokens]))
+
+    def path(self, key):
+        return self.directory / f"{key}.json"
+
+    def get(self, key):
+        try:
+            with open(self.path(key), 'r') as f:
+                return json.load(f)["text"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def put(self, key, model, max_tokens, text):
+        path = self.path(key)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump({"model": model, "max_tokens": max_tokens, "text": text}, f)
+        os.replace(tmp_path, path)
+
+
+class RateLimiter:
+    """Spaces request starts evenly: at most per_minute a minute, across all tasks"""
+
+    def __init__(self, per_minute):
+        self.interval = 60.0 / per_minute
+        self.last_start = float("-inf")
+        self.lock = asyncio.Lock()  # FIFO, so waiters go in call order
+
+    async def wait(self):
+        async with self.lock:
+            delay = self.last_start + self.interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            # Measured after waking, so a late wakeup can't squeeze the next request closer
+            self.last_start = time.monotonic()
+
+
+def is_retryable(error):
+    """Rate limited (429) or a server-side failure (5xx, including 529 overloaded)"""
+    status = getattr(error, "status_code", None)
+    return status is not None and (status == 429 or status >= 500)
+
+
+def retry_delay(error, attempt, base=BACKOFF_BASE):
+    """Exponential backoff with jitter, never sooner than the server's retry-after"""
+    delay = min(BACKOFF_MAX, base * 2 ** attempt)
+    delay = delay / 2 + random.uniform(0, delay / 2)
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    try:
+        return max(delay, float(retry_after)) if retry_after else delay
+    except ValueError:
+        return delay
+
+
+class LLM:
+    def __init__(self, client=None, cache_dir=None, concurrency=DEFAULT_CONCURRENCY,
+                 rate_limit=None, max_retries=DEFAULT_RETRIES, backoff=BACKOFF_BASE):
+        if client is None:
+            from anthropic import AsyncAnthropic
+            # Retries happen here, where they can respect the shared rate limit
+            client = AsyncAnthropic(max_retries=0)  # uses ANTHROPIC_API_KEY from the environment
+        self.client = client
+        self.cache = ResponseCache(cache_dir) if cache_dir else None
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.rate_limiter = RateLimiter(rate_limit) if rate_limit else None
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.calls = 0
+        self.cache_hits = 0
+        self.retries = 0
+
+    async def complete(self, prompt, model=DEFAULT_MODEL, max_tokens=4000):
+        """Response text for a single-turn prompt, from the cache when possible"""
+        key = ResponseCache.key(model, prompt, max_tokens)
+        if self.cache:
+            text = self.cache.get(key)
+            if text is not None:
+                self.cache_hits += 1
+                return text
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self.semaphore:
+                    if self.rate_limiter:
+                        await self.rate_limiter.wait()
+                    message = await self.client.messages.create(
+                        model=model,
+                        max_tokens=max_tokens,
+                        messages=[{"role": "user", "content": prompt}]
+                    )
+                break
+            except Exception as e:
+                if attempt == self.max_retries or not is_retryable(e):
+                    raise
+                self.retries += 1
+                # Back off outside the semaphore so other requests keep going
+                await asyncio.sleep(retry_delay(e, attempt, self.backoff))
+        self.calls += 1
+        text = message.content[0].text
+
+        # A response cut off at max_tokens is usually broken JSON; ask again next run
+        if self.cache and message.stop_reason != "max_tokens":
+            self.cache.put(key, model, max_tokens, text)
+        return text
+
+
+def parse_json_response(response_text):
+    """JSON from a response, with or without a ```json fence around it"""
+    json_match = re.search(r'```json\s*\n(.*?)\n```', response_text, re.DOTALL)
+    if json_match:
+        return json.loads(json_match.group(1))
+    try:
+        return json.loads(response_text)
+    except ValueError:
+        start, end = response_text.find('{'), response_text.rfind('}') + 1
+        return json.loads(response_text[start:end])
+
+
+def union(*lists):
+    """Concatenate lists of response items, dropping repeats, keeping first-seen order"""
+    seen, merged = set(), []
+    for items in lists:
+        for item in items or []:
+            key = json.dumps(item, sort_keys=True)
+            if key not in seen:
+                seen.add(key)
+                merged.append(item)
+    return merged
+
+
+class FakeAPIError(Exception):
+    """What FakeAnthropic raises for an injected error; carries status_code like the SDK's errors"""
+
+    def __init__(self, status_code):
+        super().__init__(f"fake API error {status_code}")
+        self.status_code = status_code
+        self.response = None
+
+
+class FakeAnthropic:
+    """
+    Offline stand-in for AsyncAnthropic: messages.create answers with
+    respond(prompt) after an optional simulated latency, and records every
+    prompt it was sent. error_rate makes that share of requests fail with a
+    429, 500 or 529 instead.
+    """
+
+    def __init__(self, respond, latency=0.0, error_rate=0.0, seed=0):
+        self.respond = respond
+        self.latency = latency
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.prompts = []
+        self.errors = 0
+        self.messages = self
+
+    async def create(self, model, max_tokens, messages, **kwargs):
+        prompt = messages[-1]["content"]
+        self.prompts.append(prompt)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.random.random() < self.error_rate:
+            self.errors += 1
+            raise FakeAPIError(self.random.choice([429, 500, 529]))
+        return SimpleNamespace(
+            content=[SimpleNamespace(text=self.respond(prompt))],
+            stop_reason="end_turn"
+        )
@@ -1,42 +1,223 @@
 #!/usr/bin/env python3
 """
 Master Orchestrator: Runs the complete competitive analysis pipeline
+
+Each stage declares the files it reads and writes. A run is successful
+when the script exits 0 and every declared output exists; stage scripts
+exit non-zero when any part of their work failed. A stage is skipped when
+its inputs (including its own script) and outputs still match the
+fingerprints recorded after its last successful run, and stages whose
+dependencies are done run concurrently, so codebase analysis (3) overlaps
+with consolidation and feature extraction (1-2).
+
+    python3 run_full_analysis.py            # asks before running
+    python3 run_full_analysis.py --yes      # non-interactive
+    python3 run_full_analysis.py --dry-run  # show what would run
+    python3 run_full_analysis.py --force    # ignore fingerprints
 """
 
-import subprocess
+import argparse
+import asyncio
+import fnmatch
+import hashlib
+import json
+import os
 import sys
-from pathlib import Path
 import time
+from pathlib import Path
 
-TOOLS_DIR = Path(__file__).parent
+TOOLS_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = TOOLS_DIR.parent.parent
+OUTPUT_DIR = PROJECT_ROOT / "docs/competitor_analysis"
+STATE_FILE = OUTPUT_DIR / ".pipeline_state.json"
+LOGS_DIR = OUTPUT_DIR / "logs"
+
+SKIP_DIRS = {"node_modules", ".next", ".turbo", "dist", "build", ".git", "__pycache__"}
+
+CODE_PATTERNS = [
+    f"{root}/**/{name}"
+    for root in ("apps", "packages")
+    for name in ("*.ts", "*.tsx", "*.js", "*.jsx", "package.json")
+]
+
+
+class Stage:
+    def __init__(self, number, name, script, description, inputs, outputs, after=()):
+        self.number = number
+        self.name = name
+        self.script = script
+        self.description = description
+        self.inputs = inputs  # glob patterns relative to PROJECT_ROOT
+        self.outputs = outputs
+        self.after = after  # stage names that must finish first
+
+
+STAGES = [
+    Stage(1, "consolidate", "01_consolidate_categories.py", "Category Consolidation",
+          inputs=["docs/mangomint-analysis/**/*.md"],
+          outputs=["docs/competitor_analysis/consolidated_categories/*.md",
+                   "docs/competitor_analysis/category_index.json"]),
+    Stage(2, "extract", "02_extract_features.py", "Feature Extraction (AI-Powered)",
+          inputs=["docs/competitor_analysis/consolidated_categories/*.md"],
+          outputs=["docs/competitor_analysis/extracted_features/*.json",
+                   "docs/competitor_analysis/feature_database.json",
+                   "docs/competitor_analysis/feature_index.json"],
+          after=["consolidate"]),
+    Stage(3, "codebase", "03_analyze_codebase.py", "Codebase Analysis",
+          inputs=CODE_PATTERNS,
+          outputs=["docs/competitor_analysis/codebase_analysis/*.json",
+                   "docs/competitor_analysis/current_platform_inventory.json"]),
+    Stage(4, "gap", "04_generate_gap_analysis.py", "Gap Analysis & Recommendations",
+          inputs=["docs/competitor_analysis/feature_database.json",
+                  "docs/competitor_analysis/current_platform_inventory.json"],
+          outputs=["docs/competitor_analysis/reports/gap_analysis.json",
+                   "docs/competitor_analysis/reports/GAP_ANALYSIS_REPORT.md"],
+          after=["extract", "codebase"]),
+]
+
+
+def expand(patterns):
+    """Files matching the patterns, skipping dependency and build directories"""
+    files = set()
+    for pattern in patterns:
+        if "/**/" in pattern:
+            base, name = pattern.split("/**/", 1)
+            for root, dirs, filenames in os.walk(PROJECT_ROOT / base):
+                dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+                files.update(Path(root) / f for f in fnmatch.filter(filenames, name))
+        else:
+            files.update(p for p in PROJECT_ROOT.glob(pattern) if p.is_file())
+    return sorted(files)
+
+
+def fingerprint(paths):
+    """Hash of (path, mtime, size) for every file; changes on edits, additions and deletions"""
+    digest = hashlib.sha256()
+    for path in paths:
+        stat = path.stat()
+        digest.update(f"{path.relative_to(PROJECT_ROOT)}\0{stat.st_mtime_ns}\0{stat.st_size}\n".encode())
+    return digest.hexdigest()
+
+
+def stage_fingerprints(stage):
+    inputs = expand(stage.inputs) + [TOOLS_DIR / stage.script]
+    outputs = expand(stage.outputs)
+    return {
+        "inputs": fingerprint(inputs),
+        "outputs": fingerprint(outputs) if outputs else None,
+    }
+
+
+def load_state():
+    if STATE_FILE.exists():
+        with open(STATE_FILE, 'r') as f:
+            return json.load(f)
+    return {}
+
+
+def save_state(state):
+    STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(STATE_FILE, 'w') as f:
+        json.dump(state, f, indent=2)
 
-def run_stage(stage_number, script_name, description):
-    """Run a single stage of the analysis"""
-    print("\n" + "="*70)
-    print(f"STAGE {stage_number}: {description}")
-    print("="*70 + "\n")
 
-    script_path = TOOLS_DIR / script_name
+def missing_outputs(stage):
+    """Output patterns that match no file"""
+    return [pattern for pattern in stage.outputs if not expand([pattern])]
 
-    if not script_path.exists():
-        print(f"Error: Script not found: {script_path}")
-        return False
 
-    try:
-        result = subprocess.run(
-            [sys.executable, str(script_path)],
-            check=True,
-            capture_output=False
+def is_fresh(stage, state):
+    """Outputs exist and nothing on either side changed since the last successful run"""
+    current = stage_fingerprints(stage)
+    return current["outputs"] is not None and state.get(stage.name) == current
+
+
+class Pipeline:
+    def __init__(self, stages, force=False):
+        self.stages = {stage.name: stage for stage in stages}
+        self.force = force
+        self.state = load_state()
+        self.results = {}  # name -> (status, seconds)
+        self.done = {name: asyncio.Event() for name in self.stages}
+
+    async def run_stage(self, stage):
+        for dependency in stage.after:
+            await self.done[dependency].wait()
+
+        try:
+            if any(self.results[d][0] in ("failed", "blocked") for d in stage.after):
+                self.results[stage.name] = ("blocked", 0.0)
+                print(f"[{stage.name}] skipped: a dependency failed")
+                return
+
+            # Checked only now, after dependencies may have rewritten our inputs
+            if not self.force and is_fresh(stage, self.state):
+                self.results[stage.name] = ("up to date", 0.0)
+                print(f"[{stage.name}] up to date, skipping")
+                return
+
+            print(f"[{stage.name}] STAGE {stage.number}: {stage.description}")
+            started = time.time()
+            returncode = await self.run_script(stage)
+            elapsed = time.time() - started
+            missing = missing_outputs(stage) if returncode == 0 else []
+
+            if returncode == 0 and not missing:
+                self.state[stage.name] = stage_fingerprints(stage)
+                save_state(self.state)
+                self.results[stage.name] = ("ran", elapsed)
+                print(f"[{stage.name}] ✓ Stage {stage.number} completed in {elapsed:.1f}s")
+            else:
+                self.state.pop(stage.name, None)
+                save_state(self.state)
+                self.results[stage.name] = ("failed", elapsed)
+                if missing:
+                    print(f"[{stage.name}] ✗ Stage {stage.number} exited cleanly but wrote nothing for: "
+                          f"{', '.join(missing)}")
+                else:
+                    print(f"[{stage.name}] ✗ Stage {stage.number} failed with error code {returncode}")
+        finally:
+            self.done[stage.name].set()
+
+    async def run_script(self, stage):
+        """Run a stage script, prefixing its output and keeping a full log"""
+        LOGS_DIR.mkdir(parents=True, exist_ok=True)
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, "-u", str(TOOLS_DIR / stage.script),
+            cwd=str(TOOLS_DIR),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
         )
-        print(f"\n✓ Stage {stage_number} completed successfully!")
-        return True
+        with open(LOGS_DIR / f"{stage.name}.log", 'w') as log:
+            async for line in process.stdout:
+                text = line.decode(errors="replace")
+                log.write(text)
+                print(f"[{stage.name}] {text}", end="")
+        return await process.wait()
+
+    async def run(self):
+        await asyncio.gather(*(self.run_stage(stage) for stage in self.stages.values()))
+        return all(status in ("ran", "up to date") for status, _ in self.results.values())
+
+
+def print_timing_summary(results, total):
+    print("\n" + "="*70)
+    print("STAGE SUMMARY")
+    print("="*70)
+    for stage in STAGES:
+        status, seconds = results.get(stage.name, ("not run", 0.0))
+        print(f"  {stage.number}. {stage.description:<40} {status:<11} {seconds:>7.1f}s")
+    print(f"\nTotal time: {int(total // 60)}m {int(total % 60)}s")
 
-    except subprocess.CalledProcessError as e:
-        print(f"\n✗ Stage {stage_number} failed with error code {e.returncode}")
-        return False
 
 def main():
     """Run the complete analysis pipeline"""
+    parser = argparse.ArgumentParser(description="Run the competitive analysis pipeline")
+    parser.add_argument("-y", "--yes", action="store_true", help="don't ask for confirmation")
+    parser.add_argument("--force", action="store_true", help="rerun every stage")
+    parser.add_argument("--dry-run", action="store_true", help="show which stages would run")
+    args = parser.parse_args()
+
     print("""
 ╔═══════════════════════════════════════════════════════════════════╗
 ║                                                                    ║
@@ -46,47 +227,42 @@ def main():
 ╚═══════════════════════════════════════════════════════════════════╝
     """)
 
-    start_time = time.time()
-
-    stages = [
-        (1, "01_consolidate_categories.py", "Category Consolidation"),
-        (2, "02_extract_features.py", "Feature Extraction (AI-Powered)"),
-        (3, "03_analyze_codebase.py", "Codebase Analysis"),
-        (4, "04_generate_gap_analysis.py", "Gap Analysis & Recommendations")
-    ]
-
-    print("\nThis will run all 4 stages of competitive analysis:")
-    for stage_num, _, desc in stages:
-        print(f"  {stage_num}. {desc}")
-
-    print("\nEstimated time: 10-20 minutes (depending on API speed)")
-    response = input("\nProceed? (y/n): ")
+    state = load_state()
+    plan = {}
+    print("Pipeline stages:")
+    for stage in STAGES:
+        after = f" (after {', '.join(stage.after)})" if stage.after else ""
+        if args.force or not is_fresh(stage, state):
+            plan[stage.name] = "will run"
+        elif any(plan[d] != "up to date" for d in stage.after):
+            plan[stage.name] = "reruns if its inputs change"
+        else:
+            plan[stage.name] = "up to date"
+        print(f"  {stage.number}. {stage.description}{after}: {plan[stage.name]}")
 
-    if response.lower() != 'y':
-        print("Analysis cancelled.")
-        return
+    if args.dry_run:
+        return 0
 
-    # Run all stages
-    for stage_num, script, description in stages:
-        success = run_stage(stage_num, script, description)
+    # Only prompt when a person is there to answer
+    if not args.yes and sys.stdin.isatty():
+        response = input("\nProceed? (y/n): ")
+        if response.lower() != 'y':
+            print("Analysis cancelled.")
+            return 0
 
-        if not success:
-            print(f"\n⚠️  Pipeline stopped at Stage {stage_num}")
-            print("Fix the error and rerun this script to continue.")
-            return
-
-        # Small delay between stages
-        time.sleep(2)
+    start_time = time.time()
+    pipeline = Pipeline(STAGES, force=args.force)
+    ok = asyncio.run(pipeline.run())
+    print_timing_summary(pipeline.results, time.time() - start_time)
 
-    # All stages complete!
-    elapsed_time = time.time() - start_time
-    minutes = int(elapsed_time // 60)
-    seconds = int(elapsed_time % 60)
+    if not ok:
+        print("\n⚠️  Pipeline did not finish. Fix the error and rerun; completed stages will be skipped.")
+        print(f"Stage logs: {LOGS_DIR}")
+        return 1
 
     print("\n" + "="*70)
     print("🎉 COMPETITIVE ANALYSIS COMPLETE!")
     print("="*70)
-    print(f"\nTotal time: {minutes}m {seconds}s")
     print("\n📊 Your analysis outputs:")
     print("  - Consolidated categories: docs/competitor_analysis/consolidated_categories/")
     print("  - Feature database: docs/competitor_analysis/feature_database.json")
@@ -101,6 +277,7 @@ def main():
     print("  1. Scrape their documentation (use scrape_mangomint.py as template)")
     print("  2. Run this script again")
     print("  3. Compare results across multiple competitors")
+    return 0
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
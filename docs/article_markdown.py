@@ -0,0 +1,146 @@
+"""
+Article markdown parser shared by the scraper, the fetch-queue builder and
+the analysis consolidator.
+
+Help-article files look like:
+
+    # Title
+    **URL:** https://...
+    ## Category ... (header sections)
+    ## Article Content
+    ...
+    ## Images and Screenshots
+    1. **alt**
+       - Source: https://...
+    ## Analysis Notes ...
+
+parse_lines() reads them one line at a time, in a single pass, into an
+Article record, so files can be streamed instead of loaded whole and
+scanned once per field.
+"""
+
+import re
+from dataclasses import dataclass, field
+
+ARTICLE_CONTENT = "## Article Content"
+IMAGES = "## Images and Screenshots"
+ANALYSIS_NOTES = "## Analysis Notes"
+# Scraped sections start here; everything above is the file's own header
+HEADER_END = (ARTICLE_CONTENT, IMAGES, ANALYSIS_NOTES)
+HEADER_FALLBACK_LINES = 10
+
+URL_MARKER = "**URL:** "
+IMAGE_ALT = re.compile(r'\d+\.\s+\*\*(.+?)\*\*\s*$')
+IMAGE_SOURCE = re.compile(r'\s*- Source: (.+)')
+
+_HEADER, _CONTENT, _IMAGES, _OTHER = range(4)
+
+
+@dataclass
+class Article:
+    title: str = "Untitled"
+    url: str = ""
+    content: str = ""
+    images: list = field(default_factory=list)  # [{'alt': ..., 'src': ...}]
+    header: str = ""  # text before the scraped sections, kept when rewriting a file
+    file_path: str = ""
+
+    def to_dict(self):
+        """The record shape the consolidator stores"""
+        return {
+            'title': self.title,
+            'url': self.url,
+            'content': self.content,
+            'images': self.images,
+            'file_path': self.file_path
+        }
+
+
+def parse_lines(lines, file_path=""):
+    """Parse an iterable of lines (e.g. an open file) into an Article"""
+    article = Article(file_path=str(file_path))
+    title = url = None
+    header, content, images = [], [], []
+    header_done = False
+    content_done = False
+    state = _HEADER
+    alt = None
+
+    for line in lines:
+        # Hot path: body text of the article
+        if state == _CONTENT and not line.startswith("## Images"):
+            content.append(line)
+            continue
+
+        if line.startswith("## "):
+            if not header_done and line.startswith(HEADER_END):
+                header_done = True
+            if line.startswith(ARTICLE_CONTENT):
+                state = _CONTENT
+            elif line.startswith(IMAGES):
+                content_done = state == _CONTENT
+                state = _IMAGES
+            else:
+                if state == _CONTENT:  # "## Images..." that isn't the images section
+                    content_done = True
+                state = _HEADER if not header_done else _OTHER
+            if not header_done:
+                header.append(line)
+            continue
+
+        if not header_done:
+            header.append(line)
+        if title is None and line.startswith("# ") and len(line.rstrip("\r\n")) > 2:
+            title = line[2:].rstrip("\r\n")
+        elif url is None and URL_MARKER in line:
+            url = line.split(URL_MARKER, 1)[1].rstrip("\r\n")
+        elif state == _IMAGES:
+            match = IMAGE_ALT.match(line)
+            if match:
+                alt = match.group(1)
+                continue
+            match = IMAGE_SOURCE.match(line)
+            if match and alt is not None:
+                images.append({'alt': alt, 'src': match.group(1).rstrip("\r\n")})
+            alt = None
+
+    if title is not None:
+        article.title = title
+    if url is not None:
+        article.url = url
+    if content_done:
+        # Body runs up to the blank line before "## Images"
+        article.content = "".join(content).strip()
+    article.images = images
+    article.header = "".join(header if header_done else header[:HEADER_FALLBACK_LINES]).strip()
+    return article
+
+
+def parse_file(file_path):
+    """Stream one article file through parse_lines"""
+    with open(file_path, 'r') as f:
+        return parse_lines(f, file_path)
+
+
+def parse_text(text, file_path=""):
+    return parse_lines(text.splitlines(keepends=True), file_path)
+
+
+def read_header(file_path):
+    """The header parse_file would return, reading only as far as its end"""
+    lines = []
+    with open(file_path, 'r') as f:
+        for line in f:
+            if line.startswith(HEADER_END):
+                return "".join(lines).strip()
+            lines.append(line)
+    return "".join(lines[:HEADER_FALLBACK_LINES]).strip()
+
+
+def replace_header(text, header):
+    """text with its header swapped for header; None if it has no section to keep"""
+    lines = text.splitlines(keepends=True)
+    for i, line in enumerate(lines):
+        if line.startswith(HEADER_END):
+            return header + "\n\n" + "".join(lines[i:])
+    return None
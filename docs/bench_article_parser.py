@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Article parser benchmark
+
+Parses the scraped help-center corpus, replicated up to --articles records,
+with the regex extractor the consolidator used to run and with the shared
+line parser in article_markdown.py. Checks both produce the same records.
+
+    python3 bench_article_parser.py
+    python3 bench_article_parser.py --articles 20000
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+from article_markdown import parse_text
+
+CORPUS_DIR = Path(__file__).parent / "mangomint-analysis"
+
+
+def regex_extract(file_path, content):
+    """The previous consolidator extractor: one regex search per field"""
+    title_match = re.search(r'^# (.+)$', content, re.MULTILINE)
+    title = title_match.group(1) if title_match else "Untitled"
+
+    url_match = re.search(r'\*\*URL:\*\* (.+)$', content, re.MULTILINE)
+    url = url_match.group(1) if url_match else ""
+
+    article_section = re.search(r'## Article Content\s*\n\n(.*?)\n\n## Images', content, re.DOTALL)
+    article_text = article_section.group(1).strip() if article_section else ""
+
+    images = []
+    image_section = re.search(r'## Images and Screenshots\s*\n(.*?)(?=\n## |$)', content, re.DOTALL)
+    if image_section:
+        image_entries = re.findall(r'\d+\.\s+\*\*(.+?)\*\*\s+- Source: (.+)', image_section.group(1))
+        images = [{'alt': alt, 'src': src} for alt, src in image_entries]
+
+    return {
+        'title': title,
+        'url': url,
+        'content': article_text,
+        'images': images,
+        'file_path': str(file_path)
+    }
+
+
+def line_extract(file_path, content):
+    return parse_text(content, file_path).to_dict()
+
+
+def load_corpus():
+    return [(str(p), p.read_text()) for p in sorted(CORPUS_DIR.rglob("*.md")) if p.name != "README.md"]
+
+
+def timed(extract, corpus, count):
+    started = time.perf_counter()
+    for i in range(count):
+        extract(*corpus[i % len(corpus)])
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=100_000)
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    size = sum(len(text) for _, text in corpus)
+    print(f"{len(corpus)} articles ({size / 1e6:.1f} MB) replicated to {args.articles:,}\n")
+
+    # Correctness on the real corpus first
+    mismatches = [path for path, text in corpus if regex_extract(path, text) != line_extract(path, text)]
+    if mismatches:
+        print(f"FAIL: {len(mismatches)} articles parse differently, e.g. {mismatches[0]}")
+        return 1
+    print(f"✓ Identical records for all {len(corpus)} articles\n")
+
+    results = {}
+    for name, extract in (("regex", regex_extract), ("line parser", line_extract)):
+        elapsed = timed(extract, corpus, args.articles)
+        results[name] = elapsed
+        print(f"{name:<12} {elapsed:>7.2f}s  {args.articles / elapsed:>9,.0f} articles/s")
+
+    print(f"\nline parser: {results['regex'] / results['line parser']:.1f}x faster")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
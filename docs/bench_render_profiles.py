@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Render profile benchmark for scrape_mangomint.py
+
+Serves generated help-article fixtures from a local HTTP server and renders
+them with the "full" and "text" profiles, reporting pages/minute and bytes
+served. Third-party tracker hosts are pointed at the same server with
+Chromium's host resolver rules, so blocking them is measured too.
+
+    python3 bench_render_profiles.py
+    python3 bench_render_profiles.py --pages 60 --workers 4 --latency-ms 80
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from playwright.async_api import async_playwright
+
+from scrape_mangomint import (
+    ARTICLE_CONTAINER_JS,
+    CONTENT_POLL_MS,
+    CONTENT_READY_JS,
+    CONTENT_TIMEOUT,
+    IMAGES_JS,
+    TIMEOUT,
+    block_heavy,
+)
+
+TRACKER_HOSTS = ["www.google-analytics.com", "www.googletagmanager.com", "static.hotjar.com"]
+IMAGES_PER_PAGE = 6
+IMAGE_BYTES = 150_000
+FONT_BYTES = 80_000
+TRACKER_BYTES = 90_000
+
+PAGE_TEMPLATE = """<!doctype html>
+<html>
+<head>
+  <title>Fixture article {n}</title>
+  <style>@font-face {{ font-family: Brand; src: url(/static/brand.woff2); }} body {{ font-family: Brand; }}</style>
+  {trackers}
+</head>
+<body>
+  <nav>Help Center</nav>
+  <div class="article-body">
+    <h1>How to use feature {n}</h1>
+    {paragraphs}
+    {images}
+  </div>
+  <footer>Footer</footer>
+</body>
+</html>
+"""
+
+
+def build_fixtures(pages):
+    """path -> (content type, body, is_third_party)"""
+    files = {
+        "/static/brand.woff2": ("font/woff2", os.urandom(FONT_BYTES), False),
+        "/analytics.js": ("application/javascript", b"/*" + b"x" * TRACKER_BYTES + b"*/", True),
+    }
+    trackers = "\n  ".join(f'<script src="http://{host}/analytics.js"></script>' for host in TRACKER_HOSTS)
+    for n in range(pages):
+        images = []
+        for i in range(IMAGES_PER_PAGE):
+            path = f"/img/{n}-{i}.png"
+            files[path] = ("image/png", os.urandom(IMAGE_BYTES), False)
+            images.append(f'<img src="{path}" alt="Screenshot {i} of feature {n}">')
+        paragraphs = "\n    ".join(
+            f"<p>Step {i}: open the settings for feature {n} and adjust option {i} as needed.</p>"
+            for i in range(12)
+        )
+        html = PAGE_TEMPLATE.format(n=n, trackers=trackers, paragraphs=paragraphs, images="\n    ".join(images))
+        files[f"/article/{n}/"] = ("text/html", html.encode(), False)
+    return files
+
+
+def start_server(files, latency):
+    """Stand-in for the help center and its CDNs; counts every byte it serves."""
+    stats = {"bytes": 0, "requests": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            entry = files.get(self.path)
+            if entry is None:
+                self.send_error(404)
+                return
+            content_type, body, third_party = entry
+            # Third-party hosts are farther away than the site itself
+            time.sleep(latency * (3 if third_party else 1))
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            with lock:
+                stats["bytes"] += len(body)
+                stats["requests"] += 1
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, stats
+
+
+async def render_all(browser, urls, profile, workers):
+    """Render urls the way the scraper does; returns {url: image count}"""
+    context = await browser.new_context()
+    if profile == "text":
+        await context.route("**/*", block_heavy)
+    queue = list(reversed(urls))
+    images = {}
+
+    async def worker():
+        page = await context.new_page()
+        while queue:
+            url = queue.pop()
+            await page.goto(url, timeout=TIMEOUT, wait_until="domcontentloaded")
+            await page.wait_for_function(CONTENT_READY_JS, polling=CONTENT_POLL_MS, timeout=CONTENT_TIMEOUT)
+            if not await page.evaluate(ARTICLE_CONTAINER_JS):
+                raise Exception(f"No content extracted from {url}")
+            images[url] = len(await page.evaluate(IMAGES_JS))
+        await page.close()
+
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    await context.close()
+    return images
+
+
+async def run(args):
+    files = build_fixtures(args.pages)
+    server, stats = start_server(files, args.latency_ms / 1000)
+    port = server.server_address[1]
+    urls = [f"http://127.0.0.1:{port}/article/{n}/" for n in range(args.pages)]
+    rules = ", ".join(f"MAP {host} 127.0.0.1:{port}" for host in TRACKER_HOSTS)
+
+    results = {}
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True, args=[f"--host-resolver-rules={rules}"])
+        try:
+            for profile in ("full", "text"):
+                stats["bytes"] = stats["requests"] = 0
+                started = time.perf_counter()
+                images = await render_all(browser, urls, profile, args.workers)
+                elapsed = time.perf_counter() - started
+                results[profile] = (elapsed, stats["bytes"], stats["requests"], images)
+        finally:
+            await browser.close()
+            server.shutdown()
+
+    print(f"{args.pages} fixture articles, {args.workers} workers, {args.latency_ms} ms latency\n")
+    print(f"{'profile':<8} {'pages/min':>10} {'MB served':>10} {'requests':>9}")
+    for profile, (elapsed, served, requests, _) in results.items():
+        print(f"{profile:<8} {args.pages / elapsed * 60:>10.0f} {served / 1e6:>10.2f} {requests:>9}")
+
+    full, text = results["full"], results["text"]
+    print(f"\ntext profile: {full[0] / text[0]:.1f}x faster, {1 - text[1] / full[1]:.0%} fewer bytes")
+    if full[3] != text[3]:
+        print("FAIL: image metadata differs between profiles")
+        return 1
+    print(f"Image metadata identical ({sum(text[3].values())} images)")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--latency-ms", type=int, default=50, help="per-request server delay (3x for third parties)")
+    args = parser.parse_args()
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
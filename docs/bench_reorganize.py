@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Roadmap model benchmark for reorganize.py and extract_prompts.py
+
+Builds a synthetic roadmap of --items queue-items, copied from the first
+item of workflows/tabs/roadmap/index.html, and times:
+
+  - the old extraction (a regex scan of the section per item, a backwards
+    search for the item start, and a div-depth count one character at a
+    time) against one roadmap_html.parse(). With thousands of items the old
+    way takes minutes, so it runs on --sample evenly spaced items and is
+    scaled up to the full roadmap.
+  - extract_prompts.py's old re.split and three searches per section
+    against the prompts() of the parsed model, and a cached load().
+  - the old renumbering (four re.sub calls with fresh patterns per item)
+    against one renumber() pass over the spliced section, reversing the
+    item order.
+
+It checks that old and new agree on the HTML of every item of the real
+roadmap, the sampled synthetic items, the extracted prompts and the
+renumbered section, that the renumbered section has no duplicate ids, and
+that a cached load gives the same model as a parse.
+
+    python3 bench_reorganize.py
+    python3 bench_reorganize.py --items 20000 --sample 20
+"""
+
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import roadmap_html
+
+ROADMAP = Path(__file__).parent / "workflows" / "tabs" / "roadmap" / "index.html"
+
+
+def legacy_item(roadmap_content, old_num):
+    """One iteration of the previous extraction loop"""
+    matches = list(re.finditer(rf'<div class="priority-number">{old_num}</div>', roadmap_content))
+    if not matches:
+        return None
+    pos = matches[-1].start()
+    while pos > 0:
+        if roadmap_content[pos:pos+100].startswith('<div class="queue-item"'):
+            start = pos
+            break
+        pos -= 1
+    else:
+        return None
+    pos = start
+    depth = 0
+    in_div = False
+    while pos < len(roadmap_content):
+        if roadmap_content[pos:pos+5] == '<div ':
+            depth += 1
+            in_div = True
+        elif roadmap_content[pos:pos+6] == '</div>':
+            depth -= 1
+            if in_div and depth == 0:
+                return roadmap_content[start:pos + 6]
+        pos += 1
+    return None
+
+
+def legacy_renumber(item_html, old_num, new_num):
+    """The previous per-item renumbering"""
+    item_html = re.sub(rf'<div class="priority-number">{old_num}</div>',
+                       f'<div class="priority-number">{new_num}</div>', item_html)
+    item_html = re.sub(rf"toggleSection\('priority-{old_num}'\)", f"toggleSection('priority-{new_num}')", item_html)
+    item_html = re.sub(rf'id="priority-{old_num}"', f'id="priority-{new_num}"', item_html)
+    return re.sub(rf'promoteToCurrently\({old_num}\)', f'promoteToCurrently({new_num})', item_html)
+
+
+def legacy_prompts(content):
+    """The previous extract_prompts.py loop"""
+    prompts_found = []
+    for section in re.split(r'<div class="queue-item"', content)[1:]:
+        if 'COPY THIS PROMPT TO CLAUDE CODE:' not in section:
+            continue
+        priority_match = re.search(r'<div class="priority-number">(\d+)</div>', section)
+        title_match = re.search(r'<div class="queue-item-title">([^<]+)</div>', section)
+        prompt_match = re.search(r'COPY THIS PROMPT TO CLAUDE CODE:</h4>\s*<pre[^>]*>(.*?)</pre>', section, re.DOTALL)
+        if not (priority_match and title_match and prompt_match):
+            continue
+        prompt_text = prompt_match.group(1).strip()
+        prompt_text = re.sub(r'<b>', '**', prompt_text)
+        prompt_text = re.sub(r'</b>', '**', prompt_text)
+        prompt_text = re.sub(r'<span[^>]*>', '', prompt_text)
+        prompt_text = re.sub(r'</span>', '', prompt_text)
+        prompts_found.append({'priority': int(priority_match.group(1)), 'title': title_match.group(1).strip(),
+                              'prompt': prompt_text})
+    prompts_found.sort(key=lambda x: x['priority'])
+    return prompts_found
+
+
+def indexed_items(roadmap):
+    """Priority -> item HTML from the parsed model, last occurrence winning"""
+    return {item.priority: roadmap.item_html(item) for item in roadmap.items if item.priority is not None}
+
+
+def synthetic_roadmap(count):
+    html = ROADMAP.read_text(encoding='utf-8')
+    roadmap = roadmap_html.parse(html)
+    template = roadmap.item_html(roadmap.items[0])
+    items = [template.replace("priority-1'", f"priority-{n}'").replace('id="priority-1"', f'id="priority-{n}"')
+             .replace('<div class="priority-number">1</div>', f'<div class="priority-number">{n}</div>')
+             for n in range(1, count + 1)]
+    return ('<div class="roadmap-queue">\n<h2 class="section-title">🏗️ PHASE I: Foundation</h2>\n'
+            + "\n\n".join(items) + '\n</div>\n<div class="roadmap-queue" style="margin-top: 60px;">\n</div>\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=5000, help="queue-items in the synthetic roadmap")
+    parser.add_argument("--sample", type=int, default=50, help="items the old extraction is timed on")
+    args = parser.parse_args()
+
+    failures = []
+    real = ROADMAP.read_text(encoding='utf-8')
+    indexed = indexed_items(roadmap_html.parse(real))
+    for num in range(1, 27):
+        if legacy_item(real, num) != indexed.get(num):
+            failures.append(f"{ROADMAP.name}: item {num} differs")
+    if legacy_prompts(real) != roadmap_html.parse(real).prompts():
+        failures.append(f"{ROADMAP.name}: extracted prompts differ")
+    print(f"{ROADMAP.name}: {len(indexed)} items, {len(real) / 1e6:.1f} MB")
+
+    html = synthetic_roadmap(args.items)
+    started = time.perf_counter()
+    roadmap = roadmap_html.parse(html)
+    items = indexed_items(roadmap)
+    new_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    old_prompts = legacy_prompts(html)
+    old_extract = time.perf_counter() - started
+    started = time.perf_counter()
+    new_prompts = roadmap.prompts()
+    new_extract = time.perf_counter() - started
+    if old_prompts != new_prompts:
+        failures.append("synthetic: extracted prompts differ")
+
+    with tempfile.TemporaryDirectory() as temp:
+        path = os.path.join(temp, "SYSTEM_WORKFLOWS.html")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(html)
+        started = time.perf_counter()
+        roadmap_html.load(path)
+        first_load = time.perf_counter() - started
+        started = time.perf_counter()
+        cached = roadmap_html.load(path)
+        cached_load = time.perf_counter() - started
+    if cached.items != roadmap.items:
+        failures.append("cached model differs from a fresh parse")
+
+    sample = sorted({1 + i * (args.items - 1) // max(args.sample - 1, 1) for i in range(args.sample)})
+    started = time.perf_counter()
+    legacy = {num: legacy_item(html, num) for num in sample}
+    old_time = (time.perf_counter() - started) * args.items / len(sample)
+
+    mapping = {num: args.items + 1 - num for num in items}
+    order = sorted(items, key=mapping.get)
+    started = time.perf_counter()
+    old_section = "\n\n".join(legacy_renumber(items[num], num, mapping[num]) for num in order)
+    old_renumber = time.perf_counter() - started
+    started = time.perf_counter()
+    unmapped = set()
+    new_section = roadmap_html.renumber("\n\n".join(items[num] for num in order), mapping, unmapped)
+    new_renumber = time.perf_counter() - started
+
+    if old_section != new_section:
+        failures.append("synthetic: renumbered section differs")
+    if unmapped or roadmap_html.duplicate_ids(new_section):
+        failures.append(f"synthetic: unmapped {sorted(unmapped)[:5]}, "
+                        f"duplicate ids {sorted(roadmap_html.duplicate_ids(new_section))[:5]}")
+    if roadmap_html.renumber('<div class="priority-number">7</div>', {}, unmapped) != '<div class="priority-number">7</div>' \
+            or unmapped != {7}:
+        failures.append("an unmapped reference was rewritten or not reported")
+
+    if len(items) != args.items:
+        failures.append(f"synthetic: indexed {len(items)} of {args.items} items")
+    failures += [f"synthetic: item {num} differs" for num in sample if legacy[num] != items.get(num)]
+
+    print(f"\nSynthetic roadmap: {args.items:,} items, {len(html) / 1e6:.1f} MB")
+    print(f"old per-item scans   {old_time:>9.2f}s  (from {len(sample)} sampled items)")
+    print(f"one parse            {new_time:>9.2f}s")
+    print(f"speedup              {old_time / new_time:>9.0f}x\n")
+    print(f"old prompt split     {old_extract:>9.2f}s")
+    print(f"prompts() of model   {new_extract:>9.2f}s  (after the parse above)")
+    print(f"load(), parsing      {first_load:>9.2f}s")
+    print(f"load(), cached       {cached_load:>9.2f}s\n")
+    print(f"old per-item re.sub  {old_renumber:>9.2f}s")
+    print(f"one renumber pass    {new_renumber:>9.2f}s")
+    print(f"speedup              {old_renumber / new_renumber:>9.1f}x")
+
+    if failures:
+        print("\nFAIL")
+        for failure in failures[:20]:
+            print(f"  ✗ {failure}")
+        return 1
+    print(f"\n✓ Same item HTML as the old extraction on the real roadmap and {len(sample)} synthetic items;"
+          f" same prompts, same renumbered section, no duplicate ids; cached model matches")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
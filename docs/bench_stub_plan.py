@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Markdown stub generation check for organize_urls.py
+
+Works on temporary copies only. Checks that:
+
+  - re-running over a copy of mangomint-analysis/ keeps every scraped
+    section byte for byte, and a second re-run changes nothing
+  - on an empty tree the stubs are byte-identical to the old inline writer's
+  - a header that differs is rewritten without touching what follows it
+
+and times the old per-path makedirs + write loop against plan + apply on
+--urls synthetic sitemap paths, first run and re-run.
+
+    python3 bench_stub_plan.py
+    python3 bench_stub_plan.py --urls 50000 --workers 16
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+import organize_urls
+from article_markdown import HEADER_END, parse_text
+
+DOCS_DIR = Path(__file__).parent
+TREE = DOCS_DIR / "mangomint-analysis"
+PATHS_FILE = DOCS_DIR / "mangomint-paths-extracted.txt"
+
+
+def legacy_write(path, category, root):
+    """The previous create_markdown_file: makedirs and an unconditional write per path"""
+    category_dir = os.path.join(root, category)
+    os.makedirs(category_dir, exist_ok=True)
+    with open(os.path.join(category_dir, organize_urls.stub_filename(path)), "w") as f:
+        f.write(organize_urls.stub_content(path, category))
+
+
+def legacy_run(paths, root):
+    for path in paths:
+        category = organize_urls.get_category_for_path(path)
+        if category:
+            legacy_write(path, category, root)
+
+
+def planned_run(paths, root, workers):
+    actions, _, _ = organize_urls.plan_stubs(paths, root)
+    errors = organize_urls.apply_plan(actions, workers)
+    return Counter(action['action'] for action in actions), errors
+
+
+def body(text):
+    """Everything from the first scraped section on"""
+    lines = text.splitlines(keepends=True)
+    return "".join(next((lines[i:] for i, line in enumerate(lines) if line.startswith(HEADER_END)), []))
+
+
+def markdown_files(root):
+    return {os.path.relpath(os.path.join(d, f), root): os.path.join(d, f)
+            for d, _, files in os.walk(root) for f in files if f.endswith(".md")}
+
+
+def synthetic_paths(count, seed=0):
+    """Sitemap-style paths: real slugs with numbered variants"""
+    random.seed(seed)
+    real = [line.strip().rstrip("/") for line in open(PATHS_FILE) if line.strip()]
+    return [f"{random.choice(real)}-{i}/" for i in range(count)]
+
+
+def timed(run, *args):
+    started = time.perf_counter()
+    result = run(*args)
+    return time.perf_counter() - started, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--urls", type=int, default=10000, help="synthetic paths to generate stubs for")
+    parser.add_argument("--workers", type=int, default=8, help="threads writing files")
+    args = parser.parse_args()
+
+    paths = [line.strip() for line in open(PATHS_FILE) if line.strip()]
+    failures = []
+    with tempfile.TemporaryDirectory() as temp:
+        # Re-run over the real tree
+        tree = os.path.join(temp, "tree")
+        shutil.copytree(TREE, tree)
+        before = {rel: open(file).read() for rel, file in markdown_files(tree).items()}
+        counts, errors = planned_run(paths, tree, args.workers)
+        after = {rel: open(file).read() for rel, file in markdown_files(tree).items()}
+        print(f"Re-run over {TREE.name}/: {dict(counts)}")
+        failures += errors
+        by_name = {os.path.basename(rel): text for rel, text in after.items()}
+        for rel, text in before.items():
+            if body(text) != body(by_name.get(os.path.basename(rel), "")):
+                failures.append(f"{rel}: scraped content changed")
+            elif rel not in after:
+                print(f"  moved {rel}")
+        again, _ = planned_run(paths, tree, args.workers)
+        if set(again) - {'unchanged', 'conflict'}:
+            failures.append(f"second re-run not idempotent: {dict(again)}")
+
+        # Fresh tree, against the old writer
+        legacy_run(paths, os.path.join(temp, "old"))
+        planned_run(paths, os.path.join(temp, "new"), args.workers)
+        old_files = {rel: open(f).read() for rel, f in markdown_files(os.path.join(temp, "old")).items()}
+        new_files = {rel: open(f).read() for rel, f in markdown_files(os.path.join(temp, "new")).items()}
+        if old_files != new_files:
+            failures.append("fresh stubs differ from the old writer's")
+
+        # A stale header is rewritten, the body kept
+        rel = sorted(new_files)[0]
+        file = os.path.join(temp, "new", rel)
+        with open(file, "w") as f:
+            f.write(new_files[rel].replace("**URL:**", "**URL:** stale", 1) + "\nscraped text\n")
+        counts, _ = planned_run(paths, os.path.join(temp, "new"), args.workers)
+        text = open(file).read()
+        if counts['update'] != 1 or text != new_files[rel] + "\nscraped text\n":
+            failures.append(f"stale header not updated cleanly: {dict(counts)}")
+        if parse_text(text).header != parse_text(new_files[rel]).header:
+            failures.append("updated header differs from the stub's")
+
+        # Timing on a synthetic sitemap
+        synthetic = synthetic_paths(args.urls)
+        old_time, _ = timed(legacy_run, synthetic, os.path.join(temp, "old_big"))
+        old_rerun, _ = timed(legacy_run, synthetic, os.path.join(temp, "old_big"))
+        new_time, (counts, _) = timed(planned_run, synthetic, os.path.join(temp, "new_big"), args.workers)
+        new_rerun, (recounts, _) = timed(planned_run, synthetic, os.path.join(temp, "new_big"), args.workers)
+
+    print(f"\n{args.urls:,} synthetic paths ({counts['create']:,} files)   first run   re-run")
+    print(f"{'old inline writer':<37} {old_time:>8.2f}s {old_rerun:>7.2f}s  (re-run overwrites every file)")
+    print(f"{'plan + apply':<37} {new_time:>8.2f}s {new_rerun:>7.2f}s  (re-run: {recounts['unchanged']:,} unchanged)")
+
+    if failures:
+        print("\nFAIL")
+        for failure in failures[:20]:
+            print(f"  ✗ {failure}")
+        return 1
+    print("\n✓ Scraped content kept, re-runs idempotent, fresh stubs identical to the old writer's")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
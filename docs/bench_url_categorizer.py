@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+URL categorizer benchmark
+
+Classifies --paths synthetic help-center paths with the old keyword loop
+(substring test of every keyword of every category, first hit wins) and
+with the compiled matcher in organize_urls.py. The synthetic slugs mix
+words from the real extracted paths with the category keywords.
+
+It checks the compiled matcher against a brute-force version of the same
+priority rules, and says why each disagreement with the old loop happened.
+
+    python3 bench_url_categorizer.py
+    python3 bench_url_categorizer.py --paths 200000
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+import organize_urls
+
+PATHS_FILE = Path(__file__).parent / "mangomint-paths-extracted.txt"
+CHECKED = 20000  # paths also classified by the brute-force reference
+
+
+def legacy_category(path):
+    """The previous get_category_for_path: dict order, plain substring test"""
+    path_lower = path.lower()
+    for category, keywords in organize_urls.category_mapping.items():
+        for keyword in keywords:
+            if keyword in path_lower:
+                return category
+    if "/help-articles/" in path_lower and path_lower.count("/") <= 4:
+        return None
+    return "01-getting-started"
+
+
+def reference_category(path):
+    """The three priority rules, by brute force over every keyword"""
+    path_lower = path.lower()
+    found = [(m.start(), m.end(), keyword)
+             for keyword in organize_urls.keyword_category
+             for m in re.finditer(r'(?<![a-z0-9])' + re.escape(keyword), path_lower)]
+    kept = [(s, e, k) for s, e, k in found if not any(s2 <= s and e <= e2 and (s2, e2) != (s, e) for s2, e2, _ in found)]
+    if kept:
+        return min((organize_urls.keyword_category[k] for _, _, k in kept), key=organize_urls.category_priority.get)
+    if "/help-articles/" in path_lower and path_lower.count("/") <= 4:
+        return None
+    return "01-getting-started"
+
+
+def synthetic_paths(count, seed=0):
+    """Slugs of 3-10 words: real path words, plus 0-2 keywords, some glued to a prefix"""
+    random.seed(seed)
+    with open(PATHS_FILE) as f:
+        words = sorted({word for line in f for word in re.split(r'[/-]', line.strip()) if word})
+    keywords = list(organize_urls.keyword_category)
+    prefixes = [""] * 17 + ["pre", "plat", "multi"]  # "plat" + "form", "pre" + "payment", ...
+    paths = []
+    for _ in range(count):
+        slug = random.choices(words, k=random.randint(3, 10))
+        for _ in range(random.choice((0, 1, 1, 2))):
+            slug.insert(random.randrange(len(slug) + 1), random.choice(prefixes) + random.choice(keywords))
+        section = random.choice(("/learn/", "/learn/", "/learn/help-articles/"))
+        paths.append(section + "-".join(slug) + "/")
+    return paths
+
+
+def timed(classify, paths):
+    started = time.perf_counter()
+    results = [classify(path) for path in paths]
+    return time.perf_counter() - started, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--paths", type=int, default=1000000, help="synthetic paths to classify")
+    args = parser.parse_args()
+
+    paths = synthetic_paths(args.paths)
+    keywords = len(organize_urls.keyword_category)
+    print(f"{len(paths):,} synthetic paths, {keywords} keywords in {len(organize_urls.category_mapping)} categories\n")
+
+    old_time, old = timed(legacy_category, paths)
+    new_time, new = timed(organize_urls.get_category_for_path, paths)
+    print(f"old keyword loop   {old_time:>6.2f}s  {len(paths) / old_time:>10,.0f} paths/s")
+    print(f"compiled matcher   {new_time:>6.2f}s  {len(paths) / new_time:>10,.0f} paths/s")
+    print(f"speedup            {old_time / new_time:>6.1f}x\n")
+
+    failures = [path for path, category in zip(paths[:CHECKED], new) if reference_category(path) != category]
+
+    reasons = Counter()
+    for path, before, after in zip(paths[:CHECKED], old, new):
+        if before == after:
+            continue
+        path_lower = path.lower()
+        inside_word = any(re.search(r'[a-z0-9]' + re.escape(k), path_lower)
+                          and not re.search(r'(?<![a-z0-9])' + re.escape(k), path_lower)
+                          for k in organize_urls.category_mapping.get(before, []))
+        reasons["old matched inside a word (rule 1)" if inside_word else "longer keyword wins (rule 2)"] += 1
+    ambiguous = sum(1 for path in paths[:CHECKED] if len(organize_urls.matched_categories(path.lower())) > 1)
+
+    real = [line.strip() for line in open(PATHS_FILE) if line.strip()]
+    moved = [(path, legacy_category(path), organize_urls.get_category_for_path(path)) for path in real]
+    moved = [m for m in moved if m[1] != m[2]]
+
+    changed = sum(1 for before, after in zip(old, new) if before != after)
+    print(f"Changed from the old loop: {changed:,} of {len(paths):,}; reasons in the first {CHECKED:,}:")
+    for reason, count in reasons.most_common():
+        print(f"  {count:>8,}  {reason}")
+    print(f"Ambiguous (several categories, rule 3 decides): {ambiguous:,} of the first {CHECKED:,}")
+    print(f"\nReal extracted paths: {len(moved)} of {len(real)} categorized differently")
+    for path, before, after in moved:
+        print(f"  {path}: {before} -> {after}")
+
+    if failures:
+        print(f"\nFAIL: {len(failures)} of {CHECKED:,} paths differ from the brute-force rules")
+        for path in failures[:10]:
+            print(f"  ✗ {path}")
+        return 1
+    print(f"\n✓ Compiled matcher agrees with the brute-force rules on {min(CHECKED, len(paths)):,} paths")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,7 +2,8 @@
 
 import os
 import glob
-import re
+
+from article_markdown import parse_file
 
 base_dir = "/Users/daminirijhwani/medical-spa-platform/docs/mangomint-analysis"
 
@@ -15,21 +16,18 @@ def get_all_urls_and_files():
         if "README.md" in md_file:
             continue
 
-        with open(md_file, 'r') as f:
-            content = f.read()
-            # Extract URL from the file
-            url_match = re.search(r'\*\*URL:\*\* (https://[^\s]+)', content)
-            if url_match:
-                url = url_match.group(1)
-                # Get category from path
-                rel_path = md_file.replace(base_dir + "/", "")
-                category = rel_path.split("/")[0]
-                results.append({
-                    'file': md_file,
-                    'url': url,
-                    'category': category,
-                    'filename': os.path.basename(md_file)
-                })
+        # Extract URL from the file
+        url = parse_file(md_file).url
+        if url.startswith("https://"):
+            # Get category from path
+            rel_path = md_file.replace(base_dir + "/", "")
+            category = rel_path.split("/")[0]
+            results.append({
+                'file': md_file,
+                'url': url.split()[0],
+                'category': category,
+                'filename': os.path.basename(md_file)
+            })
 
     return results
 
@@ -1,16 +1,34 @@
 #!/usr/bin/env python3
+"""
+Sort the extracted Mango Mint help-center paths into category folders
+
+Stubs are planned before anything is written: files whose header already
+matches are skipped, and only headers are ever rewritten, so re-running it
+never overwrites scraped article content.
+
+    python3 organize_urls.py               # create or update the markdown stubs
+    python3 organize_urls.py --dry-run     # show what would change
+    python3 organize_urls.py --ambiguous   # list paths matching several categories
+"""
 
+import argparse
+import difflib
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
+
+from article_markdown import URL_MARKER, read_header, replace_header
 
 base_url = "https://www.mangomint.com"
 base_dir = "/Users/daminirijhwani/medical-spa-platform/docs/mangomint-analysis"
-
-# Read all paths
-with open("/Users/daminirijhwani/medical-spa-platform/docs/mangomint-paths-extracted.txt", "r") as f:
-    paths = [line.strip() for line in f if line.strip()]
-
-# Category mapping based on keywords in URLs
+paths_file = "/Users/daminirijhwani/medical-spa-platform/docs/mangomint-paths-extracted.txt"
+
+# Category mapping based on keywords in URLs. When keywords overlap:
+#   1. A keyword only matches at the start of a word, so "form" finds "forms"
+#      and "form-builder" but not "platform" or "performance".
+#   2. A match lying inside a longer keyword's match loses to it:
+#      "couples-services" beats "service", "discount-during-checkout" beats "checkout".
+#   3. Otherwise the category listed first here wins (--ambiguous shows where).
 category_mapping = {
     # Getting Started
     "01-getting-started": [
@@ -145,15 +163,64 @@ category_mapping = {
     ],
 }
 
+def trie_regex(words):
+    """Regex alternation shaped as a prefix trie: one branch per next character, not one per keyword"""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node):
+        ends = '' in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        group = branches[0] if len(branches) == 1 and not ends else '(?:' + '|'.join(branches) + ')'
+        return group + '?' if ends else group
+
+    return build(trie)
+
+keyword_category = {keyword: category for category, keywords in category_mapping.items() for keyword in keywords}
+category_priority = {category: rank for rank, category in enumerate(category_mapping)}
+# A separator, then the longest keyword starting after it (group 1). The
+# keyword is a lookahead, so overlapping keywords are all found. Leading with
+# a character class lets the regex engine skip through the path in C; match
+# against "/" + path so a keyword at the very start counts too.
+keyword_pattern = re.compile(r'[^a-z0-9](?=(' + trie_regex(keyword_category) + '))')
+# Keywords with another keyword inside them; only these make rule 2 need match positions
+nesting_keywords = {keyword for keyword in keyword_category if keyword_pattern.search(keyword)}
+
+def keyword_matches(path_lower):
+    """(start, end, keyword) for every match not inside a longer keyword's match"""
+    matches, reach = [], 0
+    for m in keyword_pattern.finditer("/" + path_lower):
+        # Matches come in start order, so one is inside an earlier one iff it ends no later.
+        # The separator is at the keyword's start in path_lower, which lacks the "/".
+        end = m.end(1) - 1
+        if end > reach:
+            reach = end
+            matches.append((m.start(), end, m.group(1)))
+    return matches
+
+def matched_categories(path_lower):
+    """Categories with a keyword in the path, highest priority first"""
+    categories = {keyword_category[keyword] for _, _, keyword in keyword_matches(path_lower)}
+    return sorted(categories, key=category_priority.get)
+
 def get_category_for_path(path):
     """Determine which category a path belongs to based on keywords"""
     path_lower = path.lower()
 
-    # Check each category's keywords
-    for category, keywords in category_mapping.items():
-        for keyword in keywords:
-            if keyword in path_lower:
-                return category
+    # One scan finds every keyword; positions only matter when categories
+    # compete and one of the keywords could have swallowed another
+    found = keyword_pattern.findall("/" + path_lower)
+    if found:
+        categories = {keyword_category[keyword] for keyword in found}
+        if len(categories) > 1 and not nesting_keywords.isdisjoint(found):
+            categories = {keyword_category[keyword] for _, _, keyword in keyword_matches(path_lower)}
+        return min(categories, key=category_priority.get)
 
     # Check if it's a help-articles path - these are category pages, not articles
     if "/help-articles/" in path_lower and path_lower.count("/") <= 4:
@@ -162,27 +229,33 @@ def get_category_for_path(path):
     # Default to getting started if we can't categorize
     return "01-getting-started"
 
-def create_markdown_file(path, category):
-    """Create a markdown file for a given path"""
-    if not category:
-        return
-
+def report_ambiguous(paths):
+    """Print every path whose keywords point at more than one category"""
+    ambiguous = 0
+    for path in paths:
+        matches = keyword_matches(path.lower())
+        categories = matched_categories(path.lower())
+        if len(categories) > 1:
+            ambiguous += 1
+            print(f"{path}\n  -> {categories[0]}")
+            for category in categories:
+                keywords = ", ".join(k for _, _, k in matches if keyword_category[k] == category)
+                print(f"     {category}: {keywords}")
+    print(f"\n{ambiguous} of {len(paths)} paths match more than one category")
+
+def stub_filename(path):
+    """Markdown file name for a path: its last segment"""
+    slug = path.split("/")[-2] if path.endswith("/") else path.split("/")[-1]
+    return slug.replace("/", "") + ".md"
+
+def stub_header(path, category):
+    """Title, URL, category and subcategory: the part of a stub kept in sync with the path"""
     # Extract title from path
     title = path.split("/")[-2] if path.endswith("/") else path.split("/")[-1]
     title = title.replace("-", " ").title()
 
-    # Create filename
-    filename = path.split("/")[-2] if path.endswith("/") else path.split("/")[-1]
-    filename = filename.replace("/", "") + ".md"
-
-    # Full path for the file
-    category_dir = os.path.join(base_dir, category)
-    os.makedirs(category_dir, exist_ok=True)
-    filepath = os.path.join(category_dir, filename)
-
-    # Create markdown content
     full_url = base_url + path
-    content = f"""# {title}
+    return f"""# {title}
 
 **URL:** {full_url}
 
@@ -190,9 +263,10 @@ def create_markdown_file(path, category):
 {category.split('/')[0].replace('-', ' ').title()}
 
 ## Subcategory
-{category.split('/')[1].replace('-', ' ').title() if '/' in category else 'N/A'}
+{category.split('/')[1].replace('-', ' ').title() if '/' in category else 'N/A'}"""
 
-## Analysis Notes
+# Everything below the header; the scraper fills in the article above these
+stub_sections = """## Analysis Notes
 <!-- Add your analysis notes here after fetching the content -->
 
 ## Key Features Identified
@@ -202,44 +276,188 @@ def create_markdown_file(path, category):
 <!-- Note what this reveals about Mango Mint's capabilities -->
 """
 
-    # Write the file
-    with open(filepath, "w") as f:
-        f.write(content)
-
-    return filepath
-
-# Process all paths
-created_files = {}
-skipped = []
-
-for path in paths:
-    category = get_category_for_path(path)
-    if category:
-        try:
-            filepath = create_markdown_file(path, category)
-            if filepath:
-                if category not in created_files:
-                    created_files[category] = []
-                created_files[category].append(filepath)
-        except Exception as e:
-            print(f"Error processing {path}: {e}")
+def stub_content(path, category):
+    """The markdown stub for a path"""
+    return stub_header(path, category) + "\n\n" + stub_sections
+
+# The only sections a stub header has; anything else in a header was added by hand
+STUB_SECTIONS = ("## Category", "## Subcategory")
+
+def existing_files(root):
+    """File name -> paths of the markdown files already under root, from one walk"""
+    files = {}
+    for dirpath, _, filenames in os.walk(root):
+        if dirpath == root:
+            continue  # README.md and friends, not stubs
+        for filename in filenames:
+            if filename.endswith(".md"):
+                files.setdefault(filename, []).append(os.path.join(dirpath, filename))
+    return files
+
+def plan_stubs(paths, root=None):
+    """
+    Work out what every path needs before touching the tree. Returns
+    (actions, skipped, superseded); each action is a dict with 'action'
+    (create, update, move, unchanged or conflict), 'path', 'category', 'file',
+    'header' and, where a file exists, 'old_header' and 'source'.
+
+    Only headers are compared and rewritten: a file whose header already
+    matches is left alone, and everything from its first section heading
+    on (scraped article content, notes) is kept by updates and moves. A
+    header with sections of its own added by hand is a 'conflict' and the
+    file is not touched.
+    """
+    root = root or base_dir
+    targets = {}
+    skipped, superseded = [], []
+    for path in paths:
+        category = get_category_for_path(path)
+        if not category:
             skipped.append(path)
+            continue
+        file = os.path.join(root, category, stub_filename(path))
+        if file in targets:
+            # Two paths, one file: the later path wins, as it always has
+            superseded.append(targets[file][0])
+        targets[file] = (path, category)
+
+    existing = existing_files(root)
+    present = {file for files in existing.values() for file in files}
+    actions = []
+    for file, (path, category) in targets.items():
+        header = stub_header(path, category)
+        action = {'action': 'create', 'path': path, 'category': category, 'file': file, 'header': header}
+        if file in present:
+            action['source'] = file
+        else:
+            # The same article filed under another category (the keywords
+            # changed): move it so its scraped content comes along
+            url = URL_MARKER + base_url + path
+            for other in existing.get(os.path.basename(file), []):
+                if other not in targets and url in read_header(other).splitlines():
+                    action['source'] = other
+                    break
+        if 'source' in action:
+            action['old_header'] = read_header(action['source'])
+            if action['source'] != file:
+                action['action'] = 'move'
+            elif action['old_header'] == header:
+                action['action'] = 'unchanged'
+            else:
+                action['action'] = 'update'
+            extra = [line for line in action['old_header'].splitlines()
+                     if line.startswith("## ") and line not in STUB_SECTIONS]
+            if extra:
+                action['action'] = 'conflict'
+        actions.append(action)
+    return actions, skipped, superseded
+
+def write_atomic(file, text):
+    """Write through a temporary file so a reader never sees half a file"""
+    temp = file + ".tmp"
+    with open(temp, "w") as f:
+        f.write(text)
+    os.replace(temp, file)
+
+def apply_action(action):
+    """Carry out one planned action; returns an error message or None"""
+    try:
+        if action['action'] == 'create':
+            # "x" fails rather than clobber a file that appeared since planning
+            with open(action['file'], "x") as f:
+                f.write(stub_content(action['path'], action['category']))
+            return None
+        with open(action['source'], "r") as f:
+            text = replace_header(f.read(), action['header'])
+        if text is None:
+            return f"{action['source']}: no section headings, left alone"
+        write_atomic(action['file'], text)
+        if action['action'] == 'move':
+            os.remove(action['source'])
+    except OSError as e:
+        return f"{action['path']}: {e}"
+    return None
+
+def apply_plan(actions, workers=8):
+    """Create each directory once, then write the files from a thread pool"""
+    pending = [action for action in actions if action['action'] in ('create', 'update', 'move')]
+    for directory in sorted({os.path.dirname(action['file']) for action in pending}):
+        os.makedirs(directory, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return [error for error in pool.map(apply_action, pending) if error]
+
+def print_diff(actions, root=None):
+    """Show what apply_plan would do: new files, moves and header changes"""
+    root = root or base_dir
+    for action in actions:
+        file = os.path.relpath(action['file'], root)
+        if action['action'] == 'create':
+            print(f"+ {file}")
+        elif action['action'] == 'conflict':
+            print(f"! {file}: header has sections added by hand, left alone")
+        elif action['action'] in ('update', 'move'):
+            source = os.path.relpath(action['source'], root)
+            print(f"~ {file}" if action['action'] == 'update' else f"> {source} -> {file}")
+            diff = difflib.unified_diff(action['old_header'].splitlines(), action['header'].splitlines(),
+                                        f"a/{source}", f"b/{file}", lineterm="")
+            for line in diff:
+                print(f"    {line}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Sort help-center paths into category folders")
+    parser.add_argument("--ambiguous", action="store_true",
+                        help="list paths whose keywords match several categories instead of writing files")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="show the files that would be created, moved or have their header updated")
+    parser.add_argument("--workers", type=int, default=8, help="threads writing files")
+    args = parser.parse_args()
+
+    # Read all paths
+    with open(paths_file, "r") as f:
+        paths = [line.strip() for line in f if line.strip()]
+
+    if args.ambiguous:
+        report_ambiguous(paths)
+        return
+
+    actions, skipped, superseded = plan_stubs(paths)
+    if args.dry_run:
+        print_diff(actions)
+        errors = []
     else:
-        skipped.append(path)
-
-# Print summary
-print(f"\n=== SUMMARY ===")
-print(f"Total paths processed: {len(paths)}")
-print(f"Files created: {sum(len(files) for files in created_files.values())}")
-print(f"Skipped: {len(skipped)}\n")
-
-print("Files created per category:")
-for category in sorted(created_files.keys()):
-    print(f"  {category}: {len(created_files[category])} files")
-
-if skipped:
-    print(f"\nSkipped paths (likely category index pages):")
-    for path in skipped[:10]:
-        print(f"  {path}")
-    if len(skipped) > 10:
-        print(f"  ... and {len(skipped) - 10} more")
+        errors = apply_plan(actions, args.workers)
+        for error in errors:
+            print(f"Error: {error}")
+
+    counts = {}
+    created_files = {}
+    for action in actions:
+        counts[action['action']] = counts.get(action['action'], 0) + 1
+        if action['action'] == 'create':
+            created_files.setdefault(action['category'], []).append(action['file'])
+
+    # Print summary
+    print(f"\n=== SUMMARY{' (dry run)' if args.dry_run else ''} ===")
+    print(f"Total paths processed: {len(paths)}")
+    for name in ('create', 'update', 'move', 'unchanged', 'conflict'):
+        print(f"  {name}: {counts.get(name, 0)}")
+    if superseded:
+        print(f"Duplicate file names (a later path wins): {len(superseded)}")
+    if errors:
+        print(f"Errors: {len(errors)}")
+    print(f"Skipped: {len(skipped)}\n")
+
+    if created_files:
+        print("Files created per category:")
+        for category in sorted(created_files.keys()):
+            print(f"  {category}: {len(created_files[category])} files")
+
+    if skipped:
+        print(f"\nSkipped paths (likely category index pages):")
+        for path in skipped[:10]:
+            print(f"  {path}")
+        if len(skipped) > 10:
+            print(f"  ... and {len(skipped) - 10} more")
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,16 @@
 #!/usr/bin/env python3
 """
 Reorganize roadmap items according to new phase structure.
+
+The document is parsed once (or taken from the cache extract_prompts.py
+left) into the roadmap_html model; the new section is spliced together
+from the items' spans and renumbered in a single pass.
 """
 
 import re
 
+from roadmap_html import duplicate_ids, load, renumber
+
 # Map old item number to new item number based on user's requirements
 ITEM_MAPPING = {
     4: 1,   # Item 4 becomes item 1 (PHASE I)
@@ -48,12 +54,54 @@ PHASES = [
     ('🚀 PHASE VI: Future Innovations', [22, 23, 24, 25, 26]),
 ]
 
+def extract_items(roadmap, start, end):
+    """Old priority number -> queue-item HTML within html[start:end]; a repeated number keeps its last item"""
+    items = {}
+    counts = {}
+    for item in roadmap.items_within(start, end):
+        if item.priority is None:
+            continue
+        items[item.priority] = roadmap.item_html(item)
+        counts[item.priority] = counts.get(item.priority, 0) + 1
+
+    for old_num in range(1, 27):
+        if old_num not in items:
+            print(f"  WARNING: Item {old_num} not found in roadmap")
+        elif counts[old_num] > 1:
+            print(f"  WARNING: Item {old_num} found {counts[old_num]} times, using last occurrence")
+        else:
+            print(f"  Extracted item {old_num}")
+    return items
+
+def build_roadmap(items):
+    """The new roadmap section: the extracted items spliced into PHASES order, not yet renumbered"""
+    new_roadmap_lines = []
+    new_roadmap_lines.append('                <div class="roadmap-queue">\n')
+
+    for phase_title, phase_items in PHASES:
+        new_roadmap_lines.append(f'                    <h2 class="section-title">{phase_title}</h2>\n')
+        new_roadmap_lines.append('                    <p style="color: #666; margin-bottom: 30px; font-size: 1.1em;">Click each item to expand and see exact prompt to give Claude Code.</p>\n\n')
+
+        for new_num in phase_items:
+            old_num = NEW_TO_OLD.get(new_num)
+            if old_num and old_num in items:
+                new_roadmap_lines.append('                    ')
+                new_roadmap_lines.append(items[old_num])
+                new_roadmap_lines.append('\n\n')
+
+                print(f"  Added item {new_num} (was {old_num})")
+
+        new_roadmap_lines.append('\n')
+
+    new_roadmap_lines.append('                </div>')
+    return ''.join(new_roadmap_lines)
+
 def main():
     file_path = '/Users/daminirijhwani/medical-spa-platform/docs/SYSTEM_WORKFLOWS.html'
 
     print("Reading file...")
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
+    roadmap = load(file_path)
+    content = roadmap.html
 
     # First, find the roadmap section bounds
     roadmap_pattern = r'<div class="roadmap-queue">\s*<h2 class="section-title">.*?PHASE I.*?Foundation'
@@ -75,124 +123,29 @@ def main():
         print("ERROR: Could not find roadmap section end")
         return 1
 
-    # Extract only from the roadmap section
-    roadmap_content = content[section_start:section_end]
-
     # Create a mapping of current priority numbers to their HTML blocks
     print("\nExtracting items from roadmap section...")
-    items = {}
-
-    for old_num in range(1, 27):
-        # Find the queue-item div for this priority number within roadmap section
-        priority_pattern = rf'<div class="priority-number">{old_num}</div>'
-        matches = list(re.finditer(priority_pattern, roadmap_content))
-
-        if not matches:
-            print(f"  WARNING: Item {old_num} not found in roadmap")
-            continue
-
-        if len(matches) > 1:
-            print(f"  WARNING: Item {old_num} found {len(matches)} times, using last occurrence")
-
-        # Use the last match
-        match = matches[-1]
-
-        # Find the start of the queue-item div by searching backwards
-        pos = match.start()
-        while pos > 0:
-            if roadmap_content[pos:pos+100].startswith('<div class="queue-item"'):
-                start = pos
-                break
-            pos -= 1
-        else:
-            print(f"  WARNING: Could not find queue-item start for item {old_num}")
-            continue
-
-        # Find the end by counting divs
-        pos = start
-        depth = 0
-        in_div = False
-
-        while pos < len(roadmap_content):
-            if roadmap_content[pos:pos+5] == '<div ':
-                depth += 1
-                in_div = True
-            elif roadmap_content[pos:pos+6] == '</div>':
-                depth -= 1
-                if in_div and depth == 0:
-                    end = pos + 6
-                    break
-            pos += 1
-        else:
-            print(f"  WARNING: Could not find queue-item end for item {old_num}")
-            continue
-
-        items[old_num] = roadmap_content[start:end]
-        print(f"  Extracted item {old_num}")
+    items = extract_items(roadmap, section_start, section_end)
 
     print(f"\nExtracted {len(items)} items")
     print(f"Roadmap section: {section_start} to {section_end}")
 
     # Build new content
     print("\nBuilding new roadmap...")
-    new_roadmap_lines = []
-    new_roadmap_lines.append('                <div class="roadmap-queue">\n')
-
-    for phase_title, phase_items in PHASES:
-        new_roadmap_lines.append(f'                    <h2 class="section-title">{phase_title}</h2>\n')
-        new_roadmap_lines.append('                    <p style="color: #666; margin-bottom: 30px; font-size: 1.1em;">Click each item to expand and see exact prompt to give Claude Code.</p>\n\n')
-
-        for new_num in phase_items:
-            old_num = NEW_TO_OLD.get(new_num)
-            if old_num and old_num in items:
-                # Update the item's numbers
-                item_html = items[old_num]
-
-                # Update priority-number display
-                item_html = re.sub(
-                    rf'<div class="priority-number">{old_num}</div>',
-                    f'<div class="priority-number">{new_num}</div>',
-                    item_html
-                )
-
-                # Update toggleSection calls
-                item_html = re.sub(
-                    rf"toggleSection\('priority-{old_num}'\)",
-                    f"toggleSection('priority-{new_num}')",
-                    item_html
-                )
-
-                # Update id attributes
-                item_html = re.sub(
-                    rf'id="priority-{old_num}"',
-                    f'id="priority-{new_num}"',
-                    item_html
-                )
-
-                # Update promoteToCurrently calls
-                item_html = re.sub(
-                    rf'promoteToCurrently\({old_num}\)',
-                    f'promoteToCurrently({new_num})',
-                    item_html
-                )
-
-                new_roadmap_lines.append('                    ')
-                new_roadmap_lines.append(item_html)
-                new_roadmap_lines.append('\n\n')
-
-                print(f"  Added item {new_num} (was {old_num})")
-
-        new_roadmap_lines.append('\n')
-
-    new_roadmap_lines.append('                </div>')
+    unmapped = set()
+    new_roadmap = renumber(build_roadmap(items), ITEM_MAPPING, unmapped)
+    if unmapped:
+        print(f"  WARNING: references to items with no new number, left as they are: {sorted(unmapped)}")
 
     # Replace the section
     print("\nReplacing content...")
-    new_content = (
-        content[:section_start] +
-        ''.join(new_roadmap_lines) +
-        content[section_end:]
-    )
+    new_content = roadmap.splice(section_start, section_end, new_roadmap)
+
+    # Don't write a page where two elements share an id that were distinct before
+    duplicates = duplicate_ids(new_content) - duplicate_ids(content)
+    if duplicates:
+        print(f"ERROR: Reorganized roadmap repeats ids: {', '.join(sorted(duplicates))}")
+        return 1
 
     # Write output
     print(f"\nWriting to {file_path}...")
@@ -0,0 +1,196 @@
+"""
+Roadmap document model shared by reorganize.py and extract_prompts.py
+
+SYSTEM_WORKFLOWS.html lays the roadmap out as:
+
+    <div class="roadmap-queue">
+        <h2 class="section-title">🏗️ PHASE I: ...</h2>
+        <div class="queue-item" ... onclick="toggleSection('priority-1')">
+            <div class="priority-number">1</div>
+            <div class="queue-item-title">...</div>
+            ...
+            <h4 ...>📋 COPY THIS PROMPT TO CLAUDE CODE:</h4>
+            <pre ...>...</pre>
+        </div>
+
+parse() reads the whole document in one left-to-right scan of its <div>
+tokens into a Roadmap of QueueItems: span, priority number, title, prompt
+and the phase (section title) each sits under. load() keeps the parsed
+model in a JSON file next to the document, keyed by the document's
+SHA-256, so tools run one after the other on the same file parse it once.
+"""
+
+import hashlib
+import json
+import os
+import re
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+
+MODEL_VERSION = 1
+
+# Every <div> opening and closing in one stream. A priority number or title
+# is taken whole (opening and closing together), so it leaves the depth
+# unchanged; so do section titles and prompt headers, which aren't divs.
+# The branches share their "<" and "<div" prefixes: with one flat list of
+# alternatives the scan was five times slower.
+TOKEN = re.compile(
+    r'<(?:div(?:'
+    r' class="priority-number">(?P<priority>\d+)</div>'
+    r'| class="queue-item-title">(?P<title>[^<]*)</div>'
+    r'|(?:\s[^>]*)?>)'
+    r'|(?P<close>/div\s*>)'
+    r'|h2 class="section-title">(?P<phase>[^<]*)</h2>'
+    r'|(?P<prompt>h4[^>]*>[^<]*COPY THIS PROMPT TO CLAUDE CODE:</h4>))'
+)
+QUEUE_ITEM = re.compile(r'<div class="queue-item"[\s>]')
+# Matched where a prompt header ends; the <pre> body is not skipped by the
+# token stream, so a stray "<div" inside it still counts, as in a browser
+PROMPT_BODY = re.compile(r'\s*<pre[^>]*>(.*?)</pre>', re.DOTALL)
+PROMPT_BOLD = re.compile(r'</?b>')
+PROMPT_SPAN = re.compile(r'<span[^>]*>|</span>')
+
+# The places an item's number appears, one group (the number) per alternative.
+# Every alternative starts with a literal "p" and checks the rest of its
+# prefix with a lookbehind, so the engine can skip ahead to each "p" instead
+# of trying four branches at every character.
+REFERENCE = re.compile(
+    r'priority-number">(?<=<div class="priority-number">)(\d+)</div>'
+    r"|priority-(?<=toggleSection\('priority-)(\d+)'\)"
+    r'|priority-(?<=id="priority-)(\d+)"'
+    r'|promoteToCurrently\((\d+)\)'
+)
+ID_ATTRIBUTE = re.compile(r'\sid="([^"]*)"')
+
+
+@dataclass
+class QueueItem:
+    start: int
+    end: int = None
+    priority: int = None  # first priority number inside the item
+    title: str = None
+    prompt: str = None  # raw HTML of the <pre> after "COPY THIS PROMPT TO CLAUDE CODE:"
+    phase: str = None  # section title the item sits under
+
+
+@dataclass
+class Roadmap:
+    html: str
+    items: list = field(default_factory=list)  # QueueItems in document order
+    sha256: str = ""
+
+    def item_html(self, item):
+        return self.html[item.start:item.end]
+
+    def items_within(self, start, end):
+        """Items lying wholly inside html[start:end]"""
+        return [item for item in self.items if start <= item.start and item.end <= end]
+
+    def prompts(self):
+        """{'priority', 'title', 'prompt'} for every item with all three, by priority"""
+        found = [{'priority': item.priority, 'title': item.title.strip(), 'prompt': prompt_text(item.prompt)}
+                 for item in self.items
+                 if item.priority is not None and item.title and item.prompt is not None]
+        return sorted(found, key=lambda item: item['priority'])
+
+    def splice(self, start, end, text):
+        """The document with html[start:end] replaced by text"""
+        return self.html[:start] + text + self.html[end:]
+
+
+def parse(html):
+    """Roadmap of every queue-item in html, from one scan"""
+    items = []
+    open_items = []  # (item, depth outside it); items can nest when a closing div is missing
+    depth = 0
+    phase = None
+    for token in TOKEN.finditer(html):
+        kind = token.lastgroup
+        if kind == 'close':
+            depth -= 1
+            if open_items and depth == open_items[-1][1]:
+                item = open_items.pop()[0]
+                item.end = token.end()
+                items.append(item)
+        elif kind is None:
+            if QUEUE_ITEM.match(html, token.start()):
+                open_items.append((QueueItem(token.start(), phase=phase), depth))
+            depth += 1
+        elif kind == 'phase':
+            phase = token.group('phase').strip()
+        elif open_items:
+            item = open_items[-1][0]
+            if kind == 'priority' and item.priority is None:
+                item.priority = int(token.group('priority'))
+            elif kind == 'title' and item.title is None:
+                item.title = token.group('title')
+            elif kind == 'prompt' and item.prompt is None:
+                body = PROMPT_BODY.match(html, token.end())
+                if body:
+                    item.prompt = body.group(1)
+    items.sort(key=lambda item: item.start)
+    return Roadmap(html, items)
+
+
+def cache_path(path):
+    """Where load() keeps the parsed model of path"""
+    directory, name = os.path.split(os.path.abspath(path))
+    return os.path.join(directory, f".{name}.roadmap.json")
+
+
+def load(path, cache_file=None):
+    """Parse path, or reuse the cached model if the document's SHA-256 is unchanged"""
+    cache_file = cache_file or cache_path(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        html = f.read()
+    digest = hashlib.sha256(html.encode('utf-8')).hexdigest()
+
+    try:
+        with open(cache_file, 'r') as f:
+            cached = json.load(f)
+        if cached.get("version") == MODEL_VERSION and cached.get("sha256") == digest:
+            return Roadmap(html, [QueueItem(**item) for item in cached["items"]], digest)
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    roadmap = parse(html)
+    roadmap.sha256 = digest
+    try:
+        tmp_path = f"{cache_file}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"version": MODEL_VERSION, "sha256": digest,
+                       "items": [asdict(item) for item in roadmap.items]}, f)
+        os.replace(tmp_path, cache_file)
+    except OSError:
+        pass  # an unwritable cache only costs a parse next time
+    return roadmap
+
+
+def prompt_text(raw):
+    """A prompt's <pre> HTML as markdown: bold kept as **, spans dropped"""
+    return PROMPT_SPAN.sub('', PROMPT_BOLD.sub('**', raw.strip()))
+
+
+def renumber(html, mapping, unmapped=None):
+    """
+    Rewrite every item-number reference in html (priority-number display,
+    toggleSection calls, id attributes, promoteToCurrently calls) through
+    mapping, in one pass. Numbers mapping lacks are left as they are and
+    added to unmapped.
+    """
+    def replace(match):
+        group = match.lastindex
+        number = int(match.group(group))
+        if number not in mapping:
+            if unmapped is not None:
+                unmapped.add(number)
+            return match.group(0)
+        start, end = match.start(group) - match.start(), match.end(group) - match.start()
+        return match.group(0)[:start] + str(mapping[number]) + match.group(0)[end:]
+
+    return REFERENCE.sub(replace, html)
+
+
+def duplicate_ids(html):
+    """id attribute values used more than once"""
+    return {value for value, count in Counter(ID_ATTRIBUTE.findall(html)).items() if count > 1}
@@ -2,44 +2,306 @@
 """
 Mango Mint Help Center Scraper
 Fetches all help articles using Playwright to handle JavaScript rendering
+
+Articles are fetched by a pool of concurrent pages sharing one browser
+context (playwright.async_api); --workers 1 is the same pipeline with a
+single page, one article at a time. Page loads are spaced by a per-host
+rate limit, and every outcome is journaled as it happens so reruns resume.
+
+--refresh re-checks already completed articles: a conditional HEAD (or a
+raw GET compared by hash) decides whether the page changed, only changed
+pages are rendered, and the markdown is only rewritten when the extracted
+text differs.
+
+The default "text" render profile aborts images, media, fonts and known
+trackers; image alt/src metadata still comes from the DOM. --profile full
+loads everything.
 """
 
+import argparse
+import asyncio
+import hashlib
 import json
 import os
 import time
-import re
 from pathlib import Path
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeout
+from urllib.parse import urlparse
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeout
+
+from article_markdown import parse_file
 
 # Configuration
 BASE_DIR = Path("/Users/daminirijhwani/medical-spa-platform/docs/mangomint-analysis")
 FETCH_QUEUE = BASE_DIR / "fetch_queue.json"
 PROGRESS_FILE = BASE_DIR / "scrape_progress.json"
+PROGRESS_JOURNAL = BASE_DIR / "scrape_progress.jsonl"
 LOG_FILE = BASE_DIR / "scrape_log.txt"
 
 # Scraping settings
 TIMEOUT = 60000  # 60 seconds - increased timeout
-DELAY_BETWEEN_REQUESTS = 2  # seconds (be respectful to their server)
+CONTENT_TIMEOUT = 15000  # max wait for the article text to finish rendering
+WORKERS = 4  # concurrent pages
+HOST_RATE_LIMIT = 1.0  # page loads per second per host (be respectful to their server)
+
+RENDER_PROFILES = ("text", "full")
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font"}
+TRACKER_DOMAINS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "facebook.net",
+    "hotjar.com",
+    "segment.io",
+    "intercom.io",
+    "hs-scripts.com",
+    "hs-analytics.net",
+    "clarity.ms",
+)
+
+# Rendering is done once the page has real text and it stopped changing
+# between two polls, instead of sleeping a fixed 3 seconds.
+CONTENT_READY_JS = """
+    () => {
+        const length = document.body ? document.body.innerText.length : 0;
+        const settled = length > 200 && window.__scraperTextLength === length;
+        window.__scraperTextLength = length;
+        return settled;
+    }
+"""
+CONTENT_POLL_MS = 250
+
+# Strategy 1: Look for common article/content containers
+ARTICLE_CONTAINER_JS = """
+    () => {
+        const selectors = [
+            '[class*="article"]',
+            '[class*="content"]',
+            '[class*="body"]',
+            'main',
+            '[role="main"]'
+        ];
+        for (const selector of selectors) {
+            const el = document.querySelector(selector);
+            if (el && el.innerText.length > 200) {
+                return el.innerText;
+            }
+        }
+        return null;
+    }
+"""
+
+# Strategy 2: Get all text and filter
+STRIPPED_BODY_JS = """
+    () => {
+        // Remove script, style, nav, footer
+        const clone = document.body.cloneNode(true);
+        ['script', 'style', 'nav', 'footer', 'header'].forEach(tag => {
+            clone.querySelectorAll(tag).forEach(el => el.remove());
+        });
+        return clone.innerText;
+    }
+"""
+
+IMAGES_JS = """
+    () => {
+        const imgs = Array.from(document.querySelectorAll('img'));
+        return imgs
+            .filter(img => img.src && !img.src.includes('logo'))
+            .map(img => ({
+                alt: img.alt || '',
+                src: img.src
+            }));
+    }
+"""
+
+
+def sha256(data):
+    if isinstance(data, str):
+        data = data.encode()
+    return hashlib.sha256(data).hexdigest()
+
+
+def article_hash(article_data):
+    return sha256(json.dumps([article_data['content'], article_data['images']], sort_keys=True))
+
+
+def page_state(headers, html, content_hash):
+    """What --refresh needs to know about a rendered page next time."""
+    return {
+        'etag': headers.get('etag'),
+        'last_modified': headers.get('last-modified'),
+        'html_hash': sha256(html) if html is not None else None,
+        'content_hash': content_hash
+    }
+
+
+def conditional_headers(state):
+    headers = {}
+    if state.get('etag'):
+        headers['If-None-Match'] = state['etag']
+    if state.get('last_modified'):
+        headers['If-Modified-Since'] = state['last_modified']
+    return headers
+
+
+def unchanged_by_validators(state, status, headers):
+    """True/False when the HEAD response settles it, None when only the body can tell."""
+    if status == 304:
+        return True
+    etag, modified = headers.get('etag'), headers.get('last-modified')
+    if etag and state.get('etag'):
+        return etag == state['etag']
+    if modified and state.get('last_modified'):
+        return modified == state['last_modified']
+    return None
+
+
+def blocked_request(resource_type, url):
+    """Requests the text profile aborts: nothing the article text depends on."""
+    if resource_type in BLOCKED_RESOURCE_TYPES:
+        return True
+    host = urlparse(url).hostname or ""
+    return any(host == domain or host.endswith("." + domain) for domain in TRACKER_DOMAINS)
+
+
+async def block_heavy(route):
+    if blocked_request(route.request.resource_type, route.request.url):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+class HostRateLimiter:
+    """Spaces page loads to each host at most `per_second` apart."""
+
+    def __init__(self, per_second):
+        self.interval = 1.0 / per_second if per_second > 0 else 0.0
+        self.next_slot = {}  # host -> earliest time the next request may start
+
+    def reserve(self, url):
+        """Claim the next slot for url's host; returns seconds to wait before using it."""
+        host = urlparse(url).netloc
+        now = time.monotonic()
+        slot = max(now, self.next_slot.get(host, now))
+        self.next_slot[host] = slot + self.interval
+        return slot - now
+
+    async def wait(self, url):
+        await asyncio.sleep(self.reserve(url))
+
+
+class ProgressJournal:
+    """
+    Completed/failed articles, crash-safe and O(1) per article.
+
+    scrape_progress.json is a compacted snapshot. Every outcome after it is
+    appended to scrape_progress.jsonl as one fsynced JSON line, and loading
+    replays the journal on top of the snapshot, dropping a torn last line
+    left by a crash. compact() folds the journal back into the snapshot.
+    """
+
+    def __init__(self, snapshot_path=PROGRESS_FILE, journal_path=PROGRESS_JOURNAL):
+        self.snapshot_path = Path(snapshot_path)
+        self.journal_path = Path(journal_path)
+        self.progress = {"completed": [], "failed": [], "pages": {}}
+        self.completed = set()
+        self.pages = self.progress["pages"]  # url -> page_state() of the last render
+        self.failed_seen = set()  # (url, error) already recorded, so replays stay idempotent
+        self.load()
+        self.journal = open(self.journal_path, 'a')
+
+    def load(self):
+        if self.snapshot_path.exists():
+            with open(self.snapshot_path, 'r') as f:
+                snapshot = json.load(f)
+            for url in snapshot.get("completed", []):
+                self.apply({"event": "completed", "url": url})
+            for failure in snapshot.get("failed", []):
+                self.apply({"event": "failed", **failure})
+            for url, state in snapshot.get("pages", {}).items():
+                self.apply({"event": "page", "url": url, **state})
+
+        if not self.journal_path.exists():
+            return
+        good_bytes = 0
+        with open(self.journal_path, 'rb') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                if not line.endswith(b"\n"):
+                    break
+                self.apply(record)
+                good_bytes += len(line)
+        if good_bytes < self.journal_path.stat().st_size:
+            # Interrupted mid-write: cut the partial record so appends start on a clean line
+            with open(self.journal_path, 'r+b') as f:
+                f.truncate(good_bytes)
+
+    def apply(self, record):
+        url = record["url"]
+        if record["event"] == "completed":
+            if url not in self.completed:
+                self.completed.add(url)
+                self.progress["completed"].append(url)
+        elif record["event"] == "page":
+            self.pages[url] = {key: value for key, value in record.items() if key not in ("event", "url")}
+        else:
+            key = (url, record.get("error"))
+            if key not in self.failed_seen:
+                self.failed_seen.add(key)
+                self.progress["failed"].append({
+                    'url': url,
+                    'file': record.get("file"),
+                    'error': record.get("error")
+                })
+
+    def append(self, record):
+        self.apply(record)
+        self.journal.write(json.dumps(record) + "\n")
+        self.journal.flush()
+        os.fsync(self.journal.fileno())
+
+    def record_completed(self, url):
+        self.append({"event": "completed", "url": url})
+
+    def record_failed(self, url, file_path, error):
+        self.append({"event": "failed", "url": url, "file": file_path, "error": error})
+
+    def record_page(self, url, state):
+        self.append({"event": "page", "url": url, **state})
+
+    def compact(self):
+        """Atomically rewrite the snapshot, then empty the journal."""
+        tmp_path = self.snapshot_path.with_suffix(".json.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(self.progress, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+        # A crash before this truncate only means replaying records the snapshot already has
+        self.journal.truncate(0)
+        self.journal.flush()
+
+    def close(self):
+        self.compact()
+        self.journal.close()
+
 
 class MangoMintScraper:
-    def __init__(self):
+    def __init__(self, workers=WORKERS, rate_limit=HOST_RATE_LIMIT, refresh=False, profile="text"):
+        self.workers = workers
+        self.refresh = refresh
+        self.profile = profile
+        self.rate_limiter = HostRateLimiter(rate_limit)
         self.total = 0
         self.completed = 0
         self.failed = 0
         self.skipped = 0
-        self.progress = self.load_progress()
-
-    def load_progress(self):
-        """Load previous progress if exists"""
-        if PROGRESS_FILE.exists():
-            with open(PROGRESS_FILE, 'r') as f:
-                return json.load(f)
-        return {"completed": [], "failed": []}
-
-    def save_progress(self):
-        """Save current progress"""
-        with open(PROGRESS_FILE, 'w') as f:
-            json.dump(self.progress, f, indent=2)
+        self.unchanged = 0
+        self.journal = ProgressJournal()
+        self.progress = self.journal.progress
 
     def log(self, message):
         """Log message to file and console"""
@@ -49,52 +311,23 @@ class MangoMintScraper:
         with open(LOG_FILE, 'a') as f:
             f.write(log_msg + "\n")
 
-    def extract_article_content(self, page):
-        """Extract the main article content from the page"""
+    async def wait_for_content(self, page):
+        """Wait until the article text has rendered; extraction decides if it is enough."""
         try:
-            # Wait for page to be fully loaded
-            page.wait_for_load_state('networkidle', timeout=TIMEOUT)
+            await page.wait_for_function(CONTENT_READY_JS, polling=CONTENT_POLL_MS, timeout=CONTENT_TIMEOUT)
+        except PlaywrightTimeout:
+            self.log("Warning: content did not settle, extracting anyway")
 
-            # Give JavaScript extra time to render
-            time.sleep(3)
-
-            # Method 1: Try to get content from specific container
-            content = None
+    async def extract_article_content(self, page):
+        """Extract the main article content from the page"""
+        try:
+            await self.wait_for_content(page)
 
             # Try multiple strategies to find content
+            content = None
             strategies = [
-                # Strategy 1: Look for common article/content containers
-                lambda: page.evaluate("""
-                    () => {
-                        const selectors = [
-                            '[class*="article"]',
-                            '[class*="content"]',
-                            '[class*="body"]',
-                            'main',
-                            '[role="main"]'
-                        ];
-                        for (const selector of selectors) {
-                            const el = document.querySelector(selector);
-                            if (el && el.innerText.length > 200) {
-                                return el.innerText;
-                            }
-                        }
-                        return null;
-                    }
-                """),
-
-                # Strategy 2: Get all text and filter
-                lambda: page.evaluate("""
-                    () => {
-                        // Remove script, style, nav, footer
-                        const clone = document.body.cloneNode(true);
-                        ['script', 'style', 'nav', 'footer', 'header'].forEach(tag => {
-                            clone.querySelectorAll(tag).forEach(el => el.remove());
-                        });
-                        return clone.innerText;
-                    }
-                """),
-
+                lambda: page.evaluate(ARTICLE_CONTAINER_JS),
+                lambda: page.evaluate(STRIPPED_BODY_JS),
                 # Strategy 3: Just get body text
                 lambda: page.locator('body').inner_text()
             ]
@@ -102,7 +335,7 @@ class MangoMintScraper:
             # Try each strategy
             for strategy in strategies:
                 try:
-                    content = strategy()
+                    content = await strategy()
                     if content and len(content) > 100:
                         break
                 except Exception as e:
@@ -115,28 +348,14 @@ class MangoMintScraper:
             # Extract images info
             images = []
             try:
-                img_data = page.evaluate("""
-                    () => {
-                        const imgs = Array.from(document.querySelectorAll('img'));
-                        return imgs
-                            .filter(img => img.src && !img.src.includes('logo'))
-                            .map(img => ({
-                                alt: img.alt || '',
-                                src: img.src
-                            }));
-                    }
-                """)
-                images = img_data
+                images = await page.evaluate(IMAGES_JS)
             except Exception as e:
                 self.log(f"Warning: Could not extract images: {str(e)}")
 
-            # Get title
-            title = page.title()
-
             return {
                 'content': content.strip(),
                 'images': images,
-                'title': title
+                'title': await page.title()
             }
 
         except Exception as e:
@@ -146,18 +365,8 @@ class MangoMintScraper:
     def update_markdown_file(self, file_path, url, article_data):
         """Update markdown file with fetched content"""
         try:
-            # Read existing file
-            with open(file_path, 'r') as f:
-                existing_content = f.read()
-
-            # Extract the header (everything before "## Analysis Notes")
-            header_match = re.search(r'^(.*?)(?=## Analysis Notes)', existing_content, re.DOTALL)
-            if header_match:
-                header = header_match.group(1).strip()
-            else:
-                # Fallback if format is different
-                lines = existing_content.split('\n')
-                header = '\n'.join(lines[:10])  # Keep first 10 lines as header
+            # Keep the existing header; previously scraped sections are rebuilt below
+            header = parse_file(file_path).header
 
             # Build new content
             new_content = f"""{header}
@@ -198,174 +407,116 @@ class MangoMintScraper:
             self.log(f"Error updating markdown file {file_path}: {str(e)}")
             return False
 
-    def fetch_article(self, browser, article_info):
-        """Fetch a single article"""
-        url = article_info['url']
-        file_path = article_info['file']
+    def is_completed(self, url):
+        return url in self.journal.completed
 
-        # Check if already completed
-        if url in self.progress['completed']:
-            self.skipped += 1
-            return True
+    def mark_completed(self, article_info):
+        self.journal.record_completed(article_info['url'])
+        self.completed += 1
+        self.log(f"✓ Success: {article_info['filename']}")
 
-        self.log(f"Fetching: {url}")
+    def mark_failed(self, article_info, error):
+        self.journal.record_failed(article_info['url'], article_info['file'], error)
+        self.failed += 1
+
+    def needs_fetch(self, url):
+        return self.refresh or not self.is_completed(url)
 
-        page = None
+    async def page_unchanged(self, request, url):
+        """Cheap pre-render check for --refresh, using the page's API request context."""
+        state = self.journal.pages.get(url)
+        if not state:
+            return False
         try:
-            # Create new page
-            page = browser.new_page()
+            response = await request.head(url, headers=conditional_headers(state), timeout=TIMEOUT)
+            unchanged = unchanged_by_validators(state, response.status, response.headers)
+            if unchanged is None and state.get('html_hash'):
+                response = await request.get(url, timeout=TIMEOUT)
+                unchanged = response.ok and sha256(await response.body()) == state['html_hash']
+            return bool(unchanged)
+        except Exception as e:
+            self.log(f"Warning: change check failed for {url}: {str(e)}")
+            return False
 
-            # Set a reasonable viewport
-            page.set_viewport_size({"width": 1920, "height": 1080})
+    def mark_unchanged(self, article_info):
+        self.unchanged += 1
+        self.log(f"= Unchanged: {article_info['filename']}")
 
-            # Navigate to URL with extended timeout
-            page.goto(url, timeout=TIMEOUT, wait_until='domcontentloaded')
+    def save_article(self, article_info, article_data, headers, html):
+        """Write the markdown unless the extracted text is what we already have."""
+        url = article_info['url']
+        content_hash = article_hash(article_data)
+        if content_hash == self.journal.pages.get(url, {}).get('content_hash'):
+            self.mark_unchanged(article_info)
+        elif self.update_markdown_file(article_info['file'], url, article_data):
+            self.mark_completed(article_info)
+        else:
+            raise Exception("Failed to update markdown file")
+        self.journal.record_page(url, page_state(headers, html, content_hash))
+
+    async def fetch_article(self, page, article_info):
+        """Fetch a single article on a worker's (reused) page"""
+        url = article_info['url']
+        if self.refresh:
+            await self.rate_limiter.wait(url)
+            if await self.page_unchanged(page.request, url):
+                self.mark_unchanged(article_info)
+                return True
 
-            # Extract content
-            article_data = self.extract_article_content(page)
+        await self.rate_limiter.wait(url)
+        self.log(f"Fetching: {url}")
+        try:
+            response = await page.goto(url, timeout=TIMEOUT, wait_until='domcontentloaded')
 
+            article_data = await self.extract_article_content(page)
             if not article_data:
-                raise Exception("Failed to extract article content")
-
-            # Update markdown file
-            success = self.update_markdown_file(file_path, url, article_data)
+                raise Exception("No content extracted")
 
-            if success:
-                self.progress['completed'].append(url)
-                self.completed += 1
-                self.log(f"✓ Success: {article_info['filename']}")
-                return True
-            else:
-                raise Exception("Failed to update markdown file")
+            html = None
+            try:
+                html = await response.body()
+            except Exception:
+                pass  # no body kept (e.g. redirects): --refresh falls back to validators
+            self.save_article(article_info, article_data, response.headers if response else {}, html)
+            return True
 
-        except PlaywrightTimeout as e:
+        except PlaywrightTimeout:
             self.log(f"✗ Timeout: {article_info['filename']} - Page took too long to load")
-            self.progress['failed'].append({
-                'url': url,
-                'file': file_path,
-                'error': 'Timeout'
-            })
-            self.failed += 1
+            self.mark_failed(article_info, 'Timeout')
             return False
 
         except Exception as e:
             self.log(f"✗ Failed: {article_info['filename']} - {str(e)}")
-            self.progress['failed'].append({
-                'url': url,
-                'file': file_path,
-                'error': str(e)
-            })
-            self.failed += 1
+            self.mark_failed(article_info, str(e))
             return False
 
-        finally:
-            # Always close page
-            if page:
-                try:
-                    page.close()
-                except:
-                    pass
-            # Save progress after each article
-            self.save_progress()
-
-    def run(self):
-        """Main scraping function"""
-        self.log("=" * 60)
-        self.log("Starting Mango Mint Help Center Scraper")
-        self.log("=" * 60)
-
-        # Load fetch queue
+    def load_queue(self):
         with open(FETCH_QUEUE, 'r') as f:
             queue_data = json.load(f)
-
         self.total = queue_data['total']
-        categories = queue_data['categories']
+        return queue_data['categories']
 
+    def log_start(self):
+        self.log("=" * 60)
+        self.log("Starting Mango Mint Help Center Scraper")
+        self.log("=" * 60)
         self.log(f"Total articles to fetch: {self.total}")
         self.log(f"Already completed: {len(self.progress['completed'])}")
         self.log(f"Starting scraper...\n")
 
-        # Start Playwright
-        with sync_playwright() as p:
-            # Launch browser (headless mode for faster scraping)
-            self.log("Launching browser...")
-            browser = p.chromium.launch(
-                headless=True,
-                args=['--disable-blink-features=AutomationControlled']  # Avoid detection
-            )
-
-            # Create a browser context with realistic settings
-            context = browser.new_context(
-                user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-            )
-
-            try:
-                # Process each category
-                for category_name in sorted(categories.keys()):
-                    articles = categories[category_name]
-                    self.log(f"\n{'='*60}")
-                    self.log(f"Processing category: {category_name} ({len(articles)} articles)")
-                    self.log(f"{'='*60}")
-
-                    for idx, article in enumerate(articles, 1):
-                        self.log(f"[{idx}/{len(articles)}] {article['filename']}")
-
-                        # Use context instead of browser
-                        page = context.new_page()
-                        try:
-                            # Inline the fetch logic to use context
-                            url = article['url']
-                            file_path = article['file']
-
-                            if url not in self.progress['completed']:
-                                self.log(f"Fetching: {url}")
-                                page.set_viewport_size({"width": 1920, "height": 1080})
-                                page.goto(url, timeout=TIMEOUT, wait_until='domcontentloaded')
-
-                                article_data = self.extract_article_content(page)
-                                if article_data:
-                                    success = self.update_markdown_file(file_path, url, article_data)
-                                    if success:
-                                        self.progress['completed'].append(url)
-                                        self.completed += 1
-                                        self.log(f"✓ Success: {article['filename']}")
-                                    else:
-                                        raise Exception("Failed to update markdown")
-                                else:
-                                    raise Exception("No content extracted")
-                            else:
-                                self.skipped += 1
-
-                        except Exception as e:
-                            self.log(f"✗ Failed: {article['filename']} - {str(e)}")
-                            self.progress['failed'].append({
-                                'url': article['url'],
-                                'file': article['file'],
-                                'error': str(e)
-                            })
-                            self.failed += 1
-                        finally:
-                            page.close()
-                            self.save_progress()
-
-                        # Be respectful - delay between requests
-                        time.sleep(DELAY_BETWEEN_REQUESTS)
-
-                    # Progress update after each category
-                    self.log(f"\nCategory {category_name} completed!")
-                    self.log(f"Progress: {self.completed}/{self.total} completed, {self.failed} failed, {self.skipped} skipped\n")
-
-            finally:
-                context.close()
-                browser.close()
+    def log_category_done(self, category_name):
+        self.log(f"\nCategory {category_name} completed!")
+        self.log(f"Progress: {self.completed}/{self.total} completed, {self.failed} failed, {self.skipped} skipped\n")
 
-        # Final summary
+    def log_summary(self):
         self.log("\n" + "=" * 60)
         self.log("SCRAPING COMPLETE!")
         self.log("=" * 60)
         self.log(f"Total articles: {self.total}")
         self.log(f"Successfully fetched: {self.completed}")
         self.log(f"Skipped (already done): {self.skipped}")
+        if self.refresh:
+            self.log(f"Unchanged since last fetch: {self.unchanged}")
         self.log(f"Failed: {self.failed}")
 
         if self.failed > 0:
@@ -375,6 +526,77 @@ class MangoMintScraper:
         self.log(f"\nAll content saved to: {BASE_DIR}")
         self.log(f"Full log available at: {LOG_FILE}")
 
+    async def run(self):
+        """Main scraping function, with self.workers pages in flight"""
+        categories = self.load_queue()
+        self.log_start()
+
+        queue = asyncio.Queue()
+        remaining = {}  # category -> articles not yet finished
+        for category_name in sorted(categories.keys()):
+            for article in categories[category_name]:
+                if not self.needs_fetch(article['url']):
+                    self.skipped += 1
+                    continue
+                queue.put_nowait(article)
+                remaining[category_name] = remaining.get(category_name, 0) + 1
+
+        async def worker(context):
+            page = await context.new_page()
+            await page.set_viewport_size({"width": 1920, "height": 1080})
+            try:
+                while not queue.empty():
+                    article = queue.get_nowait()
+                    if page.is_closed():  # renderer crashed on the previous article
+                        page = await context.new_page()
+                        await page.set_viewport_size({"width": 1920, "height": 1080})
+                    await self.fetch_article(page, article)
+                    category_name = article['category']
+                    remaining[category_name] -= 1
+                    if remaining[category_name] == 0:
+                        self.log_category_done(category_name)
+            finally:
+                await page.close()
+
+        async with async_playwright() as p:
+            self.log(f"Launching browser with {self.workers} pages...")
+            browser = await p.chromium.launch(
+                headless=True,
+                args=['--disable-blink-features=AutomationControlled']  # Avoid detection
+            )
+            context = await browser.new_context(
+                user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+            )
+            if self.profile == "text":
+                await context.route("**/*", block_heavy)
+            try:
+                await asyncio.gather(*(worker(context) for _ in range(min(max(self.workers, 1), queue.qsize()))))
+            finally:
+                await context.close()
+                await browser.close()
+
+        self.log_summary()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape Mango Mint help articles into the analysis markdown files")
+    parser.add_argument("--workers", type=int, default=WORKERS,
+                        help="concurrent pages; 1 fetches one article at a time")
+    parser.add_argument("--rate", type=float, default=HOST_RATE_LIMIT,
+                        help="max page loads per second per host")
+    parser.add_argument("--refresh", action="store_true",
+                        help="re-check completed articles and re-render only the ones that changed")
+    parser.add_argument("--profile", choices=RENDER_PROFILES, default="text",
+                        help="text skips images, media, fonts and trackers; full loads everything")
+    args = parser.parse_args()
+
+    scraper = MangoMintScraper(workers=args.workers, rate_limit=args.rate, refresh=args.refresh,
+                               profile=args.profile)
+    try:
+        asyncio.run(scraper.run())
+    finally:
+        # Fold the journal into scrape_progress.json, also on Ctrl-C
+        scraper.journal.close()
+
 if __name__ == "__main__":
-    scraper = MangoMintScraper()
-    scraper.run()
+    main()
@@ -1,60 +1,21 @@
 #!/usr/bin/env python3
-import re
 import os
+import sys
+from pathlib import Path
 
-# Read the HTML file
-with open('/Users/daminirijhwani/medical-spa-platform/docs/SYSTEM_WORKFLOWS.html', 'r', encoding='utf-8') as f:
-    content = f.read()
+# Roadmap document model shared with docs/reorganize.py
+sys.path.insert(0, str(Path(__file__).resolve().parent / "docs"))
+from roadmap_html import load
 
-# Find all queue-item sections with prompts
-# Pattern: Find sections that contain priority-number, queue-item-title, and COPY THIS PROMPT
-pattern = r'<div class="queue-item"[^>]*>.*?</div>\s*</div>\s*</div>'
+# Parse the HTML file (or reuse the model reorganize.py cached for it)
+roadmap = load('/Users/daminirijhwani/medical-spa-platform/docs/SYSTEM_WORKFLOWS.html')
 
-# Split by queue-item divs to process each one
-sections = re.split(r'<div class="queue-item"', content)
+# Every queue-item with a priority number, a title and a prompt under
+# "COPY THIS PROMPT TO CLAUDE CODE:", prompt HTML cleaned to markdown
+prompts_found = roadmap.prompts()
 
-prompts_found = []
-
-for i, section in enumerate(sections[1:], 1):  # Skip first split (header)
-    # Check if this section has a prompt
-    if 'COPY THIS PROMPT TO CLAUDE CODE:' not in section:
-        continue
-
-    # Extract priority number
-    priority_match = re.search(r'<div class="priority-number">(\d+)</div>', section)
-    if not priority_match:
-        continue
-    priority = priority_match.group(1)
-
-    # Extract title
-    title_match = re.search(r'<div class="queue-item-title">([^<]+)</div>', section)
-    if not title_match:
-        continue
-    title = title_match.group(1).strip()
-
-    # Extract the prompt (everything in the <pre> tag after the COPY THIS PROMPT header)
-    prompt_match = re.search(r'COPY THIS PROMPT TO CLAUDE CODE:</h4>\s*<pre[^>]*>(.*?)</pre>', section, re.DOTALL)
-    if not prompt_match:
-        continue
-
-    prompt_text = prompt_match.group(1).strip()
-
-    # Clean up HTML entities and tags
-    prompt_text = re.sub(r'<b>', '**', prompt_text)
-    prompt_text = re.sub(r'</b>', '**', prompt_text)
-    prompt_text = re.sub(r'<span[^>]*>', '', prompt_text)
-    prompt_text = re.sub(r'</span>', '', prompt_text)
-
-    prompts_found.append({
-        'priority': int(priority),
-        'title': title,
-        'prompt': prompt_text
-    })
-
-    print(f"Found: Priority {priority} - {title}")
-
-# Sort by priority
-prompts_found.sort(key=lambda x: x['priority'])
+for item in prompts_found:
+    print(f"Found: Priority {item['priority']} - {item['title']}")
 
 # Create output directory
 os.makedirs('/Users/daminirijhwani/medical-spa-platform/roadmap_rebuild', exist_ok=True)